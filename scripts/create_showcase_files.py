@@ -2,9 +2,14 @@
 """
 Create high-quality showcase files with best components in mosaic layout.
 """
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from excalidraw_gen.builder.minify import minify_element
+from excalidraw_gen.core import jsonio
+
 THEMES = {
     "default": {
         "library": "submission/shadcn-wireframe-default.excalidrawlib",
@@ -79,8 +84,7 @@ def find_component(items, pattern):
 
 def select_showcase_components(library_file):
     """Select handpicked showcase components."""
-    with open(library_file, 'r') as f:
-        data = json.load(f)
+    data = jsonio.load(library_file)
 
     items = data.get('libraryItems', [])
     selected = []
@@ -237,7 +241,8 @@ def create_showcase(theme_key, config):
         "type": "excalidraw",
         "version": 2,
         "source": "https://excalidraw.com",
-        "elements": elements,
+        # Mosaic scaling leaves full-precision floats; round them and drop default fields
+        "elements": [minify_element(el) for el in elements],
         "appState": {
             "viewBackgroundColor": config['bg_color'],
             "gridSize": None,
@@ -246,8 +251,7 @@ def create_showcase(theme_key, config):
         "files": {}
     }
 
-    with open(config['output'], 'w') as f:
-        json.dump(showcase, f, indent=2)
+    jsonio.dump(showcase, config['output'], pretty=True)
 
     print(f"  ✓ Saved to {config['output']}")
 
@@ -3,10 +3,14 @@
 Generate preview images by rendering Excalidraw components using Pillow.
 Creates a grid layout showing ~20-25 representative components.
 """
-import json
+import sys
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from excalidraw_gen.core import jsonio
+
 THEMES = {
     "default": {
         "library_file": "submission/shadcn-wireframe-default.excalidrawlib",
@@ -120,8 +124,7 @@ def get_element_bounds(elements):
 
 def select_showcase_components(library_file):
     """Select representative components."""
-    with open(library_file, 'r') as f:
-        data = json.load(f)
+    data = jsonio.load(library_file)
 
     library_items = data.get('libraryItems', [])
     selected = []
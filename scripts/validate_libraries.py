@@ -1,93 +1,92 @@
 #!/usr/bin/env python3
 """
 Validate Excalidraw library files before submission.
-Checks JSON structure, component count, and file integrity.
+Checks JSON structure, component count, file integrity and, for themed
+libraries, the theme's roundness and roughness.
 """
-import json
+import argparse
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-def validate_excalidraw_library(file_path):
-    """Validate an .excalidrawlib file."""
-    print(f"\n🔍 Validating {file_path.name}...")
+from excalidraw_gen.builder.cache import DEFAULT_CACHE_DIR
+from excalidraw_gen.testing.rules import theme_for_library, validate_files, write_report
 
-    try:
-        # Read and parse JSON
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-
-        # Check required fields
-        if not isinstance(data, dict):
-            print(f"  ❌ Invalid format: root should be an object")
-            return False
-
-        if 'libraryItems' not in data:
-            print(f"  ❌ Missing 'libraryItems' field")
-            return False
-
-        items = data['libraryItems']
-        if not isinstance(items, list):
-            print(f"  ❌ 'libraryItems' should be an array")
-            return False
-
-        # Count items
-        item_count = len(items)
-        print(f"  ✓ Library contains {item_count} items")
-
-        # Validate each item
-        for i, item in enumerate(items):
-            if 'id' not in item:
-                print(f"  ⚠️  Item {i} missing 'id'")
-            if 'status' not in item:
-                print(f"  ⚠️  Item {i} missing 'status'")
-            if 'elements' not in item:
-                print(f"  ❌ Item {i} missing 'elements'")
-                return False
-
-        # Check version
-        version = data.get('version', 1)
-        print(f"  ✓ Library version: {version}")
-
-        # File size check
-        file_size_kb = file_path.stat().st_size / 1024
-        print(f"  ✓ File size: {file_size_kb:.1f} KB")
-
-        if file_size_kb > 2000:
-            print(f"  ⚠️  Large file (>2MB) - consider splitting")
 
-        print(f"  ✅ {file_path.name} is valid!")
-        return True
+def print_library_report(report):
+    """Print the result of validating one .excalidrawlib file."""
+    file_path = Path(report['file'])
+    print(f"\n🔍 Validating {file_path.name}...")
 
-    except json.JSONDecodeError as e:
-        print(f"  ❌ Invalid JSON: {e}")
+    if report['error']:
+        print(f"  ❌ {report['error']}")
         return False
-    except Exception as e:
-        print(f"  ❌ Error: {e}")
+
+    rules = report['rules']
+    structure = rules['structure']
+    if structure['version'] is None:
+        for violation in structure['violations']:
+            print(f"  ❌ {violation}")
         return False
 
+    print(f"  ✓ Library contains {structure['items']} items")
+    for warning in structure['warnings']:
+        print(f"  ⚠️  {warning}")
+    print(f"  ✓ Library version: {structure['version']}")
+    print(f"  ✓ File size: {structure['size_kb']:.1f} KB")
+    if report['theme']:
+        print(f"  ✓ Theme: {report['theme']}")
+
+    for name, result in rules.items():
+        for violation in result['violations'][:5]:
+            print(f"  ❌ {name}: {violation}")
+        if len(result['violations']) > 5:
+            print(f"  ❌ {name}: ... {len(result['violations']) - 5} more")
+
+    if report['passed']:
+        print(f"  ✅ {file_path.name} is valid!")
+    return report['passed']
+
 
-def main():
+def main(argv=None):
     """Validate all library files."""
+    parser = argparse.ArgumentParser(description="Validate Excalidraw library files before submission")
+    parser.add_argument('--dir', default='submission', help='Directory of .excalidrawlib files (default: submission)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Maximum worker processes (default: CPU count)')
+    parser.add_argument('--report', metavar='FILE', help='Also write a machine-readable JSON report')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory of the validation cache (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Re-validate every component')
+    args = parser.parse_args(argv)
+
     print("=" * 60)
     print("EXCALIDRAW LIBRARY VALIDATION")
     print("=" * 60)
 
-    submission_dir = Path("submission")
+    submission_dir = Path(args.dir)
 
     # Find all .excalidrawlib files
     library_files = list(submission_dir.glob("*.excalidrawlib"))
 
     if not library_files:
-        print("\n❌ No .excalidrawlib files found in submission/")
+        print(f"\n❌ No .excalidrawlib files found in {submission_dir}/")
         return False
 
     print(f"\nFound {len(library_files)} library files\n")
 
-    # Validate each file
+    # Validate all files in one pass each, in parallel; themed files also get style checks
+    library_files = sorted(library_files)
+    themes = {path: theme_for_library(path) for path in library_files}
+    cache_dir = None if args.no_cache else args.cache_dir
+    reports = validate_files(library_files, themes, jobs=args.jobs, cache_dir=cache_dir)
     all_valid = True
-    for lib_file in sorted(library_files):
-        if not validate_excalidraw_library(lib_file):
+    for report in reports:
+        if not print_library_report(report):
             all_valid = False
+    if args.report:
+        write_report(reports, args.report)
+        print(f"\n📄 Report written to {args.report}")
 
     # Check for preview images
     print("\n" + "=" * 60)
@@ -1,3 +1,7 @@
 from .builder import ExcalidrawBuilder, generate_id, get_timestamp, estimate_text_dimensions
+from .element import Element
+from .writer import LibraryWriter
+from .preview import PreviewWriter
+from .registry import RegistryCollector
 
-__all__ = ['ExcalidrawBuilder', 'generate_id', 'get_timestamp', 'estimate_text_dimensions']
+__all__ = ['ExcalidrawBuilder', 'Element', 'LibraryWriter', 'PreviewWriter', 'RegistryCollector', 'generate_id', 'get_timestamp', 'estimate_text_dimensions']
@@ -1,10 +1,17 @@
 
-import random
 import time
 from excalidraw_gen.core.themes.mork import Theme as DefaultTheme
+from .element import Element, SLOT_KEYS, element_defaults
+from .ids import IdAllocator
+from .metrics import measure_text
+from .styles import TEXT_HEIGHT_TOKEN, TEXT_WIDTH_TOKEN, default_roundness, is_token
+from .writer import LibraryWriter
+
+_MISSING = object()
+_DEFAULT_IDS = IdAllocator()
 
 def generate_id():
-    return "".join(random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=20))
+    return _DEFAULT_IDS.next_id()
 
 def get_timestamp():
     return int(time.time() * 1000)
@@ -13,6 +20,8 @@ def estimate_text_dimensions(content, font_size=20, font_family=1, padding=4):
     """
     Estimate the width and height needed for text content.
 
+    Measured from per-glyph advance widths (see builder.metrics).
+
     Args:
         content: Text content (supports newlines)
         font_size: Font size in pixels
@@ -22,82 +31,121 @@ def estimate_text_dimensions(content, font_size=20, font_family=1, padding=4):
     Returns:
         (width, height) tuple
     """
-    lines = content.split('\n')
-
-    # Font-specific character width multipliers (approximate)
-    # Virgil (hand-drawn) is wider and more irregular
-    char_width_multipliers = {
-        1: 0.65,  # Virgil (hand-drawn) - wider characters
-        2: 0.55,  # Helvetica (sans-serif) - more compact
-        3: 0.6,   # Cascadia (monospace) - fixed width
-    }
-
-    multiplier = char_width_multipliers.get(font_family, 0.6)
-
-    # Calculate width based on longest line
-    max_line_length = len(max(lines, key=len)) if lines else 0
-    estimated_width = max_line_length * font_size * multiplier + padding * 2
-
-    # Calculate height based on number of lines
-    line_height = font_size * 1.2  # Standard line-height ratio
-    estimated_height = len(lines) * line_height + padding * 2
-
-    return (int(estimated_width), int(estimated_height))
+    return measure_text(content, font_size, font_family, padding)
 
 class ExcalidrawBuilder:
-    def __init__(self, theme=None):
+    def __init__(self, theme=None, ids=None):
         """
         Initialize ExcalidrawBuilder.
 
         Args:
             theme: Theme class to use (defaults to DefaultTheme)
+            ids: IdAllocator for ids, seeds and timestamps (default: unseeded)
         """
         self.library_items = []
         self.theme = theme or DefaultTheme
+        self.ids = ids or IdAllocator()
+        self._defaults = {}
+        self.writer = None
+        self.sinks = []
+        self.retain_items = True
+        self.item_count = 0
+        # Optional name predicate (e.g. a components.registry.Selection); other items are dropped
+        self.select = None
+
+    def add_sink(self, sink):
+        """
+        Send every library item to `sink` as soon as it is added.
 
-    def create_base_element(self, type, x, y, width, height, **kwargs):
-        element = {
-            "id": generate_id(),
-            "type": type,
-            "x": x,
-            "y": y,
-            "width": width,
-            "height": height,
-            "angle": 0,
-            "strokeColor": self.theme.FOREGROUND,
-            "backgroundColor": "transparent",
-            "fillStyle": "solid",
-            "strokeWidth": self.theme.STROKE_WIDTH,
-            "strokeStyle": self.theme.STROKE_STYLE,
-            "roughness": self.theme.ROUGHNESS,
-            "opacity": 100,
-            "groupIds": [],
-            "frameId": None,
-            "roundness": None,
-            "seed": random.randint(1, 100000000),
-            "version": 1,
-            "versionNonce": 0,
-            "isDeleted": False,
-            "boundElements": None,
-            "updated": get_timestamp(),
-            "link": None,
-            "locked": False,
-        }
+        A sink is any object with write_item(item) and close() methods, such
+        as LibraryWriter, PreviewWriter or RegistryCollector. Sinks are
+        closed by finish().
+        """
+        self.sinks.append(sink)
+        return sink
+
+    def stream_to(self, filename, indent=None, **options):
+        """
+        Stream library items to filename as add_item() finishes them.
+
+        Items are written immediately and not kept in library_items, so
+        memory stays flat however many components are added. Call save()
+        to finish the file.
+
+        Args:
+            filename: Output .excalidrawlib path
+            indent: JSON indent (None for compact output)
+            **options: LibraryWriter options (minify, precision, compress)
+
+        Returns:
+            The LibraryWriter receiving the items
+        """
+        self.writer = self.add_sink(LibraryWriter(filename, indent=indent, **options))
+        self.retain_items = False
+        return self.writer
+
+    def preview_to(self, filename, columns=3, spacing=50, indent=2, **options):
+        """
+        Stream the preview document to filename as items are added.
+
+        Args:
+            filename: Output .excalidraw path
+            columns: Number of columns in the grid layout
+            spacing: Spacing between items (in pixels)
+            indent: JSON indent (None for compact output)
+            **options: PreviewWriter options (minify, precision, compress)
+
+        Returns:
+            The PreviewWriter receiving the items
+        """
+        from .preview import PreviewWriter
+        return self.add_sink(PreviewWriter(self, filename, columns=columns, spacing=spacing, indent=indent, **options))
+
+    def emit(self, item):
+        """Pass a finished library item to every sink (and keep it unless streaming)."""
+        for sink in self.sinks:
+            sink.write_item(item)
+        if self.retain_items:
+            self.library_items.append(item)
+        self.item_count += 1
+
+    def finish(self):
+        """Close every sink, completing all streamed outputs."""
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+        self.writer = None
+
+    def abort(self):
+        """Discard every partially streamed output (sinks without abort() are just dropped)."""
+        for sink in self.sinks:
+            abort = getattr(sink, "abort", None)
+            if abort is not None:
+                abort()
+        self.sinks = []
+        self.writer = None
+
+    def element_defaults(self, type):
+        """Shared default properties for elements of `type` in this builder's theme."""
+        defaults = self._defaults.get(type)
+        if defaults is None:
+            defaults = element_defaults(self.theme, type, default_roundness(self.theme, type))
+            self._defaults[type] = defaults
+        return defaults
 
-        # Apply default roundness based on type (if not in kwargs)
-        if "roundness" not in kwargs:
-            if type == "rectangle":
-                # Use theme roundness if available, otherwise default to 3
-                roundness_type = getattr(self.theme, 'ROUNDNESS_TYPE', 3)
-                # Type 1 = sharp corners in carbon, but set to null for truly boxy
-                if roundness_type == 1:
-                    element["roundness"] = None  # No rounding for carbon
-                else:
-                    element["roundness"] = {"type": roundness_type}
-            elif type == "line" or type == "arrow":
-                element["roundness"] = {"type": 2}  # Slight curve
-
-        element.update(kwargs)
+    def create_base_element(self, type, x, y, width, height, **kwargs):
+        defaults = self.element_defaults(type)
+        element = Element(
+            self.ids.next_id(), type, x, y, width, height, [],
+            self.ids.next_seed(), self.ids.timestamp,
+            # Only keep properties that differ from the theme defaults
+            {k: v for k, v in kwargs.items() if defaults.get(k, _MISSING) != v},
+            defaults
+        )
+        if not kwargs.keys().isdisjoint(SLOT_KEYS):
+            for key in SLOT_KEYS:
+                if key in kwargs:
+                    element[key] = element.props.pop(key)
         return element
 
     def rectangle(self, x, y, width, height, **kwargs):
@@ -105,20 +153,21 @@ class ExcalidrawBuilder:
 
     def ellipse(self, x, y, width, height, **kwargs):
         return self.create_base_element("ellipse", x, y, width, height, **kwargs)
-        
-    def line(self, x, y, points, **kwargs):
+
+    def _linear(self, type, x, y, points, **kwargs):
         min_x = min(p[0] for p in points)
         min_y = min(p[1] for p in points)
         max_x = max(p[0] for p in points)
         max_y = max(p[1] for p in points)
         w = max_x - min_x
         h = max_y - min_y
-        return self.create_base_element("line", x, y, w, h, points=points, **kwargs)
-    
+        return self.create_base_element(type, x, y, w, h, points=points, **kwargs)
+
+    def line(self, x, y, points, **kwargs):
+        return self._linear("line", x, y, points, **kwargs)
+
     def arrow(self, x, y, points, **kwargs):
-        el = self.line(x, y, points, **kwargs)
-        el["type"] = "arrow"
-        return el
+        return self._linear("arrow", x, y, points, **kwargs)
 
     def text(self, x, y, content, **kwargs):
         # Extract font properties to estimate dimensions
@@ -126,20 +175,21 @@ class ExcalidrawBuilder:
         font_family = kwargs.get("fontFamily", self.theme.FONT_FAMILY)
 
         # Estimate dimensions if not provided
-        estimated_w, estimated_h = estimate_text_dimensions(
-            content,
-            font_size=font_size,
-            font_family=font_family
-        )
+        if is_token(font_family):
+            # Theme-neutral build: measured when the font family is resolved
+            estimated_w, estimated_h = TEXT_WIDTH_TOKEN, TEXT_HEIGHT_TOKEN
+        else:
+            estimated_w, estimated_h = estimate_text_dimensions(
+                content,
+                font_size=font_size,
+                font_family=font_family
+            )
 
+        # fontFamily, textAlign, verticalAlign and containerId default per theme
         defaults = {
             "text": content,
             "fontSize": font_size,
-            "fontFamily": font_family,
-            "textAlign": "left",
-            "verticalAlign": "top",
             "baseline": int(font_size * 0.9),  # Baseline scales with font size
-            "containerId": None,
             "originalText": content,
         }
 
@@ -151,31 +201,45 @@ class ExcalidrawBuilder:
         return self.create_base_element("text", x, y, w, h, **final_props)
 
     def add_item(self, name, elements):
-        group_id = generate_id()
+        group_id = self.ids.next_id()
         for el in elements:
             el["groupIds"].append(group_id)
             
-        self.library_items.append({
-            "id": generate_id(),
+        item = {
+            "id": self.ids.next_id(),
             "status": "published",
-            "created": get_timestamp(),
+            "created": self.ids.timestamp,
             "name": name,
             "elements": elements
-        })
-
-    def save(self, filename="library.excalidrawlib"):
-        import json
-        data = {
-            "type": "excalidrawlib",
-            "version": 2,
-            "source": "https://excalidraw.com",
-            "libraryItems": self.library_items
         }
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
-        print(f"Generated {len(self.library_items)} items to {filename}")
+        # Ids are allocated either way, so selected items match a full build
+        if self.select is not None and not self.select(name):
+            return
+        self.emit(item)
+
+    def save(self, filename=None, verbose=True, indent=2):
+        """
+        Write the library file.
+
+        When streaming (see stream_to), this finishes the streamed file and
+        every other sink, and filename/indent are ignored.
 
-    def save_preview(self, filename="library-preview.excalidraw", columns=3, spacing=50):
+        Args:
+            filename: Output filename (default: library.excalidrawlib)
+            verbose: Print a summary line when done
+            indent: JSON indent (None for compact output)
+        """
+        if self.writer is not None:
+            writer = self.writer
+            self.finish()
+        else:
+            with LibraryWriter(filename or "library.excalidrawlib", indent=indent) as writer:
+                for item in self.library_items:
+                    writer.write_item(item)
+        if verbose:
+            print(f"Generated {writer.count} items to {writer.filename}")
+
+    def save_preview(self, filename="library-preview.excalidraw", columns=3, spacing=50, verbose=True):
         """
         Export all library items as an organized .excalidraw document.
 
@@ -183,128 +247,16 @@ class ExcalidrawBuilder:
             filename: Output filename
             columns: Number of columns in the grid layout
             spacing: Spacing between items (in pixels)
+            verbose: Print a summary line when done
         """
-        import json
-
-        all_elements = []
-        current_x = spacing
-        current_y = spacing
-        max_height_in_row = 0
-        column_count = 0
-        current_section = None
-
-        for item in self.library_items:
-            item_name = item["name"]
-
-            # Detect section changes (e.g., "A/", "B/", "C/", etc.)
-            section_prefix = item_name.split("/")[0] if "/" in item_name else item_name.split(":")[0]
-
-            # Add section header when section changes
-            if section_prefix != current_section:
-                # Move to new row for section header
-                if column_count > 0:
-                    current_y += max_height_in_row + spacing * 2
-                    current_x = spacing
-                    column_count = 0
-                    max_height_in_row = 0
-
-                # Create section header
-                section_header = self.text(
-                    current_x,
-                    current_y,
-                    section_prefix,
-                    fontSize=24,
-                    strokeColor=self.theme.PRIMARY,
-                    extra={"fontWeight": "bold"}
-                )
-                all_elements.append(section_header)
-
-                # Underline
-                underline = self.line(
-                    current_x,
-                    current_y + 30,
-                    [[0, 0], [200, 0]],
-                    strokeColor=self.theme.PRIMARY,
-                    strokeWidth=2
-                )
-                all_elements.append(underline)
-
-                current_y += 60
-                current_section = section_prefix
-
-            # Calculate bounds of the library item
-            item_elements = item["elements"]
-            if not item_elements:
-                continue
-
-            min_x = min(el["x"] for el in item_elements)
-            min_y = min(el["y"] for el in item_elements)
-            max_x = max(el["x"] + el.get("width", 0) for el in item_elements)
-            max_y = max(el["y"] + el.get("height", 0) for el in item_elements)
-
-            item_width = max_x - min_x
-            item_height = max_y - min_y
-
-            # Add label above the component
-            label = self.text(
-                current_x,
-                current_y,
-                item_name,
-                fontSize=12,
-                strokeColor=self.theme.MUTED_FG
-            )
-            all_elements.append(label)
-
-            # Offset elements to current position
-            for el in item_elements:
-                el_copy = el.copy()
-                el_copy["x"] = el["x"] - min_x + current_x
-                el_copy["y"] = el["y"] - min_y + current_y + 25  # 25px below label
-                el_copy["id"] = generate_id()  # Generate new ID
-                el_copy["groupIds"] = []  # Clear group IDs
-                all_elements.append(el_copy)
-
-            # Add light border around component
-            border = self.rectangle(
-                current_x - 10,
-                current_y - 5,
-                max(item_width + 20, 200),
-                item_height + 40,
-                backgroundColor="transparent",
-                strokeColor=self.theme.BORDER,
-                strokeStyle="dashed",
-                opacity=50
-            )
-            all_elements.append(border)
-
-            # Update position for next item
-            max_height_in_row = max(max_height_in_row, item_height + 50)
-            column_count += 1
-
-            if column_count >= columns:
-                # Move to next row
-                current_y += max_height_in_row + spacing
-                current_x = spacing
-                column_count = 0
-                max_height_in_row = 0
-            else:
-                # Move to next column
-                current_x += max(item_width + 40, 300)
-
-        # Create the Excalidraw document
-        data = {
-            "type": "excalidraw",
-            "version": 2,
-            "source": "https://excalidraw.com",
-            "elements": all_elements,
-            "appState": {
-                "gridSize": None,
-                "viewBackgroundColor": "#ffffff"
-            },
-            "files": {}
-        }
+        from .preview import PreviewWriter
+
+        if not self.retain_items:
+            raise RuntimeError("save_preview() needs retained library items; use preview_to() when streaming")
 
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
+        with PreviewWriter(self, filename, columns=columns, spacing=spacing) as preview:
+            for item in self.library_items:
+                preview.write_item(item)
 
-        print(f"Generated preview document with {len(self.library_items)} components to {filename}")
+        if verbose:
+            print(f"Generated preview document with {preview.count} components to {filename}")
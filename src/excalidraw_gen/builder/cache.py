@@ -0,0 +1,104 @@
+"""
+Content-addressed build cache.
+
+Theme-neutral library items are stored on disk under a key derived from
+everything that can change them: the producing code, the layout attributes
+baked into the geometry, the builder version and the id stream. A rebuild
+only re-executes producers whose key changed and stitches the library
+together from cached fragments for the rest.
+
+Fragments are per component level (see components.registry), not per
+component: a level's key covers the source of its whole module, since its
+producer calls helpers defined across that module and a narrower key (e.g.
+one function's source) could reuse stale geometry.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from excalidraw_gen.core import jsonio
+from .element import Element, to_json
+
+# Bump to invalidate every cache entry after a change to the cache format
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = '.excalidraw-cache'
+
+
+def builder_version():
+    """Hash of the builder package sources; any builder change invalidates the cache."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """Directory of cached item fragments, one JSON file per key."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+        self.version = builder_version()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, *parts):
+        """
+        Cache key for a fragment.
+
+        Args:
+            *parts: str/bytes/repr()-able values identifying the fragment
+                (e.g. producer source, layout key, id stream seed)
+
+        Returns:
+            Hex digest string
+        """
+        digest = hashlib.sha256()
+        for part in (CACHE_VERSION, self.version) + parts:
+            if isinstance(part, bytes):
+                digest.update(part)
+            else:
+                digest.update(repr(part).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def __contains__(self, key):
+        return self._path(key).exists()
+
+    def get(self, key, defaults_for=None):
+        """
+        Load a cached fragment.
+
+        Args:
+            key: Cache key
+            defaults_for: Optional callable type -> element defaults, used to
+                store loaded elements compactly
+
+        Returns:
+            List of library items, or None on a miss
+        """
+        try:
+            items = jsonio.load(self._path(key))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        for item in items:
+            item["elements"] = [
+                Element.from_dict(el, defaults_for(el["type"]) if defaults_for else None)
+                for el in item["elements"]
+            ]
+        self.hits += 1
+        return items
+
+    def put(self, key, items):
+        """Store a fragment atomically (safe with concurrent writers)."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        jsonio.dump(items, tmp, default=to_json)
+        os.replace(tmp, path)
@@ -0,0 +1,178 @@
+"""
+Compact element model.
+
+An Element keeps the per-element fields (id, position, size, seed, groups) in
+slots and only the properties that differ from its theme's defaults in a small
+dict. The defaults live in one dict shared by every element of the same theme
+and type. Elements behave like read/write mappings and are expanded to full
+Excalidraw JSON (in the usual key order) only when serialized.
+"""
+
+SLOT_KEYS = ("id", "type", "x", "y", "width", "height", "groupIds", "seed", "updated")
+
+# Key order of a serialized element, matching Excalidraw's own output
+BASE_KEYS = (
+    "id", "type", "x", "y", "width", "height", "angle",
+    "strokeColor", "backgroundColor", "fillStyle", "strokeWidth", "strokeStyle", "roughness", "opacity",
+    "groupIds", "frameId", "roundness", "seed", "version", "versionNonce", "isDeleted",
+    "boundElements", "updated", "link", "locked",
+)
+TEXT_KEYS = ("text", "fontSize", "fontFamily", "textAlign", "verticalAlign", "baseline", "containerId", "originalText")
+LINEAR_KEYS = ("points",)
+
+_TEMPLATES = {
+    "text": BASE_KEYS + TEXT_KEYS,
+    "line": BASE_KEYS + LINEAR_KEYS,
+    "arrow": BASE_KEYS + LINEAR_KEYS,
+}
+_TEMPLATE_SETS = {}
+_SLOT_SET = frozenset(SLOT_KEYS)
+
+
+def _template(type):
+    keys = _TEMPLATES.get(type, BASE_KEYS)
+    if keys not in _TEMPLATE_SETS:
+        _TEMPLATE_SETS[keys] = frozenset(keys)
+    return keys, _TEMPLATE_SETS[keys]
+
+
+def element_defaults(theme, type, roundness=None):
+    """
+    Default property values for elements of `type` in `theme`.
+
+    Args:
+        theme: Theme class (concrete or token theme)
+        type: Excalidraw element type
+        roundness: Default roundness for this type
+
+    Returns:
+        Dict of default properties (to be shared, never mutated)
+    """
+    defaults = {
+        "angle": 0,
+        "strokeColor": theme.FOREGROUND,
+        "backgroundColor": "transparent",
+        "fillStyle": "solid",
+        "strokeWidth": theme.STROKE_WIDTH,
+        "strokeStyle": theme.STROKE_STYLE,
+        "roughness": theme.ROUGHNESS,
+        "opacity": 100,
+        "frameId": None,
+        "roundness": roundness,
+        "version": 1,
+        "versionNonce": 0,
+        "isDeleted": False,
+        "boundElements": None,
+        "link": None,
+        "locked": False,
+    }
+    if type == "text":
+        defaults.update({
+            "fontFamily": theme.FONT_FAMILY,
+            "textAlign": "left",
+            "verticalAlign": "top",
+            "containerId": None,
+        })
+    return defaults
+
+
+class Element:
+    """One Excalidraw element, storing only what differs from its defaults."""
+
+    __slots__ = SLOT_KEYS + ("props", "defaults")
+
+    def __init__(self, id, type, x, y, width, height, groupIds, seed, updated, props, defaults):
+        self.id = id
+        self.type = type
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.groupIds = groupIds
+        self.seed = seed
+        self.updated = updated
+        self.props = props
+        self.defaults = defaults
+
+    @classmethod
+    def from_dict(cls, data, defaults=None):
+        """Build an Element from a full element dict (e.g. read from a library file)."""
+        defaults = defaults or {}
+        props = {k: v for k, v in data.items() if k not in _SLOT_SET and (k not in defaults or defaults[k] != v)}
+        return cls(
+            data["id"], data["type"], data["x"], data["y"], data.get("width", 0), data.get("height", 0),
+            data.get("groupIds", []), data.get("seed"), data.get("updated"), props, defaults
+        )
+
+    # --- Mapping interface ---
+
+    def __getitem__(self, key):
+        if key in _SLOT_SET:
+            return getattr(self, key)
+        if key in self.props:
+            return self.props[key]
+        return self.defaults[key]
+
+    def __setitem__(self, key, value):
+        if key in _SLOT_SET:
+            setattr(self, key, value)
+        else:
+            self.props[key] = value
+
+    def __contains__(self, key):
+        return key in _SLOT_SET or key in self.props or key in self.defaults
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.to_dict())
+
+    def copy(self):
+        """Shallow copy (property dict copied, nested values shared), like dict.copy()."""
+        return Element(
+            self.id, self.type, self.x, self.y, self.width, self.height, self.groupIds,
+            self.seed, self.updated, dict(self.props), self.defaults
+        )
+
+    def __repr__(self):
+        return f"Element({self.type!r}, id={self.id!r}, x={self.x!r}, y={self.y!r}, overrides={sorted(self.props)})"
+
+    # --- Serialization ---
+
+    def to_dict(self):
+        """Expand to a full Excalidraw element dict."""
+        keys, key_set = _template(self.type)
+        props = self.props
+        defaults = self.defaults
+        data = {}
+        for key in keys:
+            if key in _SLOT_SET:
+                data[key] = getattr(self, key)
+            elif key in props:
+                data[key] = props[key]
+            elif key in defaults:
+                data[key] = defaults[key]
+        for key, value in props.items():
+            if key not in key_set:
+                data[key] = value
+        return data
+
+
+def to_json(value):
+    """`default=` hook for JSON encoders (see core.jsonio): expand Elements into plain dicts."""
+    if isinstance(value, Element):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -1,86 +1,378 @@
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from excalidraw_gen.core.themes import get_theme
+from excalidraw_gen.builder.styles import iter_resolved_items, layout_key, make_token_theme, resolve_items
+from excalidraw_gen.builder.registry import RegistryCollector, save_registry
+from excalidraw_gen.builder.ids import IdAllocator, build_timestamp, seed_from_content
+from excalidraw_gen.builder.cache import BuildCache
+from excalidraw_gen.builder.pack import build_pack
+from excalidraw_gen.builder.writer import LIBRARY_HEADER
+from excalidraw_gen.testing.geometry import GeometryLinter
+from excalidraw_gen.testing.schema import SchemaValidator
+from excalidraw_gen.components.registry import get_level, levels
+
+def content_seed():
+    """
+    Seed derived from the builder sources.
+
+    Every level draws its ids from its own fork of this seed (see
+    iter_neutral_items), so editing one component module leaves the ids of
+    every other level unchanged.
+    """
+    from excalidraw_gen import builder
+
+    return seed_from_content(*[p.read_bytes() for p in sorted(Path(builder.__file__).parent.glob('*.py'))])
+
+def build_allocator(seed=None, timestamp=None):
+    """
+    IdAllocator for a reproducible build.
+
+    Args:
+        seed: Integer seed (default: content_seed())
+        timestamp: Build timestamp in ms (default: build_timestamp())
+    """
+    return IdAllocator(
+        content_seed() if seed is None else seed,
+        build_timestamp() if timestamp is None else timestamp
+    )
+
+def _bind_theme(theme, modules=None):
+    """
+    Point component modules' `Theme` at the given theme class.
+
+    Component modules bind `Theme` at import time, so the binding is replaced
+    on the imported modules rather than re-importing them.
+
+    Args:
+        theme: Theme class to bind
+        modules: Modules to rebind (default: every component level module)
+
+    Returns:
+        Dict of module -> previously bound theme, for restoring
+    """
+    if modules is None:
+        modules = [sys.modules[level.module] for level in levels()]
+
+    previous = {}
+    for module in modules:
+        previous[module] = module.Theme
+        module.Theme = theme
+    return previous
+
+def _build_level(name, theme, seed, timestamp, selection=None):
+    """
+    Build one component level into its own token-theme builder.
+
+    Runs in worker processes, so it only takes picklable arguments: the
+    producer name, the concrete theme (for layout), the level's id stream
+    and an optional Selection of component names.
+
+    Returns:
+        The level's theme-neutral library items
+    """
+    from excalidraw_gen.builder import ExcalidrawBuilder
+
+    level = get_level(name)
+    token_theme = make_token_theme(theme)
+    builder = ExcalidrawBuilder(theme=token_theme, ids=IdAllocator(seed, timestamp))
+    builder.select = selection or None
+    previous = _bind_theme(token_theme, [sys.modules[level.module]])
+    try:
+        level(builder)
+    finally:
+        for module, bound in previous.items():
+            module.Theme = bound
+    return builder.library_items
+
+def iter_neutral_items(theme, verbose=True, ids=None, cache=None, jobs=None, selection=None):
+    """
+    Build every component once in theme-neutral (tokenized) form, lazily.
+
+    Items are yielded level by level as each level is built, so a streaming
+    consumer (main() emitting into the builder's sinks) never holds more than
+    one level's items. Nothing is kept once the generator is exhausted. With a
+    BuildCache, each level is cached on disk under a key of its module source,
+    the layout, the builder version and its id stream, and only levels whose
+    key changed are re-executed.
+
+    Levels are independent (each draws ids from its own fork of `ids`), so
+    with jobs > 1 they are built on a process pool and yielded in canonical
+    order; the result is identical to a sequential build. The pool is opt-in:
+    a whole theme builds in a fraction of a second, less than starting the
+    workers costs, so levels are built in-process by default.
+
+    With a Selection, levels that cannot produce a selected component are not
+    run at all, and the rest only keep selected items. Selected items are
+    identical to the same items in a full build.
+
+    Args:
+        theme: Theme supplying the layout (sizing) attributes
+        verbose: Print progress messages
+        ids: IdAllocator for the build (default: build_allocator())
+        cache: Optional BuildCache for level fragments
+        jobs: Worker processes for levels (default: 1, in-process)
+        selection: Optional Selection of component names (see components.registry)
+
+    Yields:
+        Theme-neutral library items (see builder.styles), in canonical order
+    """
+    ids = ids or build_allocator()
+    selection = selection or None
+    if ids.seed is None:
+        cache = None  # Unseeded ids are never reproducible, so never cacheable
+
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    from excalidraw_gen.builder import ExcalidrawBuilder
+
+    layout = layout_key(theme)
+    element_defaults = ExcalidrawBuilder(theme=make_token_theme(theme)).element_defaults
+    selected = []
+    for level in levels():
+        if selection and not selection.may_match(level):
+            continue
+        level_ids = ids.fork(level.name)
+        fragment_key = None
+        if cache is not None:
+            source = Path(sys.modules[level.module].__file__).read_bytes()
+            fragment_key = cache.key(level.name, source, layout, level_ids.seed, level_ids.timestamp)
+        selected.append((level, level_ids, fragment_key))
+
+    def level_items(level, level_ids, fragment_key, future=None):
+        if fragment_key is not None:
+            cached = cache.get(fragment_key, element_defaults)
+            if cached is not None:
+                if selection:
+                    cached = [item for item in cached if selection(item["name"])]
+                log(f"Cached {level.title} ({len(cached)} items)")
+                return cached
+        log(f"Adding {level.title}...")
+        if future is not None:
+            items = future.result()
+        else:
+            items = _build_level(level.name, theme, level_ids.seed, level_ids.timestamp, selection)
+        if fragment_key is not None and not selection:
+            cache.put(fragment_key, items)  # Filtered fragments are partial; only full levels are cached
+        return items
+
+    pending = [entry for entry in selected if entry[2] is None or entry[2] not in cache]
+    workers = max(1, min(jobs or 1, len(pending)))
+    if workers == 1:
+        for entry in selected:
+            yield from level_items(*entry)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            level.name: pool.submit(_build_level, level.name, theme, level_ids.seed, level_ids.timestamp, selection)
+            for level, level_ids, _ in pending
+        }
+        for entry in selected:
+            yield from level_items(*entry, futures.get(entry[0].name))
+
+def build_neutral_items(theme, verbose=True, ids=None, cache=None, jobs=None, selection=None):
+    """Build every component in theme-neutral form, as a list (see iter_neutral_items)."""
+    return list(iter_neutral_items(theme, verbose, ids, cache, jobs, selection))
+
+def build_library_document(theme_name, seed=None, jobs=None, selection=None):
+    """
+    Build a theme's library in memory, without writing or parsing any file.
+
+    The items are the ones main() writes for the same seed; elements stay
+    Element mappings, which the validators in excalidraw_gen.testing accept.
+
+    Args:
+        theme_name: Theme to resolve the components against
+        seed: Seed for ids and roughjs seeds (default: derived from the sources)
+        jobs: Worker processes for building levels (default: 1, in-process)
+        selection: Optional Selection; only matching components are built
+
+    Returns:
+        Library document dict ({"type", "version", "source", "libraryItems"})
+    """
+    theme = get_theme(theme_name)
+    neutral_items = iter_neutral_items(theme, verbose=False, ids=build_allocator(seed), jobs=jobs, selection=selection)
+    return {**LIBRARY_HEADER, "libraryItems": resolve_items(neutral_items, theme)}
 
 def main(theme_name='default', output_file='output/shadcn-saas-kit.excalidrawlib', preview_file='output/shadcn-saas-kit-preview.excalidraw',
-         generate_preview=True, columns=3, spacing=60):
+         generate_preview=True, columns=3, spacing=60, verbose=True, compact=False, registry=None, seed=None, cache_dir=None, jobs=None, selection=None,
+         minify=False, precision=2, compress=(), pack=False, validate=True, reproducible=False):
     """
     Generate Excalidraw library with specified theme.
 
+    Component geometry is built in theme-neutral form (see iter_neutral_items)
+    and resolved against the selected theme's palette one item at a time. Each
+    resolved item is written to the library, the preview and the registry in a
+    single pass, so no complete item list is ever held in memory.
+
     Args:
-        theme_name: Theme to use ('default', 'carbon', 'warm')
+        theme_name: Theme to use ('mork', 'abc123-dark', 'bronzer')
         output_file: Output filename for library
         preview_file: Output filename for preview
         generate_preview: Whether to generate preview document
         columns: Number of columns in preview grid
         spacing: Spacing between items in preview
+        verbose: Print progress messages
+        compact: Write the library without indentation
+        registry: Optional RegistryCollector that receives every item
+        seed: Seed for ids and roughjs seeds (default: derived from the sources)
+        cache_dir: Directory of the incremental build cache (None: no disk cache)
+        jobs: Worker processes for building levels (default: 1, in-process)
+        selection: Optional Selection; only matching components are built
+        minify: Write minified library and preview (Excalidraw defaults dropped, coordinates quantized)
+        precision: Decimal places kept for coordinates when minifying
+        compress: Also write compressed siblings of the outputs ('gz', 'zst')
+        pack: Also compile the library into a memory-mappable component pack (see builder.pack)
+        validate: Check every item against the Excalidraw schema as it is emitted (an invalid
+            item aborts the build and leaves the previous outputs in place) and report
+            overlapping, overflowing or out-of-frame elements as warnings
+        reproducible: Timestamp 0 instead of the last commit time when SOURCE_DATE_EPOCH
+            is unset (see ids.build_timestamp)
+
+    Returns:
+        The builder (items are streamed, so library_items is empty)
     """
-    # Load selected theme and inject it into sys.modules
-    # This ensures all component imports get the right theme
-    selected_theme = get_theme(theme_name)
+    from excalidraw_gen.builder import ExcalidrawBuilder
 
-    import types
-    theme_module = types.ModuleType('theme')
-    theme_module.Theme = selected_theme
-    sys.modules['theme'] = theme_module
-    sys.modules['excalidraw_gen.core.themes.mork'] = theme_module
-
-    # Import components AFTER setting theme
-    from excalidraw_gen.components import (
-        add_frames,
-        add_primitives,
-        add_base_ui,
-        add_modules,
-        add_shells,
-        add_organisms,
-        add_saas_blocks,
-        add_templates,
-        add_ai_patterns
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    selected_theme = get_theme(theme_name)
+    log(f"🎨 Using theme: {theme_name}")
+    log("Initializing Excalidraw Builder...")
+    ids = build_allocator(seed, build_timestamp(reproducible))
+    cache = BuildCache(cache_dir) if cache_dir is not None else None
+    neutral_items = iter_neutral_items(
+        selected_theme, verbose=verbose, ids=ids, cache=cache, jobs=jobs, selection=selection
     )
-    from excalidraw_gen.builder import ExcalidrawBuilder
 
-    print(f"🎨 Using theme: {theme_name}")
-    print("Initializing Excalidraw Builder...")
-    builder = ExcalidrawBuilder(theme=selected_theme)
+    builder = ExcalidrawBuilder(theme=selected_theme, ids=ids.fork(f'preview:{theme_name}'))
+    linter = None
+    if validate:
+        builder.add_sink(SchemaValidator())
+        linter = builder.add_sink(GeometryLinter())
+    options = {'minify': minify, 'precision': precision, 'compress': compress}
+    builder.stream_to(output_file, indent=None if compact or minify else 2, **options)
+    if generate_preview:
+        builder.preview_to(preview_file, columns=columns, spacing=spacing, indent=None if minify else 2, **options)
+    if registry is not None:
+        builder.add_sink(registry)
+
+    try:
+        for item in iter_resolved_items(neutral_items, selected_theme):
+            builder.emit(item)
+    except BaseException:
+        builder.abort()  # Keep the previous library and preview intact
+        raise
 
-    print("Adding Level 0: Frames & Layout...")
-    add_frames(builder)
+    if cache is not None and cache.hits:
+        log(f"♻️  Reused {cache.hits} cached level(s), rebuilt {cache.misses}")
+    builder.save(verbose=verbose)
+    log(f"\n✅ Library saved to {output_file}")
+    if linter is not None and linter.problems:
+        log(f"⚠️  {len(linter.problems)} geometry warning(s), e.g.:")
+        for problem in linter.problems[:3]:
+            log(f"    {problem}")
+        log(f"    (python -m excalidraw_gen.testing.geometry {output_file} lists them all)")
+    if pack:
+        log(f"✅ Component pack saved to {build_pack(output_file)}")
 
-    print("Adding Level 1: Primitives...")
-    add_primitives(builder)
+    if generate_preview:
+        log(f"✅ Preview document saved to {preview_file}")
+    else:
+        log("\n⏭️  Skipping preview generation (--no-preview)")
+
+    return builder
+
+def theme_output_paths(theme_name, output_dir='output'):
+    """Return the (library, preview) paths used for a theme in multi-theme builds."""
+    output_dir = Path(output_dir)
+    return (
+        output_dir / f"{theme_name}-wireframe-kit.excalidrawlib",
+        output_dir / f"{theme_name}-wireframe-kit-preview.excalidraw",
+    )
 
-    print("Adding Level 2: Base UI...")
-    add_base_ui(builder)
+def _build_theme_job(theme_name, output_dir, generate_preview, with_registry, options):
+    """Worker entry point for build_themes: build one theme and report timing."""
+    output_file, preview_file = theme_output_paths(theme_name, output_dir)
+    registry = RegistryCollector(theme_name, output_file) if with_registry else None
+    start = time.perf_counter()
+    builder = main(
+        theme_name=theme_name,
+        output_file=str(output_file),
+        preview_file=str(preview_file),
+        generate_preview=generate_preview,
+        verbose=False,
+        registry=registry,
+        jobs=1,  # Themes already run one per process
+        **options
+    )
+    return {
+        'theme': theme_name,
+        'items': builder.item_count,
+        'seconds': time.perf_counter() - start,
+        'output_file': str(output_file),
+        'preview_file': str(preview_file) if generate_preview else None,
+        'components': registry.components if registry else [],
+    }
 
-    print("Adding Level 3: Modules...")
-    add_modules(builder)
+def build_themes(theme_names, output_dir='output', generate_preview=True, columns=3, spacing=60, jobs=None, compact=False,
+                 registry_file=None, catalog_file=None, seed=None, cache_dir=None, selection=None, **options):
+    """
+    Generate several themes in parallel, one process per theme.
 
-    print("Adding Level 3: Shells...")
-    add_shells(builder)
+    Each worker builds its theme's geometry and streams it to disk; pass a
+    cache_dir to share unchanged levels between themes and runs.
 
-    print("Adding Level 3: Organisms...")
-    add_organisms(builder)
+    Args:
+        theme_names: Theme names to build (see AVAILABLE_THEMES)
+        output_dir: Directory for the generated libraries and previews
+        generate_preview: Whether to generate preview documents
+        columns: Number of columns in preview grid
+        spacing: Spacing between items in preview
+        jobs: Maximum number of worker processes (default: CPU count)
+        compact: Write libraries without indentation
+        registry_file: Write component-registry.json for all themes here
+        catalog_file: Write the human-readable component catalog here
+        seed: Seed for ids and roughjs seeds (default: derived from the sources)
+        cache_dir: Directory of the incremental build cache (None: no disk cache)
+        selection: Optional Selection; only matching components are built
+        **options: Output options passed to main() (minify, precision, compress, pack, validate, reproducible)
 
-    print("Adding Level 4: SaaS Patterns...")
-    add_saas_blocks(builder)
+    Returns:
+        List of per-theme result dicts, in the order of theme_names
+    """
+    for name in theme_names:
+        get_theme(name)  # Fail fast on unknown theme names
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    print("Adding Level 4: Templates...")
-    add_templates(builder)
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(theme_names)))
+    print(f"🎨 Building {len(theme_names)} themes with {workers} worker(s): {', '.join(theme_names)}")
 
-    print("Adding Level 5: AI Patterns...")
-    add_ai_patterns(builder)
+    options.update(columns=columns, spacing=spacing, compact=compact, seed=seed, cache_dir=cache_dir, selection=selection)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_build_theme_job, name, output_dir, generate_preview, registry_file is not None, options)
+            for name in theme_names
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
 
-    builder.save(output_file)
-    print(f"\n✅ Library saved to {output_file}")
+    print(f"\n{'Theme':<16}{'Items':>7}{'Time':>9}  Output")
+    for result in results:
+        print(f"{result['theme']:<16}{result['items']:>7}{result['seconds']:>8.2f}s  {result['output_file']}")
+    cpu_total = sum(r['seconds'] for r in results)
+    print(f"\n✅ Built {len(results)} themes in {elapsed:.2f}s wall ({cpu_total:.2f}s summed across workers)")
 
-    # Generate preview document
-    if generate_preview:
-        print("\nGenerating preview document...")
-        builder.save_preview(preview_file, columns=columns, spacing=spacing)
-        print(f"✅ Preview document saved to {preview_file}")
-    else:
-        print("\n⏭️  Skipping preview generation (--no-preview)")
+    if registry_file is not None:
+        components = [c for result in results for c in result['components']]
+        save_registry(components, registry_file, catalog_file)
+        print(f"✅ Component registry ({len(components)} components) saved to {registry_file}")
 
-    return builder
+    return results
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,153 @@
+"""
+Sidecar item index for .excalidrawlib files.
+
+LibraryWriter records the byte range of every library item it writes and
+saves it next to the library as <library>.idx. LibraryReader uses the index
+to decode a single item without parsing the rest of the file, and rebuilds
+the index with one scan when it is missing or stale. Staleness is judged by
+the library's content hash, not its mtime, so a copied or re-checked-out
+library keeps its index and rebuilding an identical library gives an
+identical index.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from excalidraw_gen.core import jsonio
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 2
+_HASH_CHUNK = 1 << 16
+
+
+def content_hash(path):
+    """Hex digest of a file's bytes (read in chunks)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_path(library_file):
+    """Sidecar index path for a library file."""
+    return Path(f"{library_file}{INDEX_SUFFIX}")
+
+
+def write_index(library_file, entries):
+    """
+    Write the sidecar index for a finished library file.
+
+    Args:
+        library_file: Library path (already complete on disk)
+        entries: List of {"name", "id", "offset", "length"} dicts, in item order
+    """
+    index = {
+        "version": INDEX_VERSION,
+        "size": os.path.getsize(library_file),
+        "hash": content_hash(library_file),
+        "items": entries,
+    }
+    path = index_path(library_file)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    jsonio.dump(index, tmp)
+    os.replace(tmp, path)
+
+
+def scan_library(library_file):
+    """
+    Build index entries by scanning a library file once (for files without an index).
+
+    Returns:
+        List of {"name", "id", "offset", "length"} dicts, in item order
+    """
+    with open(library_file, "rb") as f:
+        data = f.read()
+    text = data.decode()
+
+    # Locate the libraryItems array, then decode its items one at a time
+    decoder = json.JSONDecoder()
+    start = text.index("[", text.index('"libraryItems"') + len('"libraryItems"'))
+    pos = start + 1
+    entries = []
+    # Offsets are byte offsets; track characters and bytes in step
+    byte_pos = len(text[:pos].encode())
+    while True:
+        while text[pos] in " \t\r\n,":
+            pos += 1
+            byte_pos += 1
+        if text[pos] == "]":
+            return entries
+        item, end = decoder.raw_decode(text, pos)
+        length = len(text[pos:end].encode())
+        entries.append({"name": item.get("name", ""), "id": item.get("id"), "offset": byte_pos, "length": length})
+        byte_pos += length
+        pos = end
+
+
+class LibraryReader:
+    """Random access to the items of a .excalidrawlib file through its sidecar index."""
+
+    def __init__(self, library_file):
+        """
+        Args:
+            library_file: Library path; a missing or stale index is rebuilt in memory
+        """
+        self.library_file = Path(library_file)
+        self.entries = self._load_entries()
+        self._by_name = {}
+        for position, entry in enumerate(self.entries):
+            self._by_name.setdefault(entry["name"], position)
+
+    def _load_entries(self):
+        try:
+            index = jsonio.load(index_path(self.library_file))
+        except (OSError, ValueError):
+            return scan_library(self.library_file)
+        # The size check skips hashing when the library obviously changed
+        if (index.get("version") != INDEX_VERSION
+                or index.get("size") != os.path.getsize(self.library_file)
+                or index.get("hash") != content_hash(self.library_file)):
+            return scan_library(self.library_file)
+        return index["items"]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def names(self):
+        """Item names, in library order."""
+        return [entry["name"] for entry in self.entries]
+
+    def position(self, name):
+        """Position of the first item named exactly `name` (KeyError if absent)."""
+        return self._by_name[name]
+
+    def search(self, term):
+        """Positions of items whose name contains `term` (case-insensitive)."""
+        term = term.lower()
+        return [i for i, entry in enumerate(self.entries) if term in entry["name"].lower()]
+
+    def read_bytes(self, position):
+        """Raw JSON bytes of the item at `position`."""
+        entry = self.entries[position]
+        with open(self.library_file, "rb") as f:
+            f.seek(entry["offset"])
+            return f.read(entry["length"])
+
+    def get(self, position):
+        """Decode the library item at `position`."""
+        return jsonio.loads(self.read_bytes(position))
+
+    def get_elements(self, position):
+        """Decode the elements of the item at `position`."""
+        return self.get(position).get("elements", [])
+
+    def get_by_name(self, name):
+        """Decode the first item named exactly `name` (KeyError if absent)."""
+        return self.get(self.position(name))
+
+    def find(self, term):
+        """Decode the first item whose name contains `term` (case-insensitive), or None."""
+        positions = self.search(term)
+        return self.get(positions[0]) if positions else None
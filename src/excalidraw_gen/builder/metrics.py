@@ -0,0 +1,141 @@
+"""
+Text measurement from per-glyph advance widths.
+
+Widths are summed from advance tables (in 1/1000 em) for Excalidraw's three
+font families, and heights use Excalidraw's per-family line heights. Line
+widths are memoized in em units, so a label is measured once no matter how
+many sizes it is rendered at.
+
+All three tables are the fonts' real advances: Helvetica's from the Adobe
+AFM, Virgil's from the hmtx table of the font Excalidraw ships, Cascadia's
+from its fixed pitch.
+"""
+import unicodedata
+from functools import lru_cache
+
+FONT_VIRGIL = 1
+FONT_HELVETICA = 2
+FONT_CASCADIA = 3
+
+# Line height as a multiple of the font size (Excalidraw's getLineHeight)
+LINE_HEIGHTS = {
+    FONT_VIRGIL: 1.25,
+    FONT_HELVETICA: 1.15,
+    FONT_CASCADIA: 1.2,
+}
+
+# Helvetica advance widths for U+0020..U+007E, from the standard Adobe AFM
+_HELVETICA_ASCII = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,  # space .. /
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,  # 0 .. ?
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,  # @ .. O
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,  # P .. _
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,  # ` .. o
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,  # p .. ~
+)
+
+# Virgil advance widths for U+0020..U+007E, from the hmtx table of Virgil.ttf
+# ("Virgil 3 YOFF", 1000 units per em) as bundled with Excalidraw
+_VIRGIL_ASCII = (
+    500, 296, 328, 797, 803, 939, 719, 266, 415, 338, 516, 625, 257, 411, 274, 500,  # space .. /
+    688, 271, 712, 681, 640, 618, 640, 538, 765, 609, 242, 258, 605, 617, 485, 466,  # 0 .. ?
+    805, 656, 727, 644, 780, 674, 574, 789, 551, 545, 634, 613, 599, 766, 644, 726,  # @ .. O
+    661, 705, 678, 608, 804, 714, 517, 746, 598, 516, 797, 491, 500, 500, 544, 826,  # P .. _
+    437, 667, 508, 502, 569, 547, 486, 501, 494, 219, 328, 487, 263, 633, 467, 554,  # ` .. o
+    493, 546, 430, 543, 565, 568, 523, 609, 562, 469, 572, 573, 168, 496, 841,  # p .. ~
+)
+
+# Cascadia Code is monospaced: every glyph advances 1200/2048 em
+_CASCADIA_ADVANCE = 586
+
+_ADVANCES = {
+    FONT_VIRGIL: dict(zip(map(chr, range(0x20, 0x7F)), _VIRGIL_ASCII)),
+    FONT_HELVETICA: dict(zip(map(chr, range(0x20, 0x7F)), _HELVETICA_ASCII)),
+    FONT_CASCADIA: dict.fromkeys(map(chr, range(0x20, 0x7F)), _CASCADIA_ADVANCE),
+}
+
+# Advance for glyphs outside the tables (roughly the family's average letter;
+# Virgil's is its OS/2 xAvgCharWidth)
+_FALLBACK_ADVANCES = {
+    FONT_VIRGIL: 584,
+    FONT_HELVETICA: 556,
+    FONT_CASCADIA: _CASCADIA_ADVANCE,
+}
+
+# Full-width glyphs (CJK, most emoji) take a whole em in every family
+_WIDE_ADVANCE = 1000
+
+
+def _family(font_family):
+    """Map unknown font families to Virgil, Excalidraw's default."""
+    return font_family if font_family in _ADVANCES else FONT_VIRGIL
+
+
+def _glyph_advance(char, font_family):
+    if unicodedata.combining(char):
+        return 0
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return _WIDE_ADVANCE
+    return _FALLBACK_ADVANCES[font_family]
+
+
+@lru_cache(maxsize=8192)
+def line_width_em(line, font_family=FONT_VIRGIL):
+    """
+    Width of a single line of text in em units.
+
+    Args:
+        line: Text without newlines
+        font_family: 1=Virgil (hand-drawn), 2=Helvetica, 3=Cascadia (code)
+
+    Returns:
+        Width as a multiple of the font size
+    """
+    font_family = _family(font_family)
+    advances = _ADVANCES[font_family]
+    total = 0
+    for char in line:
+        advance = advances.get(char)
+        total += _glyph_advance(char, font_family) if advance is None else advance
+    return total / 1000
+
+
+def line_height(font_size, font_family=FONT_VIRGIL):
+    """Height of one line of text in pixels."""
+    return font_size * LINE_HEIGHTS[_family(font_family)]
+
+
+@lru_cache(maxsize=8192)
+def measure_text(content, font_size=20, font_family=FONT_VIRGIL, padding=4):
+    """
+    Measure the box needed for text content.
+
+    Args:
+        content: Text content (supports newlines)
+        font_size: Font size in pixels
+        font_family: 1=Virgil (hand-drawn), 2=Helvetica, 3=Cascadia (code)
+        padding: Extra padding in pixels (added to both width and height)
+
+    Returns:
+        (width, height) tuple of ints
+    """
+    lines = content.split('\n')
+    width = max(line_width_em(line, font_family) for line in lines) * font_size
+    height = len(lines) * line_height(font_size, font_family)
+    return (int(width + padding * 2), int(height + padding * 2))
+
+
+def measure_many(contents, font_size=20, font_family=FONT_VIRGIL, padding=4):
+    """
+    Measure many strings set in the same font.
+
+    Args:
+        contents: Iterable of text contents
+        font_size: Font size in pixels
+        font_family: 1=Virgil (hand-drawn), 2=Helvetica, 3=Cascadia (code)
+        padding: Extra padding in pixels (added to both width and height)
+
+    Returns:
+        List of (width, height) tuples, in input order
+    """
+    return [measure_text(content, font_size, font_family, padding) for content in contents]
@@ -0,0 +1,113 @@
+"""
+Minified and compressed output.
+
+Minified documents drop element fields that Excalidraw restores to the same
+value when it loads a file, and round coordinates to a fixed precision.
+Finished documents can also be written as .gz / .zst siblings.
+"""
+import gzip
+import importlib.util
+
+# Fields Excalidraw's restore() fills in with these values when missing
+# (boundElements comes back as [], which is equivalent to null)
+EXCALIDRAW_DEFAULTS = {
+    "angle": 0,
+    "backgroundColor": "transparent",
+    "fillStyle": "solid",
+    "strokeStyle": "solid",
+    "opacity": 100,
+    "groupIds": [],
+    "frameId": None,
+    "isDeleted": False,
+    "boundElements": None,
+    "link": None,
+    "locked": False,
+    "textAlign": "left",
+    "verticalAlign": "top",
+    "containerId": None,
+}
+
+COORDINATE_KEYS = ("x", "y", "width", "height")
+
+COMPRESSIONS = ("gz", "zst")
+
+_MISSING = object()
+
+
+def quantize(value, precision=2):
+    """Round a coordinate to `precision` decimals, collapsing whole numbers to ints."""
+    if isinstance(value, float):
+        value = round(value, precision)
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def minify_element(element, precision=2):
+    """
+    Minified copy of an element.
+
+    Args:
+        element: Element or element dict
+        precision: Decimal places kept for coordinates and points
+
+    Returns:
+        Element dict without Excalidraw-default fields
+    """
+    data = element.to_dict() if hasattr(element, "to_dict") else element
+    out = {key: value for key, value in data.items() if EXCALIDRAW_DEFAULTS.get(key, _MISSING) != value}
+    for key in COORDINATE_KEYS:
+        if key in out:
+            out[key] = quantize(out[key], precision)
+    if "points" in out:
+        out["points"] = [[quantize(x, precision), quantize(y, precision)] for x, y in out["points"]]
+    return out
+
+
+def minify_item(item, precision=2):
+    """Minified copy of a library item (see minify_element)."""
+    return {**item, "elements": [minify_element(el, precision) for el in item["elements"]]}
+
+
+def available_compressions():
+    """Compression formats usable here ('zst' needs the optional zstandard package)."""
+    return COMPRESSIONS if importlib.util.find_spec("zstandard") else ("gz",)
+
+
+def write_compressed(filename, formats):
+    """
+    Write compressed siblings of a finished file (e.g. lib.excalidrawlib.gz).
+
+    Args:
+        filename: File to compress
+        formats: Iterable of 'gz' and/or 'zst'
+
+    Returns:
+        List of written paths
+    """
+    formats = list(formats)
+    unknown = [fmt for fmt in formats if fmt not in COMPRESSIONS]
+    if unknown:
+        raise ValueError(f"Unknown compression format(s): {', '.join(unknown)} (available: {', '.join(COMPRESSIONS)})")
+    if not formats:
+        return []
+
+    with open(filename, "rb") as f:
+        data = f.read()
+
+    written = []
+    for fmt in formats:
+        path = f"{filename}.{fmt}"
+        if fmt == "gz":
+            # mtime=0 keeps the archive reproducible
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("zstd output requires the zstandard package (pip install zstandard)")
+            compressed = zstandard.ZstdCompressor(level=19).compress(data)
+        with open(path, "wb") as f:
+            f.write(compressed)
+        written.append(path)
+    return written
@@ -0,0 +1,305 @@
+"""
+Binary component pack.
+
+A pack is compiled from a finished .excalidrawlib file and is meant to be
+memory-mapped: several processes reading the same pack share one copy of it
+through the page cache, and components are decoded only when requested.
+
+Layout (little-endian):
+    header      magic, version, item/element/string counts, source size and content hash
+    strings     (n_strings + 1) u32 offsets, then the UTF-8 blob
+    items       n_items records: name, metadata, first element, element count
+    elements    one column of n_elements values per field: x, y, width and height
+                as f64, a u32 presence/int mask, then a u32 string id column per
+                remaining field (0 = absent) and one for other fields
+
+Every non-coordinate value is stored once, JSON-encoded, in the interned
+string table, so repeated colors, styles and texts cost four bytes each.
+Packs are tied to the content hash of their library (see builder.index), so
+a copied library keeps its pack and identical builds give identical packs.
+"""
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from excalidraw_gen.core import jsonio
+from .element import BASE_KEYS, LINEAR_KEYS, TEXT_KEYS
+from .index import content_hash
+
+PACK_SUFFIX = ".pack"
+PACK_MAGIC = b"EXPK"
+PACK_VERSION = 2
+
+NUMERIC_KEYS = ("x", "y", "width", "height")
+FIELD_ORDER = tuple(dict.fromkeys(BASE_KEYS + TEXT_KEYS + LINEAR_KEYS))
+VALUE_KEYS = tuple(key for key in FIELD_ORDER if key not in NUMERIC_KEYS)
+_VALUE_INDEX = {key: i for i, key in enumerate(VALUE_KEYS)}
+_NUMERIC_INDEX = {key: i for i, key in enumerate(NUMERIC_KEYS)}
+
+_HEADER = struct.Struct("<4sHHIIIQ16s")
+_ITEM = struct.Struct("<IIII")
+_F64 = struct.Struct("<d")
+_U32 = struct.Struct("<I")
+# Columns: coordinates, the mask, one string id per value key, then the extras object
+_ID_COLUMNS = len(VALUE_KEYS) + 1
+
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
+def pack_path(library_file):
+    """Pack path for a library file."""
+    return Path(f"{library_file}{PACK_SUFFIX}")
+
+
+class _StringTable:
+    """Intern JSON-encoded values; id 0 is reserved for 'absent'."""
+
+    def __init__(self):
+        self.ids = {}
+        self.blobs = [b""]
+
+    def add(self, value):
+        encoded = jsonio.dumpb(value)
+        sid = self.ids.get(encoded)
+        if sid is None:
+            sid = self.ids[encoded] = len(self.blobs)
+            self.blobs.append(encoded)
+        return sid
+
+
+def _pack_element(el, strings):
+    """Mask, coordinates and string ids of an element (one value per column)."""
+    mask = 0
+    coords = []
+    for i, key in enumerate(NUMERIC_KEYS):
+        value = el.get(key)
+        if value is None:
+            coords.append(0.0)
+            continue
+        mask |= 1 << i
+        if isinstance(value, int):
+            mask |= 1 << (i + len(NUMERIC_KEYS))
+        coords.append(float(value))
+
+    sids = [0] * _ID_COLUMNS
+    extras = {}
+    for key, value in el.items():
+        if key in _VALUE_INDEX:
+            sids[_VALUE_INDEX[key]] = strings.add(value)
+        elif key not in NUMERIC_KEYS:
+            extras[key] = value
+    if extras:
+        sids[-1] = strings.add(extras)
+    return mask, coords, sids
+
+
+def build_pack(library_file, output_file=None):
+    """
+    Compile a .excalidrawlib file into a binary pack.
+
+    Args:
+        library_file: Finished library file
+        output_file: Pack path (default: <library_file>.pack)
+
+    Returns:
+        Path of the written pack
+    """
+    library_file = Path(library_file)
+    output_file = Path(output_file) if output_file else pack_path(library_file)
+    source_size, source_hash = os.path.getsize(library_file), content_hash(library_file)
+    items = jsonio.load(library_file).get("libraryItems", [])
+
+    strings = _StringTable()
+    item_records = []
+    masks = []
+    coord_columns = [[] for _ in NUMERIC_KEYS]
+    id_columns = [[] for _ in range(_ID_COLUMNS)]
+    for item in items:
+        elements = item.get("elements", [])
+        meta = {key: value for key, value in item.items() if key not in ("name", "elements")}
+        item_records.append(_ITEM.pack(strings.add(item["name"]), strings.add(meta), len(masks), len(elements)))
+        for el in elements:
+            mask, coords, sids = _pack_element(el, strings)
+            masks.append(mask)
+            for column, value in zip(coord_columns, coords):
+                column.append(value)
+            for column, sid in zip(id_columns, sids):
+                column.append(sid)
+
+    # String i spans offsets[i]:offsets[i + 1] in the blob
+    offsets = [0]
+    for blob in strings.blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    blob = b"".join(strings.blobs)
+    padding = b"\0" * (-len(blob) % 8)
+    header = _HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(item_records), len(masks), len(strings.blobs),
+                          source_size, bytes.fromhex(source_hash))
+
+    tmp = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(blob + padding)
+        f.writelines(item_records)
+        count = len(masks)
+        f.writelines(struct.pack(f"<{count}d", *column) for column in coord_columns)
+        f.write(struct.pack(f"<{count}I", *masks))
+        f.writelines(struct.pack(f"<{count}I", *column) for column in id_columns)
+    os.replace(tmp, output_file)
+    return output_file
+
+
+class ComponentPack:
+    """Memory-mapped, lazily decoded view of a component pack."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Pack file (see build_pack)
+
+        Raises:
+            ValueError if the file is not a pack of a supported version
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.item_count, self.element_count, string_count, self.source_size, source_hash = \
+            _HEADER.unpack_from(self._buf, 0)
+        self.source_hash = source_hash.hex()
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {PACK_VERSION} component pack")
+
+        self._offsets_at = _HEADER.size
+        self._blob_at = self._offsets_at + (string_count + 1) * _U32.size
+        blob_size = _U32.unpack_from(self._buf, self._offsets_at + string_count * _U32.size)[0]
+        self._items_at = self._blob_at + blob_size + (-blob_size % 8)
+        # Start of each column: coordinates, mask, string ids
+        coords_at = self._items_at + self.item_count * _ITEM.size
+        self._coords_at = [coords_at + i * self.element_count * _F64.size for i in range(len(NUMERIC_KEYS))]
+        self._mask_at = coords_at + len(NUMERIC_KEYS) * self.element_count * _F64.size
+        self._ids_at = [self._mask_at + (i + 1) * self.element_count * _U32.size for i in range(_ID_COLUMNS)]
+        self._values = {}
+        self._names = None
+
+    @classmethod
+    def for_library(cls, library_file, path=None):
+        """
+        Open the pack of a library file, or return None if it is missing or stale.
+
+        Args:
+            library_file: Library the pack was compiled from
+            path: Pack path (default: <library_file>.pack)
+        """
+        path = pack_path(library_file) if path is None else path
+        try:
+            pack = cls(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            # The size check skips hashing when the library obviously changed
+            fresh = (pack.source_size == os.path.getsize(library_file)
+                     and pack.source_hash == content_hash(library_file))
+        except OSError:
+            fresh = False
+        if not fresh:
+            pack.close()
+            return None
+        return pack
+
+    def _value(self, sid):
+        value = self._values.get(sid, self)
+        if value is not self:
+            return value
+        start, end = struct.unpack_from("<2I", self._buf, self._offsets_at + sid * _U32.size)
+        value = jsonio.loads(self._buf[self._blob_at + start:self._blob_at + end])
+        if isinstance(value, _IMMUTABLE):
+            self._values[sid] = value
+        return value
+
+    def _sid(self, column, index):
+        return _U32.unpack_from(self._buf, self._ids_at[column] + index * _U32.size)[0]
+
+    def _element(self, index):
+        mask = _U32.unpack_from(self._buf, self._mask_at + index * _U32.size)[0]
+        el = {}
+        for key in FIELD_ORDER:
+            if key in _VALUE_INDEX:
+                sid = self._sid(_VALUE_INDEX[key], index)
+                if sid:
+                    el[key] = self._value(sid)
+            else:
+                i = _NUMERIC_INDEX[key]
+                if mask & (1 << i):
+                    value = _F64.unpack_from(self._buf, self._coords_at[i] + index * _F64.size)[0]
+                    el[key] = int(value) if mask & (1 << (i + len(NUMERIC_KEYS))) else value
+        extras = self._sid(_ID_COLUMNS - 1, index)
+        if extras:
+            el.update(self._value(extras))
+        return el
+
+    def field(self, index, key):
+        """Value of one top-level field of element `index` (None if absent), decoding nothing else."""
+        if key in _VALUE_INDEX:
+            sid = self._sid(_VALUE_INDEX[key], index)
+            return self._value(sid) if sid else None
+        if key in _NUMERIC_INDEX:
+            i = _NUMERIC_INDEX[key]
+            mask = _U32.unpack_from(self._buf, self._mask_at + index * _U32.size)[0]
+            if not mask & (1 << i):
+                return None
+            value = _F64.unpack_from(self._buf, self._coords_at[i] + index * _F64.size)[0]
+            return int(value) if mask & (1 << (i + len(NUMERIC_KEYS))) else value
+        extras = self._sid(_ID_COLUMNS - 1, index)
+        return self._value(extras).get(key) if extras else None
+
+    def element_indexes(self, position):
+        """Element indexes (for field()) of the item at `position`."""
+        if not 0 <= position < self.item_count:
+            raise IndexError(position)
+        _, _, first, count = _ITEM.unpack_from(self._buf, self._items_at + position * _ITEM.size)
+        return range(first, first + count)
+
+    def __len__(self):
+        return self.item_count
+
+    def names(self):
+        """Item names, in library order."""
+        if self._names is None:
+            self._names = [self._value(_ITEM.unpack_from(self._buf, self._items_at + i * _ITEM.size)[0])
+                           for i in range(self.item_count)]
+        return self._names
+
+    def search(self, term):
+        """Positions of items whose name contains `term` (case-insensitive)."""
+        term = term.lower()
+        return [i for i, name in enumerate(self.names()) if term in name.lower()]
+
+    def get_elements(self, position):
+        """Decode the elements of the item at `position`."""
+        if not 0 <= position < self.item_count:
+            raise IndexError(position)
+        _, _, first, count = _ITEM.unpack_from(self._buf, self._items_at + position * _ITEM.size)
+        return [self._element(first + i) for i in range(count)]
+
+    def get(self, position):
+        """Decode the library item at `position`."""
+        if not 0 <= position < self.item_count:
+            raise IndexError(position)
+        name_sid, meta_sid, _, _ = _ITEM.unpack_from(self._buf, self._items_at + position * _ITEM.size)
+        item = dict(self._value(meta_sid))
+        item["name"] = self._value(name_sid)
+        item["elements"] = self.get_elements(position)
+        return item
+
+    def close(self):
+        self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,172 @@
+"""
+Preview document layout.
+Lays library items out on a grid, grouped into sections, and streams the
+resulting elements to an .excalidraw document as items arrive.
+"""
+from functools import partial
+
+from .minify import minify_element
+from .writer import StreamingArrayWriter
+
+PREVIEW_DOCUMENT = {
+    "type": "excalidraw",
+    "version": 2,
+    "source": "https://excalidraw.com",
+    "elements": [],
+    "appState": {
+        "gridSize": None,
+        "viewBackgroundColor": "#ffffff"
+    },
+    "files": {}
+}
+
+
+class PreviewWriter:
+    """Output sink that writes the preview document one library item at a time."""
+
+    def __init__(self, builder, filename, columns=3, spacing=50, indent=2, minify=False, precision=2, compress=()):
+        """
+        Open the preview document.
+
+        Args:
+            builder: ExcalidrawBuilder used to create headers, labels and borders
+            filename: Output .excalidraw path
+            columns: Number of columns in the grid layout
+            spacing: Spacing between items (in pixels)
+            indent: JSON indent (None for compact output)
+            minify: Drop Excalidraw-default fields and quantize coordinates (see builder.minify)
+            precision: Decimal places kept for coordinates when minifying
+            compress: Compressed siblings to write on close ('gz', 'zst')
+        """
+        self.builder = builder
+        self.filename = filename
+        self.columns = columns
+        self.spacing = spacing
+        self.count = 0
+        transform = partial(minify_element, precision=precision) if minify else None
+        self._out = StreamingArrayWriter(
+            filename, PREVIEW_DOCUMENT, "elements", indent=indent, transform=transform, compress=compress
+        )
+
+        self.current_x = spacing
+        self.current_y = spacing
+        self.max_height_in_row = 0
+        self.column_count = 0
+        self.current_section = None
+
+    def write_item(self, item):
+        """Lay out one library item and write its preview elements."""
+        b = self.builder
+        theme = b.theme
+        spacing = self.spacing
+        emit = self._out.write_value
+        item_name = item["name"]
+        self.count += 1
+
+        # Detect section changes (e.g., "A/", "B/", "C/", etc.)
+        section_prefix = item_name.split("/")[0] if "/" in item_name else item_name.split(":")[0]
+
+        # Add section header when section changes
+        if section_prefix != self.current_section:
+            # Move to new row for section header
+            if self.column_count > 0:
+                self.current_y += self.max_height_in_row + spacing * 2
+                self.current_x = spacing
+                self.column_count = 0
+                self.max_height_in_row = 0
+
+            # Create section header
+            emit(b.text(
+                self.current_x,
+                self.current_y,
+                section_prefix,
+                fontSize=24,
+                strokeColor=theme.PRIMARY,
+                extra={"fontWeight": "bold"}
+            ))
+
+            # Underline
+            emit(b.line(
+                self.current_x,
+                self.current_y + 30,
+                [[0, 0], [200, 0]],
+                strokeColor=theme.PRIMARY,
+                strokeWidth=2
+            ))
+
+            self.current_y += 60
+            self.current_section = section_prefix
+
+        # Calculate bounds of the library item
+        item_elements = item["elements"]
+        if not item_elements:
+            return
+
+        min_x = min(el["x"] for el in item_elements)
+        min_y = min(el["y"] for el in item_elements)
+        max_x = max(el["x"] + el.get("width", 0) for el in item_elements)
+        max_y = max(el["y"] + el.get("height", 0) for el in item_elements)
+
+        item_width = max_x - min_x
+        item_height = max_y - min_y
+
+        # Add label above the component
+        emit(b.text(
+            self.current_x,
+            self.current_y,
+            item_name,
+            fontSize=12,
+            strokeColor=theme.MUTED_FG
+        ))
+
+        # Offset elements to current position
+        for el in item_elements:
+            el_copy = el.copy()
+            el_copy["x"] = el["x"] - min_x + self.current_x
+            el_copy["y"] = el["y"] - min_y + self.current_y + 25  # 25px below label
+            el_copy["id"] = b.ids.next_id()  # Generate new ID
+            el_copy["groupIds"] = []  # Clear group IDs
+            emit(el_copy)
+
+        # Add light border around component
+        emit(b.rectangle(
+            self.current_x - 10,
+            self.current_y - 5,
+            max(item_width + 20, 200),
+            item_height + 40,
+            backgroundColor="transparent",
+            strokeColor=theme.BORDER,
+            strokeStyle="dashed",
+            opacity=50
+        ))
+
+        # Update position for next item
+        self.max_height_in_row = max(self.max_height_in_row, item_height + 50)
+        self.column_count += 1
+
+        if self.column_count >= self.columns:
+            # Move to next row
+            self.current_y += self.max_height_in_row + spacing
+            self.current_x = spacing
+            self.column_count = 0
+            self.max_height_in_row = 0
+        else:
+            # Move to next column
+            self.current_x += max(item_width + 40, 300)
+
+    def close(self):
+        """Finish the preview document."""
+        self._out.close()
+
+    def abort(self):
+        """Discard the partial preview document."""
+        self._out.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,227 @@
+"""
+Component registry generation.
+Builds the metadata the wireframing agent uses to search and place
+components (component-registry.json and component-catalog.txt).
+"""
+from pathlib import Path, PurePosixPath
+
+from excalidraw_gen.core import jsonio
+
+REGISTRY_VERSION = '1.0.0'
+
+
+def generate_tags(name: str) -> list[str]:
+    """Generate searchable tags from component name"""
+    tags = []
+    name_lower = name.lower()
+
+    # Extract words from name
+    words = name.replace('/', ' ').replace(':', ' ').replace('(', ' ').replace(')', ' ').split()
+    tags.extend([w.lower() for w in words if len(w) > 2])
+
+    # Common categories
+    tag_map = {
+        'button': ['button', 'action', 'cta'],
+        'input': ['input', 'form', 'field'],
+        'card': ['card', 'container', 'panel'],
+        'table': ['table', 'data', 'grid'],
+        'chart': ['chart', 'graph', 'visualization'],
+        'nav': ['navigation', 'menu', 'navbar'],
+        'sidebar': ['sidebar', 'nav', 'menu'],
+        'header': ['header', 'top', 'navbar'],
+        'login': ['login', 'auth', 'signin'],
+        'dashboard': ['dashboard', 'overview', 'home'],
+        'chat': ['chat', 'message', 'conversation'],
+    }
+
+    for keyword, related_tags in tag_map.items():
+        if keyword in name_lower:
+            tags.extend(related_tags)
+
+    return list(set(tags))
+
+
+def parse_component_name(name: str) -> dict:
+    """Parse hierarchical component name (A/Frame/Desktop or Button: Primary)"""
+    if '/' in name:
+        parts = name.split('/')
+        return {
+            'level': parts[0] if len(parts) > 0 else '',
+            'category': parts[1] if len(parts) > 1 else '',
+            'subcategory': parts[2] if len(parts) > 2 else '',
+            'variant': parts[3] if len(parts) > 3 else ''
+        }
+    elif ':' in name:
+        parts = name.split(':')
+        return {
+            'category': parts[0].strip(),
+            'variant': parts[1].strip() if len(parts) > 1 else ''
+        }
+    else:
+        return {'category': name}
+
+
+def generate_description(name: str, elements: list) -> str:
+    """Generate human-readable description"""
+    # Simple description based on name
+    desc_map = {
+        'button': 'Interactive button component',
+        'input': 'Text input field',
+        'card': 'Container card component',
+        'table': 'Data table component',
+        'chart': 'Chart visualization',
+        'login': 'Login form component',
+        'dashboard': 'Dashboard layout',
+        'frame': 'Device frame container',
+    }
+
+    name_lower = name.lower()
+    for keyword, desc in desc_map.items():
+        if keyword in name_lower:
+            return desc
+
+    return f"Component with {len(elements)} elements"
+
+
+def library_file_label(library_file) -> str:
+    """Registry path of a library file: '<output dir name>/<file name>'."""
+    library_file = Path(library_file)
+    return str(PurePosixPath(library_file.parent.name, library_file.name))
+
+
+def component_entry(item: dict, idx: int, theme_name: str, library_file: str) -> dict:
+    """
+    Build the registry entry for one library item.
+
+    Args:
+        item: Library item ({"name", "elements", ...})
+        idx: Position of the item in the library's libraryItems
+        theme_name: Theme the library was built with
+        library_file: Library path as stored in the registry
+
+    Returns:
+        Registry entry dict, or None for items without elements
+    """
+    name = item.get('name', f'Component-{idx}')
+    elements = item.get('elements', [])
+
+    if not elements:
+        return None
+
+    # Calculate bounding box
+    xs = [el.get('x', 0) for el in elements if 'x' in el]
+    ys = [el.get('y', 0) for el in elements if 'y' in el]
+    widths = [el.get('x', 0) + el.get('width', 0) for el in elements if 'width' in el]
+    heights = [el.get('y', 0) + el.get('height', 0) for el in elements if 'height' in el]
+
+    min_x = min(xs) if xs else 0
+    min_y = min(ys) if ys else 0
+    max_x = max(widths) if widths else 100
+    max_y = max(heights) if heights else 100
+
+    # Extract text elements for customization
+    text_fields = [
+        el.get('text', '')
+        for el in elements
+        if el.get('type') == 'text' and el.get('text')
+    ]
+
+    # Parse category hierarchy
+    category_info = parse_component_name(name)
+
+    return {
+        'id': f"{theme_name}-{idx}",
+        'name': name,
+        'theme': theme_name,
+        'category': category_info.get('category', 'Uncategorized'),
+        'subcategory': category_info.get('subcategory', ''),
+        'description': generate_description(name, elements),
+        'dimensions': {
+            'width': int(max_x - min_x),
+            'height': int(max_y - min_y)
+        },
+        'element_count': len(elements),
+        'text_fields': text_fields,
+        'tags': generate_tags(name),
+        'library_file': library_file,
+        'library_index': idx
+    }
+
+
+class RegistryCollector:
+    """Output sink that collects registry entries as library items are added."""
+
+    def __init__(self, theme_name: str, library_file):
+        """
+        Args:
+            theme_name: Theme the library is built with
+            library_file: Path of the library file the items are written to
+        """
+        self.theme_name = theme_name
+        self.library_file = library_file_label(library_file)
+        self.count = 0
+        self.components = []
+
+    def write_item(self, item: dict):
+        """Record the registry entry for the next library item."""
+        entry = component_entry(item, self.count, self.theme_name, self.library_file)
+        self.count += 1
+        if entry is not None:
+            self.components.append(entry)
+
+    def close(self):
+        pass
+
+
+def build_registry(components: list[dict]) -> dict:
+    """Wrap registry entries from one or more themes into the registry document."""
+    return {
+        'version': REGISTRY_VERSION,
+        'total_components': len(components),
+        'themes': list(dict.fromkeys(c['theme'] for c in components)),
+        'categories': list(dict.fromkeys(c['category'] for c in components)),
+        'components': components
+    }
+
+
+def write_catalog(registry: dict, catalog_file):
+    """Write the human-readable component catalog for the agent prompt."""
+    with open(catalog_file, 'w') as f:
+        f.write("# Wireframe Component Catalog\n\n")
+
+        for theme in registry['themes']:
+            theme_comps = [c for c in registry['components'] if c['theme'] == theme]
+            f.write(f"## Theme: {theme.upper()} ({len(theme_comps)} components)\n\n")
+
+            # Group by category
+            categories = {}
+            for comp in theme_comps:
+                categories.setdefault(comp['category'], []).append(comp)
+
+            for cat, comps in sorted(categories.items()):
+                f.write(f"### {cat} ({len(comps)})\n")
+                for comp in comps[:10]:  # First 10 per category
+                    f.write(f"- {comp['name']} - {comp['description']} ({comp['dimensions']['width']}×{comp['dimensions']['height']}px)\n")
+                if len(comps) > 10:
+                    f.write(f"  ... and {len(comps) - 10} more\n")
+                f.write("\n")
+
+
+def save_registry(components: list[dict], registry_file, catalog_file=None) -> dict:
+    """
+    Write component-registry.json (and optionally the catalog) for the agent backend.
+
+    Args:
+        components: Registry entries, e.g. RegistryCollector.components
+        registry_file: Output path for the registry JSON
+        catalog_file: Output path for the catalog text (skipped if None)
+
+    Returns:
+        The registry document
+    """
+    registry = build_registry(components)
+    Path(registry_file).parent.mkdir(parents=True, exist_ok=True)
+    jsonio.dump(registry, registry_file, pretty=True)
+    if catalog_file is not None:
+        write_catalog(registry, catalog_file)
+    return registry
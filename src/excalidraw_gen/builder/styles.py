@@ -0,0 +1,190 @@
+"""
+Theme-neutral style tokens.
+
+Components are built once against a token theme whose style attributes are
+symbolic tokens ("$PRIMARY", "$ROUGHNESS", ...) instead of concrete values.
+The resulting theme-neutral items are turned into a concrete theme's items by
+resolve_items(), a cheap per-element substitution pass. Only layout attributes
+(integer sizes such as BTN_HEIGHT) are baked into the geometry, so themes that
+share a layout_key() can share one geometry build.
+"""
+
+from .element import Element, element_defaults
+
+TOKEN_PREFIX = "$"
+
+# Integer theme attributes that only affect styling, never geometry
+STYLE_NUMERIC_ATTRS = ('FONT_FAMILY', 'FONT_CODE', 'STROKE_WIDTH', 'ROUGHNESS', 'ROUNDNESS_TYPE')
+
+# Element keys that may hold a token in the theme-neutral form
+STYLE_KEYS = ('strokeColor', 'backgroundColor', 'strokeWidth', 'strokeStyle', 'roughness', 'roundness', 'fontFamily')
+
+# Derived tokens, resolved from other theme attributes
+ROUNDNESS_TOKEN = "$ROUNDNESS"
+TEXT_WIDTH_TOKEN = "$TEXT_WIDTH"
+TEXT_HEIGHT_TOKEN = "$TEXT_HEIGHT"
+
+
+def token(name):
+    """Return the symbolic token for a theme attribute name."""
+    return TOKEN_PREFIX + name
+
+
+def is_token(value):
+    """True if value is a symbolic style token."""
+    return value.__class__ is str and value.startswith(TOKEN_PREFIX)
+
+
+def theme_attrs(theme):
+    """Return all uppercase (constant) attributes of a theme class."""
+    return {name: getattr(theme, name) for name in dir(theme) if name.isupper()}
+
+
+def _is_layout_attr(name, value):
+    return isinstance(value, int) and not isinstance(value, bool) and name not in STYLE_NUMERIC_ATTRS
+
+
+def layout_key(theme):
+    """
+    Key identifying the geometry a theme produces.
+
+    Themes with equal layout keys produce identical theme-neutral items.
+    """
+    return tuple(sorted(
+        (name, value) for name, value in theme_attrs(theme).items()
+        if _is_layout_attr(name, value)
+    ))
+
+
+class _TokenThemeMeta(type):
+    """Any style attribute not set on the class resolves to its token."""
+
+    def __getattr__(cls, name):
+        if name.isupper():
+            return token(name)
+        raise AttributeError(name)
+
+
+def make_token_theme(theme):
+    """
+    Build a token theme with the layout attributes of `theme`.
+
+    Args:
+        theme: Concrete theme class providing the layout (sizing) attributes
+
+    Returns:
+        Theme class whose style attributes are symbolic tokens
+    """
+    layout = dict(layout_key(theme))
+    return _TokenThemeMeta('TokenTheme', (), layout)
+
+
+def is_token_theme(theme):
+    """True if theme was created by make_token_theme()."""
+    return isinstance(theme, _TokenThemeMeta)
+
+
+def rectangle_roundness(theme):
+    """Default rectangle roundness for a theme (or its token)."""
+    if is_token_theme(theme):
+        return ROUNDNESS_TOKEN
+    # Use theme roundness if available, otherwise default to 3
+    roundness_type = getattr(theme, 'ROUNDNESS_TYPE', 3)
+    # Type 1 = sharp corners, set to null for truly boxy
+    if roundness_type == 1:
+        return None
+    return {"type": roundness_type}
+
+
+def default_roundness(theme, type):
+    """Default roundness for elements of `type` in a theme."""
+    if type == "rectangle":
+        return rectangle_roundness(theme)
+    if type == "line" or type == "arrow":
+        return {"type": 2}  # Slight curve
+    return None
+
+
+def build_palette(theme):
+    """Map every token to its value in a concrete theme."""
+    palette = {token(name): value for name, value in theme_attrs(theme).items()}
+    palette[ROUNDNESS_TOKEN] = rectangle_roundness(theme)
+    return palette
+
+
+def _resolve(value, palette, theme):
+    try:
+        return palette[value]
+    except KeyError:
+        raise AttributeError(f"Theme {theme.__module__}.{theme.__name__} has no attribute '{value[len(TOKEN_PREFIX):]}'") from None
+
+
+def resolve_element(element, palette, theme, defaults):
+    """
+    Return a copy of a theme-neutral element with its tokens resolved.
+
+    Args:
+        element: Element (or element dict) built with a token theme
+        palette: Token -> value mapping from build_palette(theme)
+        theme: Concrete theme class
+        defaults: Dict of type -> element defaults for `theme`, filled on demand
+    """
+    from .builder import estimate_text_dimensions
+
+    if not isinstance(element, Element):
+        element = Element.from_dict(element)
+
+    props = dict(element.props)
+    for key in STYLE_KEYS:
+        value = props.get(key)
+        if is_token(value):
+            props[key] = _resolve(value, palette, theme)
+
+    type_defaults = defaults.get(element.type)
+    if type_defaults is None:
+        type_defaults = element_defaults(theme, element.type, default_roundness(theme, element.type))
+        defaults[element.type] = type_defaults
+
+    el = Element(
+        element.id, element.type, element.x, element.y, element.width, element.height,
+        list(element.groupIds), element.seed, element.updated, props, type_defaults
+    )
+
+    # Auto-sized text is measured once its font family is known
+    if el.width == TEXT_WIDTH_TOKEN or el.height == TEXT_HEIGHT_TOKEN:
+        width, height = estimate_text_dimensions(
+            el["text"],
+            font_size=el["fontSize"],
+            font_family=el["fontFamily"]
+        )
+        if el.width == TEXT_WIDTH_TOKEN:
+            el.width = width
+        if el.height == TEXT_HEIGHT_TOKEN:
+            el.height = height
+
+    return el
+
+
+def iter_resolved_items(items, theme):
+    """
+    Resolve theme-neutral library items against a concrete theme, lazily.
+
+    Only overridden properties are substituted; default properties come from
+    the theme's shared defaults.
+
+    Args:
+        items: Library items built with a token theme
+        theme: Concrete theme class
+
+    Yields:
+        New library items; the input items are not modified
+    """
+    palette = build_palette(theme)
+    defaults = {}
+    for item in items:
+        yield {**item, "elements": [resolve_element(el, palette, theme, defaults) for el in item["elements"]]}
+
+
+def resolve_items(items, theme):
+    """Resolve theme-neutral library items against a concrete theme (see iter_resolved_items)."""
+    return list(iter_resolved_items(items, theme))
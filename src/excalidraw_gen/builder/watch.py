@@ -0,0 +1,121 @@
+"""
+Watch mode: rebuild the library whenever a component or theme module changes.
+
+Changed modules are reloaded in place (no cold start), unchanged component
+levels come from the build cache, and outputs are replaced atomically so an
+open Excalidraw tab never reads a half-written file.
+"""
+import importlib
+import sys
+import time
+import traceback
+from pathlib import Path
+
+import excalidraw_gen
+from excalidraw_gen.builder import generate
+
+PACKAGE_DIR = Path(excalidraw_gen.__file__).parent
+WATCH_DIRS = (PACKAGE_DIR / "components", PACKAGE_DIR / "core" / "themes")
+
+
+def watched_files():
+    """Component and theme modules to watch."""
+    return sorted(path for directory in WATCH_DIRS for path in directory.glob("*.py"))
+
+
+def snapshot():
+    """Map each watched file to its modification time (ns)."""
+    mtimes = {}
+    for path in watched_files():
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass  # Removed between glob and stat
+    return mtimes
+
+
+def changed_files(before, after):
+    """Files added, removed or modified between two snapshots."""
+    return sorted(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+
+def _loaded_module(path):
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, "__file__", None)
+        if module_file and Path(module_file).resolve() == path.resolve():
+            return module
+    return None
+
+
+def reload_modules(paths):
+    """
+    Reload the already-imported modules for `paths`.
+
+    Theme modules are followed by the theme package, so AVAILABLE_THEMES
+    points at the reloaded classes. Modules that were never imported are
+    skipped; they are picked up when first used.
+
+    Returns:
+        Names of the reloaded modules
+    """
+    modules = [module for module in map(_loaded_module, paths) if module is not None]
+
+    # A fresh registry forgets every level, so the level modules register again
+    registry = sys.modules.get("excalidraw_gen.components.registry")
+    if registry in modules:
+        levels = [m for m in sys.modules.values() if m is not None and m.__name__.startswith("excalidraw_gen.components.level")]
+        modules = [registry] + [m for m in modules if m is not registry and m not in levels] + levels
+
+    themes = sys.modules.get("excalidraw_gen.core.themes")
+    if themes is not None and any(Path(m.__file__).parent == WATCH_DIRS[1] for m in modules):
+        modules = [m for m in modules if m is not themes] + [themes]
+
+    for module in modules:
+        importlib.reload(module)
+    return [module.__name__ for module in modules]
+
+
+def watch(interval=0.5, **build_kwargs):
+    """
+    Build once, then rebuild on every change until interrupted.
+
+    Errors (e.g. a syntax error mid-edit) are reported and the previous
+    outputs are kept; the next save triggers another attempt.
+
+    Args:
+        interval: Polling interval in seconds
+        **build_kwargs: Arguments for generate.main()
+    """
+    def build():
+        start = time.perf_counter()
+        try:
+            generate.main(**build_kwargs)
+        except Exception:
+            traceback.print_exc()
+            print("❌ Build failed; keeping the previous output")
+            return
+        print(f"⏱️  Rebuilt in {time.perf_counter() - start:.2f}s")
+
+    build()
+    mtimes = snapshot()
+    print(f"\n👀 Watching {len(mtimes)} component and theme modules (Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot()
+            changed = changed_files(mtimes, current)
+            if not changed:
+                continue
+            mtimes = current
+
+            print(f"\n🔄 Changed: {', '.join(path.name for path in changed)}")
+            try:
+                reload_modules(changed)
+            except Exception:
+                traceback.print_exc()
+                print("❌ Reload failed; keeping the previous output")
+                continue
+            build()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
@@ -0,0 +1,144 @@
+"""
+Incremental JSON document writers.
+
+Library items and preview elements are serialized and written one at a time,
+so a document never has to be held in memory as a whole. Elements are
+expanded to full Excalidraw JSON here, at serialization time, through the
+fast JSON backend in core.jsonio. The output is identical to serializing the
+whole document with jsonio.dumpb.
+
+Documents are written to a temporary file beside the target and moved into
+place on close, so readers (e.g. Excalidraw reloading the file) never see a
+partial document.
+"""
+import os
+from functools import partial
+
+from excalidraw_gen.core import jsonio
+from .element import to_json
+from .index import write_index
+from .minify import minify_item, write_compressed
+
+LIBRARY_HEADER = {
+    "type": "excalidrawlib",
+    "version": 2,
+    "source": "https://excalidraw.com",
+}
+
+_PLACEHOLDER = "\0"
+
+
+class StreamingArrayWriter:
+    """Write a JSON object whose top-level `key` array is streamed value by value."""
+
+    def __init__(self, filename, document, key, indent=2, transform=None, compress=()):
+        """
+        Open filename and write everything before the streamed array.
+
+        Args:
+            filename: Output path
+            document: Top-level object; its `key` entry is replaced by the stream
+            key: Name of the top-level array to stream
+            indent: 2 for pretty output, None for compact output
+            transform: Optional callable applied to each value before serializing
+            compress: Compressed siblings to write on close ('gz', 'zst')
+        """
+        if indent not in (2, None):
+            raise ValueError(f"indent must be 2 or None, got {indent!r}")
+        self.filename = filename
+        self.pretty = indent is not None
+        self.transform = transform
+        self.compress = tuple(compress)
+        self.count = 0
+        # Values sit two levels deep: root object -> streamed array
+        self._value_pad = b"\n    " if self.pretty else b""
+        self._close_pad = b"\n  " if self.pretty else b""
+
+        text = jsonio.dumpb({**document, key: _PLACEHOLDER}, pretty=self.pretty)
+        head, tail = text.split(jsonio.dumpb(_PLACEHOLDER), 1)
+        self._tail = b"]" + tail
+
+        self._tmp = f"{filename}.{os.getpid()}.tmp"
+        self._file = open(self._tmp, "wb")
+        self._file.write(head + b"[")
+        self._offset = len(head) + 1
+
+    def write_value(self, value):
+        """
+        Serialize one array value and append it to the file.
+
+        Returns:
+            (offset, length) of the value's bytes in the file
+        """
+        if self.transform is not None:
+            value = self.transform(value)
+        text = jsonio.dumpb(value, pretty=self.pretty, default=to_json)
+        if self._value_pad:
+            text = text.replace(b"\n", self._value_pad)
+        prefix = (b"," if self.count else b"") + self._value_pad
+        self._file.write(prefix + text)
+        offset = self._offset + len(prefix)
+        self._offset = offset + len(text)
+        self.count += 1
+        return offset, len(text)
+
+    def close(self):
+        """Write the closing brackets and atomically replace the target file."""
+        if self._file.closed:
+            return
+        self._file.write((self._close_pad if self.count else b"") + self._tail)
+        self._file.close()
+        os.replace(self._tmp, self.filename)
+        write_compressed(self.filename, self.compress)
+
+    def abort(self):
+        """Discard the partial document, leaving any existing target untouched."""
+        if self._file.closed:
+            return
+        self._file.close()
+        os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class LibraryWriter(StreamingArrayWriter):
+    """
+    Write library items to a .excalidrawlib file as they are produced.
+
+    A sidecar index of every item's byte range is written beside the library
+    on close (see builder.index).
+    """
+
+    def __init__(self, filename, indent=2, minify=False, precision=2, compress=()):
+        """
+        Open filename and write the library header.
+
+        Args:
+            filename: Output .excalidrawlib path
+            indent: JSON indent (None for compact output)
+            minify: Drop Excalidraw-default fields and quantize coordinates (see builder.minify)
+            precision: Decimal places kept for coordinates when minifying
+            compress: Compressed siblings to write on close ('gz', 'zst')
+        """
+        transform = partial(minify_item, precision=precision) if minify else None
+        super().__init__(filename, LIBRARY_HEADER, "libraryItems", indent=indent, transform=transform, compress=compress)
+        self.index = []
+
+    def write_item(self, item):
+        """Serialize one library item and append it to the file."""
+        offset, length = self.write_value(item)
+        self.index.append({"name": item["name"], "id": item.get("id"), "offset": offset, "length": length})
+
+    def close(self):
+        """Finish the library file and write its sidecar index."""
+        if self._file.closed:
+            return
+        super().close()
+        write_index(self.filename, self.index)
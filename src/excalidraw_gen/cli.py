@@ -6,7 +6,11 @@ Generates .excalidrawlib and .excalidraw preview files
 
 import argparse
 from pathlib import Path
-from excalidraw_gen.builder.generate import main as generate_main
+from excalidraw_gen.builder.generate import main as generate_main, build_themes
+from excalidraw_gen.builder.registry import RegistryCollector, save_registry
+from excalidraw_gen.builder.cache import DEFAULT_CACHE_DIR
+from excalidraw_gen.builder.minify import COMPRESSIONS, available_compressions
+from excalidraw_gen.components.registry import Selection
 from excalidraw_gen.core.themes import list_themes
 
 def cli():
@@ -21,6 +25,10 @@ Examples:
   python -m excalidraw_gen --theme abc123-dark    # Dark mode theme
   python -m excalidraw_gen --theme bronzer -c 4   # Bronzer theme, 4 columns
   uv run excalidraw-generate --theme mork         # Using uv (recommended)
+  python -m excalidraw_gen --all-themes           # Every theme, in parallel
+  python -m excalidraw_gen --themes mork,bronzer  # Selected themes, in parallel
+  python -m excalidraw_gen --only "AI:*"          # Only components matching a glob
+  python -m excalidraw_gen --watch                # Rebuild whenever a component or theme changes
         """
     )
     parser.add_argument(
@@ -62,19 +70,193 @@ Examples:
         help='Spacing between items in preview (default: 60)'
     )
 
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Write the library as compact (non-indented) JSON'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed for element ids and roughness seeds (default: a hash of the builder package sources, '
+             'excalidraw_gen/builder/*.py; each level forks its own seed from it)'
+    )
+    parser.add_argument(
+        '--reproducible',
+        action='store_true',
+        help='Stamp elements with timestamp 0 instead of the last commit time when SOURCE_DATE_EPOCH is unset, '
+             'so output does not change between commits (SOURCE_DATE_EPOCH, in seconds, always wins)'
+    )
+    parser.add_argument(
+        '--registry',
+        help='Also write the agent component registry (JSON) to this path, with a catalog beside it'
+    )
+    parser.add_argument(
+        '--all-themes',
+        action='store_true',
+        help='Generate every available theme in parallel (writes to --output-dir)'
+    )
+    parser.add_argument(
+        '--themes',
+        help='Comma-separated list of themes to generate in parallel (writes to --output-dir)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='output',
+        help='Output directory for multi-theme builds (default: output)'
+    )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        type=int,
+        default=None,
+        help='Maximum worker processes: one per theme for multi-theme builds (default: CPU count), '
+             'or per component level for a single theme (default: 1, in-process)'
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f'Directory of the incremental build cache (default: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Rebuild every component without reading or writing the build cache'
+    )
+    parser.add_argument(
+        '--only',
+        action='append',
+        default=[],
+        metavar='GLOB',
+        help='Only build components whose name matches this glob, e.g. "SaaS:*" (repeatable)'
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=[],
+        metavar='GLOB',
+        help='Skip components whose name matches this glob, e.g. "D/Page/*" (repeatable)'
+    )
+    parser.add_argument(
+        '--minify',
+        action='store_true',
+        help='Write compact library and preview without fields Excalidraw restores by default, '
+             'with coordinates rounded to --precision'
+    )
+    parser.add_argument(
+        '--precision',
+        type=int,
+        default=2,
+        help='Decimal places kept for coordinates with --minify (default: 2)'
+    )
+    parser.add_argument(
+        '--compress',
+        default='',
+        metavar='FORMATS',
+        help=f'Also write compressed copies of the outputs: comma-separated {", ".join(COMPRESSIONS)} '
+             '(zst needs the zstandard package)'
+    )
+    parser.add_argument(
+        '--pack',
+        action='store_true',
+        help='Also compile each library into a memory-mappable component pack (<library>.pack) for the backend'
+    )
+    parser.add_argument(
+        '--no-validate',
+        action='store_true',
+        help='Skip the Excalidraw schema check and geometry lint of every item during the build'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Rebuild the library and preview whenever a component or theme module changes'
+    )
+
     args = parser.parse_args()
+    selection = Selection(args.only, args.exclude)
+    cache_dir = None if args.no_cache else args.cache_dir
+    compress = tuple(fmt.strip() for fmt in args.compress.split(',') if fmt.strip())
+    unavailable = [fmt for fmt in compress if fmt not in available_compressions()]
+    if unavailable:
+        parser.error(f"unavailable compression format(s): {', '.join(unavailable)} "
+                     f"(available: {', '.join(available_compressions())})")
+    output_options = {'minify': args.minify, 'precision': args.precision, 'compress': compress, 'pack': args.pack,
+                      'validate': not args.no_validate, 'reproducible': args.reproducible}
+    catalog_file = Path(args.registry).with_name('component-catalog.txt') if args.registry else None
 
     print("🎨 Excalidraw Wireframe Library Generator")
     print("=" * 50)
 
+    if args.watch:
+        if args.all_themes or args.themes or args.registry:
+            parser.error("--watch builds a single theme; it cannot be combined with --all-themes, --themes or --registry")
+
+        from excalidraw_gen.builder.watch import watch
+        watch(
+            theme_name=args.theme,
+            output_file=args.output,
+            preview_file=args.preview,
+            generate_preview=not args.no_preview,
+            columns=args.columns,
+            spacing=args.spacing,
+            compact=args.compact,
+            seed=args.seed,
+            cache_dir=cache_dir,
+            jobs=args.jobs,
+            selection=selection,
+            **output_options
+        )
+        return
+
+    if args.all_themes or args.themes:
+        if args.all_themes:
+            theme_names = list_themes()
+        else:
+            theme_names = [name.strip() for name in args.themes.split(',') if name.strip()]
+            unknown = [name for name in theme_names if name not in list_themes()]
+            if unknown:
+                parser.error(f"unknown theme(s): {', '.join(unknown)} (available: {', '.join(list_themes())})")
+
+        build_themes(
+            theme_names,
+            output_dir=args.output_dir,
+            generate_preview=not args.no_preview,
+            columns=args.columns,
+            spacing=args.spacing,
+            jobs=args.jobs,
+            compact=args.compact,
+            registry_file=args.registry,
+            catalog_file=catalog_file,
+            seed=args.seed,
+            cache_dir=cache_dir,
+            selection=selection,
+            **output_options
+        )
+        return
+
+    registry = RegistryCollector(args.theme, args.output) if args.registry else None
+
     generate_main(
         theme_name=args.theme,
         output_file=args.output,
         preview_file=args.preview,
         generate_preview=not args.no_preview,
         columns=args.columns,
-        spacing=args.spacing
+        spacing=args.spacing,
+        compact=args.compact,
+        registry=registry,
+        seed=args.seed,
+        cache_dir=cache_dir,
+        jobs=args.jobs,
+        selection=selection,
+        **output_options
     )
 
+    if registry is not None:
+        save_registry(registry.components, args.registry, catalog_file)
+        print(f"✅ Component registry ({len(registry.components)} components) saved to {args.registry}")
+
 if __name__ == "__main__":
     cli()
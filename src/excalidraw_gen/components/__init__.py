@@ -1,21 +1,28 @@
-from .level0_frames import add_frames
-from .level1_primitives import add_primitives
-from .level2_base_ui import add_base_ui
-from .level3_modules import add_modules
-from .level3_shells import add_shells
-from .level3_organisms import add_organisms
-from .level4_saas import add_saas_blocks
-from .level4_templates import add_templates
-from .level5_ai import add_ai_patterns
+"""
+Component level producers.
 
-__all__ = [
-    'add_frames',
-    'add_primitives',
-    'add_base_ui',
-    'add_modules',
-    'add_shells',
-    'add_organisms',
-    'add_saas_blocks',
-    'add_templates',
-    'add_ai_patterns'
-]
+Accessing a producer here imports only its level module. Reading the
+registry (registry.levels() / get_level()) imports every level module, so
+selective builds load all levels but only run the ones they select.
+"""
+from importlib import import_module
+
+_PRODUCERS = {
+    'add_frames': 'level0_frames',
+    'add_primitives': 'level1_primitives',
+    'add_base_ui': 'level2_base_ui',
+    'add_modules': 'level3_modules',
+    'add_shells': 'level3_shells',
+    'add_organisms': 'level3_organisms',
+    'add_saas_blocks': 'level4_saas',
+    'add_templates': 'level4_templates',
+    'add_ai_patterns': 'level5_ai',
+}
+
+__all__ = list(_PRODUCERS)
+
+
+def __getattr__(name):
+    if name in _PRODUCERS:
+        return getattr(import_module(f"{__name__}.{_PRODUCERS[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(0, "Frames & Layout", provides=("Frame:*", "Layout:*"), tags=("frame", "layout"))
 def add_frames(b):
     """Device Frames & Layout Primitives"""
 
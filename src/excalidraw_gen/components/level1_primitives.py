@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(1, "Primitives", provides=("Type:*", "Icon:*", "A/*"), tags=("typography", "icon", "atom"))
 def add_primitives(b):
     """Typography and Icons"""
     # Typography
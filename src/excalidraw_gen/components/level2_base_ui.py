@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(2, "Base UI", provides=("Button:*", "Control:*", "Form:*", "Input:*", "B/Form/*"), tags=("button", "form", "input"))
 def add_base_ui(b):
     """Buttons, Inputs, Controls"""
     h = Theme.BTN_HEIGHT
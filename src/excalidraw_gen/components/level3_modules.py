@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(3, "Modules", provides=("Module:*", "Nav:*", "Data:*", "Overlay:*", "B/*"), tags=("module", "navigation", "data", "overlay"))
 def add_modules(b):
     """Composite Components (Cards, Navs, Lists)"""
     
@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(3, "Organisms", provides=("C/Header/*", "C/Block/*"), tags=("organism", "block"))
 def add_organisms(b):
     """Higher-order blocks and page sections (C/Block/*, C/Header/*)"""
 
@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(3, "Shells", provides=("C/Shell/*", "C/Block/*"), tags=("shell", "layout"))
 def add_shells(b):
     """App Shell Layouts (C/Shell/*)"""
 
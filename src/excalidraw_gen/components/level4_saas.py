@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(4, "SaaS Patterns", provides=("SaaS:*",), tags=("saas", "pattern"))
 def add_saas_blocks(b):
     """High Level SaaS Patterns"""
     # Sidebar
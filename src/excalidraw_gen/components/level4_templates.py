@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(4, "Templates", provides=("D/Page/*",), tags=("template", "page"))
 def add_templates(b):
     """Full page templates (D/Page/*)"""
 
@@ -1,5 +1,7 @@
 from excalidraw_gen.core.themes.mork import Theme
+from .registry import component_level
 
+@component_level(5, "AI Patterns", provides=("AI:*", "C/Block/*"), tags=("ai", "chat"))
 def add_ai_patterns(b):
     """AI & Chat Patterns"""
     # User Msg
@@ -0,0 +1,158 @@
+"""
+Component registry.
+
+Level producers register themselves with @component_level, which records
+their level, label and the names of the items they produce (as globs)
+without running anything. Registration is eager: the first read of the
+registry imports every level module (importing is cheap; running producers
+is not), and builds use the recorded names to run only the producers that
+can match a Selection (--only / --exclude).
+"""
+from fnmatch import fnmatchcase
+from importlib import import_module
+
+# Modules defining component levels, in library order
+LEVEL_MODULES = (
+    "level0_frames",
+    "level1_primitives",
+    "level2_base_ui",
+    "level3_modules",
+    "level3_shells",
+    "level3_organisms",
+    "level4_saas",
+    "level4_templates",
+    "level5_ai",
+)
+
+_WILDCARDS = "*?["
+
+# Registered levels by producer name, in registration (import) order
+_LEVELS = {}
+
+# Whether every module in LEVEL_MODULES has been imported (and so registered)
+_loaded = False
+
+
+class ComponentLevel:
+    """Metadata for one level producer, recorded at import time."""
+
+    __slots__ = ("name", "level", "label", "provides", "tags", "func")
+
+    def __init__(self, name, level, label, provides, tags, func):
+        self.name = name
+        self.level = level
+        self.label = label
+        self.provides = provides
+        self.tags = tags
+        self.func = func
+
+    @property
+    def module(self):
+        return self.func.__module__
+
+    @property
+    def title(self):
+        """Progress label, e.g. 'Level 3: Modules'."""
+        return f"Level {self.level}: {self.label}"
+
+    def __call__(self, builder):
+        return self.func(builder)
+
+    def __repr__(self):
+        return f"ComponentLevel({self.name!r}, level={self.level}, provides={self.provides!r})"
+
+
+def component_level(level, label, provides, tags=()):
+    """
+    Register a level producer.
+
+    Args:
+        level: Level number (0 = frames ... 5 = AI patterns)
+        label: Human-readable level name
+        provides: Globs covering every item name the producer adds
+        tags: Free-form tags describing the level
+
+    Returns:
+        Decorator that records the function and returns it unchanged
+    """
+    def decorator(func):
+        _LEVELS[func.__name__] = ComponentLevel(func.__name__, level, label, tuple(provides), tuple(tags), func)
+        return func
+    return decorator
+
+
+def _load():
+    """Import every level module once, registering all of their producers."""
+    global _loaded
+    if not _loaded:
+        for module in LEVEL_MODULES:
+            import_module(f"{__package__}.{module}")
+        _loaded = True
+
+
+def levels():
+    """Return every registered ComponentLevel in library order (the first call imports all level modules)."""
+    _load()
+    order = {f"{__package__}.{module}": i for i, module in enumerate(LEVEL_MODULES)}
+    return sorted(_LEVELS.values(), key=lambda level: order[level.module])
+
+
+def get_level(name):
+    """Return the ComponentLevel for a producer name (e.g. 'add_frames')."""
+    _load()
+    try:
+        return _LEVELS[name]
+    except KeyError:
+        raise KeyError(f"Unknown component level: {name}") from None
+
+
+def _literal_prefix(pattern):
+    """Part of a glob before its first wildcard."""
+    for i, char in enumerate(pattern):
+        if char in _WILDCARDS:
+            return pattern[:i]
+    return pattern
+
+
+class Selection:
+    """Glob filters over component names, as given to --only and --exclude."""
+
+    def __init__(self, only=(), exclude=()):
+        self.only = tuple(only)
+        self.exclude = tuple(exclude)
+
+    def __bool__(self):
+        return bool(self.only or self.exclude)
+
+    def __call__(self, name):
+        """True if the component `name` is selected."""
+        if self.only and not any(fnmatchcase(name, pattern) for pattern in self.only):
+            return False
+        return not any(fnmatchcase(name, pattern) for pattern in self.exclude)
+
+    @property
+    def key(self):
+        return (self.only, self.exclude)
+
+    def may_match(self, level):
+        """
+        True unless `level` provably produces no selected component.
+
+        Decided from literal glob prefixes only, so it never skips a level
+        that could produce a selected name.
+        """
+        prefixes = [_literal_prefix(pattern) for pattern in level.provides]
+        if self.only:
+            only = [_literal_prefix(pattern) for pattern in self.only]
+            if not any(p.startswith(o) or o.startswith(p) for p in prefixes for o in only):
+                return False
+
+        # Excludes of the form "Prefix*" can rule out a whole level
+        excluded = [
+            pattern[:-1] for pattern in self.exclude
+            if pattern.endswith("*") and _literal_prefix(pattern) == pattern[:-1]
+        ]
+        return not all(any(p.startswith(e) for e in excluded) for p in prefixes)
+
+    def __repr__(self):
+        return f"Selection(only={self.only!r}, exclude={self.exclude!r})"
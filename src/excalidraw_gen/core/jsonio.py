@@ -0,0 +1,109 @@
+"""
+JSON serialization with a pluggable fast backend.
+
+Uses orjson or msgspec when installed and falls back to the standard library
+otherwise. Every backend writes UTF-8 and formats "pretty" output with a
+two-space indent. Output is the same across backends except for:
+    - floats in exponent form: the standard library writes 1e-05 and 1e+16,
+      orjson 0.00001 and 1e16 (the values read back the same)
+    - NaN and infinities: orjson and msgspec write null, the standard library
+      raises ValueError (NaN is not JSON)
+Integers wider than 64 bits, which orjson and msgspec cannot encode, are
+written by the standard library instead, so every backend accepts them.
+
+Set EXCALIDRAW_JSON=orjson|msgspec|json to force a backend.
+"""
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+_AVAILABLE = {
+    "orjson": orjson is not None,
+    "msgspec": msgspec is not None,
+    "json": True,
+}
+
+
+def _select_backend():
+    forced = os.environ.get("EXCALIDRAW_JSON")
+    if forced:
+        if not _AVAILABLE.get(forced):
+            raise ValueError(f"EXCALIDRAW_JSON={forced!r} is not available. Installed: "
+                             f"{', '.join(name for name, ok in _AVAILABLE.items() if ok)}")
+        return forced
+    return next(name for name, ok in _AVAILABLE.items() if ok)
+
+
+BACKEND = _select_backend()
+
+
+def dumpb(obj, pretty=False, default=None):
+    """
+    Serialize obj to UTF-8 JSON bytes.
+
+    Args:
+        obj: Value to serialize
+        pretty: Indent with two spaces (False: compact, no whitespace)
+        default: Hook converting unsupported objects to serializable values
+
+    Returns:
+        bytes
+
+    Raises:
+        TypeError for unserializable values, ValueError for NaN and infinities
+        with the standard library backend
+    """
+    try:
+        if BACKEND == "orjson":
+            return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if pretty else 0)
+        if BACKEND == "msgspec":
+            data = msgspec.json.encode(obj, enc_hook=default)
+            return msgspec.json.format(data, indent=2) if pretty else data
+    except (TypeError, OverflowError):
+        pass  # E.g. an integer wider than 64 bits; anything really unserializable fails again below
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False, allow_nan=False, default=default).encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False, default=default).encode()
+
+
+def dumps(obj, pretty=False, default=None):
+    """Serialize obj to a JSON string (see dumpb)."""
+    return dumpb(obj, pretty=pretty, default=default).decode()
+
+
+def dump(obj, path, pretty=False, default=None):
+    """Serialize obj to a file path (see dumpb)."""
+    with open(path, "wb") as f:
+        f.write(dumpb(obj, pretty=pretty, default=default))
+
+
+def loads(data):
+    """
+    Parse JSON from str or bytes.
+
+    Raises:
+        ValueError on invalid JSON, whichever backend is in use
+    """
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    if BACKEND == "msgspec":
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(data)
+
+
+def load(path):
+    """Parse a JSON file from a path."""
+    with open(path, "rb") as f:
+        return loads(f.read())
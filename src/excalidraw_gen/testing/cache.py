@@ -0,0 +1,98 @@
+"""
+Incremental validation cache.
+
+Rule findings add up over items (see Rule.item_state), so each item's share
+can be stored and summed again later. Entries are keyed by a hash of the
+item's content; the cache file of a library is tied to the rule-set version
+(the rules' sources and configuration, e.g. the theme's expected roughness),
+and any other version starts empty. Re-validating a library then only runs
+the rules over the items that changed since the last run.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from excalidraw_gen.builder.cache import DEFAULT_CACHE_DIR
+from excalidraw_gen.core import jsonio
+
+# Bump to invalidate every entry after a change to the entry format
+VALIDATION_CACHE_VERSION = 1
+
+
+def _rules_config(rules):
+    return repr([(rule.name, rule.config()) for rule in rules]).encode()
+
+
+def ruleset_version(rules):
+    """Hash of the testing package sources and the rules' configuration."""
+    digest = hashlib.sha256(str(VALIDATION_CACHE_VERSION).encode())
+    for path in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    digest.update(_rules_config(rules))
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """Per-item rule states of one library and rule set, stored as one JSON file."""
+
+    def __init__(self, path, version):
+        self.path = Path(path)
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        try:
+            data = jsonio.load(self.path)
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get('version') == version and isinstance(data.get('items'), dict):
+            self._entries = data['items']
+        else:
+            self._entries = {}
+        self._used = {}
+
+    @classmethod
+    def for_library(cls, library_path, rules, directory=DEFAULT_CACHE_DIR):
+        """
+        Cache of a library file for a rule set.
+
+        Each library and rule configuration gets its own file, so validating
+        with different rule sets does not evict entries of the others.
+        """
+        name = hashlib.sha256(str(Path(library_path).resolve()).encode() + b"\0" + _rules_config(rules))
+        return cls(Path(directory) / 'validation' / f"{name.hexdigest()[:24]}.json", ruleset_version(rules))
+
+    @staticmethod
+    def key(item):
+        """Content hash of a library item."""
+        return hashlib.blake2b(jsonio.dumpb(item), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """
+        Rule states stored for an item.
+
+        Returns:
+            List of Rule.state() dicts in rule order, or None on a miss
+        """
+        states = self._entries.get(key)
+        if states is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used[key] = states
+        return states
+
+    def put(self, key, states):
+        self._used[key] = states
+
+    def save(self):
+        """
+        Write the entries used since the cache was loaded; entries of items
+        no longer in the library are dropped. Skipped when nothing changed.
+        """
+        if not self.misses and self._used.keys() == self._entries.keys():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        jsonio.dump({'version': self.version, 'items': self._used}, tmp)
+        os.replace(tmp, self.path)
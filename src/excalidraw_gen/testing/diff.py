@@ -0,0 +1,192 @@
+"""
+Structural diff between two library builds.
+
+Ids, seeds, nonces and timestamps differ between builds, so a textual diff
+of two .excalidrawlib files is noise. Each item is canonicalized instead:
+volatile fields are dropped, group ids and element references are replaced
+by their position in the item, and fields Excalidraw restores by default are
+filled in (so a minified build compares equal to a full one). Items are
+matched by name, compared by the hash of their canonical form, and only
+changed items are decoded again for a property-level report.
+
+Both libraries are read once, one item at a time, recording the byte range
+of each item; changed items are re-read from those ranges. The diff is
+linear in the libraries' size and needs no sidecar index.
+
+    python -m excalidraw_gen.testing.diff old.excalidrawlib new.excalidrawlib
+"""
+import argparse
+import hashlib
+import sys
+
+from excalidraw_gen.builder.minify import EXCALIDRAW_DEFAULTS
+from excalidraw_gen.core import jsonio
+from excalidraw_gen.testing.schema import iter_array_spans
+
+VOLATILE_ELEMENT_FIELDS = frozenset({"id", "seed", "version", "versionNonce", "updated"})
+VOLATILE_ITEM_FIELDS = frozenset({"id", "created"})
+
+
+def canonical_elements(elements):
+    """
+    Build-independent form of an item's elements.
+
+    Volatile fields are dropped; groupIds, containerId and boundElements ids
+    are replaced by positions (first-seen group order, element index).
+    """
+    element_index = {el.get("id"): i for i, el in enumerate(elements)}
+    group_index = {}
+    canonical = []
+    for el in elements:
+        el = {**EXCALIDRAW_DEFAULTS, **el}
+        out = {key: el[key] for key in sorted(el) if key not in VOLATILE_ELEMENT_FIELDS}
+        out["groupIds"] = [group_index.setdefault(g, len(group_index)) for g in el["groupIds"] or ()]
+        if out.get("containerId") is not None:
+            out["containerId"] = element_index.get(out["containerId"], out["containerId"])
+        if out["boundElements"]:
+            out["boundElements"] = [
+                {**bound, "id": element_index.get(bound.get("id"), bound.get("id"))} for bound in out["boundElements"]
+            ]
+        else:
+            out["boundElements"] = None  # [] and null restore the same
+        canonical.append(out)
+    return canonical
+
+
+def canonical_item(item):
+    """Build-independent form of a library item (see canonical_elements)."""
+    meta = {key: item[key] for key in sorted(item) if key not in VOLATILE_ITEM_FIELDS and key != "elements"}
+    return {**meta, "elements": canonical_elements(item.get("elements", []))}
+
+
+def item_hash(item):
+    """Content hash of an item's canonical form."""
+    return hashlib.blake2b(jsonio.dumpb(canonical_item(item)), digest_size=16).hexdigest()
+
+
+def fingerprint_library(path):
+    """
+    {item key: (hash, byte offset, byte length)} for a library, read one item at a time.
+
+    Items are keyed by name; repeated names get " #2", " #3", ... in order.
+    """
+    fingerprints = {}
+    seen = {}
+    for item, offset, length in iter_array_spans(path, "libraryItems"):
+        name = item.get("name", "")
+        seen[name] = seen.get(name, 0) + 1
+        key = name if seen[name] == 1 else f"{name} #{seen[name]}"
+        fingerprints[key] = (item_hash(item), offset, length)
+    return fingerprints
+
+
+def _read_item(f, offset, length):
+    f.seek(offset)
+    return jsonio.loads(f.read(length))
+
+
+def element_changes(old_elements, new_elements):
+    """
+    Property differences between two versions of an item's elements, aligned by index.
+
+    Returns:
+        List of {"index", "type", "changes": {property: [old, new]}} for changed
+        elements; added or removed elements have "added"/"removed" instead of changes
+    """
+    old, new = canonical_elements(old_elements), canonical_elements(new_elements)
+    changes = []
+    for index in range(max(len(old), len(new))):
+        if index >= len(old):
+            changes.append({"index": index, "type": new[index].get("type"), "added": True})
+        elif index >= len(new):
+            changes.append({"index": index, "type": old[index].get("type"), "removed": True})
+        elif old[index] != new[index]:
+            a, b = old[index], new[index]
+            diff = {key: [a.get(key), b.get(key)] for key in sorted(a.keys() | b.keys()) if a.get(key) != b.get(key)}
+            changes.append({"index": index, "type": b.get("type"), "changes": diff})
+    return changes
+
+
+def _item_changes(key, old_item, new_item):
+    """Changed-item entry of diff_libraries(): element changes plus changed item fields."""
+    entry = {"name": key, "elements": element_changes(old_item.get("elements", []), new_item.get("elements", []))}
+    meta = {field: [old_item.get(field), new_item.get(field)]
+            for field in sorted(old_item.keys() | new_item.keys())
+            if field not in VOLATILE_ITEM_FIELDS and field != "elements" and old_item.get(field) != new_item.get(field)}
+    if meta:
+        entry["item"] = meta
+    return entry
+
+
+def diff_libraries(old_path, new_path):
+    """
+    Compare two library builds.
+
+    Returns:
+        {"added": [names], "removed": [names], "changed": [{"name", "elements"}],
+         "unchanged": count}; "elements" is the element_changes() report
+    """
+    old = fingerprint_library(old_path)
+    new = fingerprint_library(new_path)
+
+    changed_keys = [key for key in new if key in old and old[key][0] != new[key][0]]
+    changed = []
+    if changed_keys:
+        with open(old_path, "rb") as old_file, open(new_path, "rb") as new_file:
+            for key in changed_keys:
+                old_item = _read_item(old_file, *old[key][1:])
+                new_item = _read_item(new_file, *new[key][1:])
+                changed.append(_item_changes(key, old_item, new_item))
+
+    return {
+        "added": [key for key in new if key not in old],
+        "removed": [key for key in old if key not in new],
+        "changed": changed,
+        "unchanged": sum(1 for key in new if key in old and old[key][0] == new[key][0]),
+    }
+
+
+def print_diff(diff, max_changes=8):
+    """Print a diff_libraries() report."""
+    for name in diff["added"]:
+        print(f"+ {name}")
+    for name in diff["removed"]:
+        print(f"- {name}")
+    for entry in diff["changed"]:
+        print(f"~ {entry['name']}")
+        for field, (a, b) in entry.get("item", {}).items():
+            print(f"    item {field}: {a!r} -> {b!r}")
+        for element in entry["elements"]:
+            label = f"    element {element['index']} ({element['type']})"
+            if element.get("added"):
+                print(f"{label} added")
+            elif element.get("removed"):
+                print(f"{label} removed")
+            else:
+                changes = list(element["changes"].items())
+                shown = ", ".join(f"{key}: {a!r} -> {b!r}" for key, (a, b) in changes[:max_changes])
+                more = f", ... {len(changes) - max_changes} more" if len(changes) > max_changes else ""
+                print(f"{label} {shown}{more}")
+    print(f"\n{len(diff['added'])} added, {len(diff['removed'])} removed, "
+          f"{len(diff['changed'])} changed, {diff['unchanged']} unchanged")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Structural diff between two .excalidrawlib builds')
+    parser.add_argument('old', help='Library from the base build')
+    parser.add_argument('new', help='Library from the new build')
+    parser.add_argument('--json', action='store_true', help='Print the diff as JSON')
+    parser.add_argument('--exit-code', action='store_true', help='Exit with 1 if the libraries differ')
+    args = parser.parse_args(argv)
+
+    diff = diff_libraries(args.old, args.new)
+    if args.json:
+        print(jsonio.dumps(diff, pretty=True))
+    else:
+        print_diff(diff)
+    differs = bool(diff["added"] or diff["removed"] or diff["changed"])
+    return not (args.exit_code and differs)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
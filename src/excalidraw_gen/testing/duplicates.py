@@ -0,0 +1,225 @@
+"""
+Near-duplicate component detection.
+
+Each item gets a structural fingerprint: a set of shingles for its elements
+(type by cell of a coarse grid over the item's bounding box, type by size
+relative to the item, stroke and fill of shapes, and the type of the element
+above), plus the item's aspect ratio in powers of two. Labels are left out by
+default: components drawn alike but labelled differently are the duplicates
+worth finding, and same-labelled primitives are not. Items are compared through
+MinHash signatures bucketed with locality-sensitive hashing, so only items
+sharing a bucket are compared (on their exact Jaccard similarity) and the lint
+stays roughly linear in the number of items.
+
+    python -m excalidraw_gen.testing.duplicates output/mork-wireframe-kit.excalidrawlib
+"""
+import argparse
+import hashlib
+import math
+import random
+import re
+import sys
+
+from excalidraw_gen.core import jsonio
+from excalidraw_gen.testing.schema import iter_array
+
+GRID = 6                # Positions are compared on a GRID x GRID grid over the item
+MIN_ELEMENTS = 3        # Smaller items (icons, buttons) are not compared
+MAX_REPEATS = 2         # A shingle counts at most this often: "one" and "several"
+NUM_PERM = 128          # MinHash signature length
+BANDS = 32              # LSH bands (NUM_PERM / BANDS rows each)
+DEFAULT_THRESHOLD = 0.6
+# Relative size bins (share of the item's width or height)
+_SIZE_BINS = (0.15, 0.5, 0.9)
+
+_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+
+def _bin(value, edges):
+    for i, edge in enumerate(edges):
+        if value < edge:
+            return i
+    return len(edges)
+
+
+def fingerprint(item, grid=GRID, words=False):
+    """
+    Structural shingles of a library item.
+
+    Geometry is taken relative to the item's bounding box, so the same
+    component drawn at another place or scale fingerprints the same. A
+    shingle repeated up to MAX_REPEATS times is numbered, so a list differs
+    from a single row while lists of three and five rows do not.
+
+    Args:
+        grid: Cells per side of the position grid
+        words: Also add the words of the item's text
+
+    Returns:
+        Set of shingles (empty for items under MIN_ELEMENTS elements)
+    """
+    elements = [el.to_dict() if hasattr(el, "to_dict") else el for el in item.get("elements", ())]
+    elements = [el for el in elements if not el.get("isDeleted")]
+    if len(elements) < MIN_ELEMENTS:
+        return set()
+    left = min(el.get("x", 0) for el in elements)
+    top = min(el.get("y", 0) for el in elements)
+    width = max(el.get("x", 0) + el.get("width", 0) for el in elements) - left or 1
+    height = max(el.get("y", 0) + el.get("height", 0) for el in elements) - top or 1
+
+    shingles = set()
+
+    def add(shingle):
+        count = 1
+        while (shingle, count) in shingles:
+            count += 1
+        if count <= MAX_REPEATS:
+            shingles.add((shingle, count))
+
+    add(f"aspect:{round(math.log2(width / height))}")
+    above = "^"
+    # Reading order, so the "above" shingles follow the layout rather than the drawing order
+    for el in sorted(elements, key=lambda el: (el.get("y", 0), el.get("x", 0))):
+        kind = el.get("type")
+        col = min(grid - 1, int((el.get("x", 0) - left) / width * grid))
+        row = min(grid - 1, int((el.get("y", 0) - top) / height * grid))
+        add(f"{kind}@{col},{row}")
+        add(f"{kind}:{_bin(el.get('width', 0) / width, _SIZE_BINS)}x{_bin(el.get('height', 0) / height, _SIZE_BINS)}")
+        if kind != "text":
+            add(f"{kind}/{el.get('strokeColor')}/{el.get('backgroundColor')}")
+        add(f"{above}>{kind}")
+        above = kind
+        if words:
+            for word in _WORD.findall(el.get("text", "").lower()):
+                add(f"w:{word}")
+    return {f"{shingle}#{count}" for shingle, count in shingles}
+
+
+def _hash64(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """MinHash signatures over string sets, with fixed (reproducible) permutations."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingles):
+        """Signature of a shingle set (all-max for the empty set)."""
+        hashes = [_hash64(shingle) for shingle in shingles]
+        if not hashes:
+            return (_PRIME,) * self.num_perm
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self.permutations)
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of the sets behind two signatures."""
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / len(signature_a)
+
+
+def jaccard(shingles_a, shingles_b):
+    """Jaccard similarity of two shingle sets."""
+    union = len(shingles_a | shingles_b)
+    return len(shingles_a & shingles_b) / union if union else 0.0
+
+
+def find_near_duplicates(items, threshold=DEFAULT_THRESHOLD, bands=BANDS, hasher=None, words=False):
+    """
+    Clusters of near-identical items.
+
+    Args:
+        items: Iterable of library items (consumed once)
+        threshold: Minimum Jaccard similarity of two items' fingerprints; LSH buckets
+            pick the candidate pairs, whose exact similarity is then checked
+        bands: LSH bands; more bands find lower similarities at more comparisons
+        hasher: MinHasher (default: NUM_PERM permutations)
+        words: Compare the items' text as well (see fingerprint())
+
+    Returns:
+        List of {"items": [names], "positions": [...], "similarity": lowest similarity of
+        any two members}, largest clusters first
+    """
+    hasher = hasher or MinHasher()
+    rows = hasher.num_perm // bands
+    names, fingerprints = [], []
+    buckets = {}
+    for position, item in enumerate(items):
+        shingles = fingerprint(item, words=words)
+        names.append(item.get("name", ""))
+        fingerprints.append(shingles)
+        if not shingles:
+            continue  # Empty and small items are not compared
+        signature = hasher.signature(shingles)
+        for band in range(bands):
+            buckets.setdefault((band, signature[band * rows:(band + 1) * rows]), []).append(position)
+
+    # Candidate pairs passing the threshold, most similar first
+    scores = {}
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if (a, b) not in scores:
+                    scores[(a, b)] = jaccard(fingerprints[a], fingerprints[b])
+    edges = sorted((-score, a, b) for (a, b), score in scores.items() if score >= threshold)
+
+    def score(a, b):
+        pair = (a, b) if a < b else (b, a)
+        if pair not in scores:
+            scores[pair] = jaccard(fingerprints[a], fingerprints[b])
+        return scores[pair]
+
+    # Complete linkage: two clusters merge only if every cross pair meets the
+    # threshold, so every member is similar to every other (no chaining)
+    cluster_of = {}
+    for _, a, b in edges:
+        cluster_a = cluster_of.setdefault(a, [a])
+        cluster_b = cluster_of.setdefault(b, [b])
+        if cluster_a is cluster_b or any(score(x, y) < threshold for x in cluster_a for y in cluster_b):
+            continue
+        cluster_a.extend(cluster_b)
+        for position in cluster_b:
+            cluster_of[position] = cluster_a
+
+    clusters = {id(members): sorted(members) for members in cluster_of.values() if len(members) > 1}
+    result = [
+        {"items": [names[p] for p in members], "positions": members,
+         "similarity": round(min(score(x, y) for i, x in enumerate(members) for y in members[i + 1:]), 3)}
+        for members in clusters.values()
+    ]
+    result.sort(key=lambda cluster: (-len(cluster["positions"]), cluster["positions"][0]))
+    return result
+
+
+def library_near_duplicates(path, threshold=DEFAULT_THRESHOLD, words=False):
+    """find_near_duplicates() over a library file, read one item at a time."""
+    return find_near_duplicates(iter_array(path, "libraryItems"), threshold, words=words)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report clusters of near-duplicate library components')
+    parser.add_argument('libraries', nargs='+', help='.excalidrawlib files')
+    parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum similarity, 0-1 (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--words', action='store_true', help='Compare the components\' text as well as their structure')
+    parser.add_argument('--json', action='store_true', help='Print clusters as JSON')
+    parser.add_argument('--strict', action='store_true', help='Exit with 1 if any cluster is found')
+    args = parser.parse_args(argv)
+
+    report = {path: library_near_duplicates(path, args.threshold, args.words) for path in args.libraries}
+    if args.json:
+        print(jsonio.dumps(report, pretty=True))
+    else:
+        for path, clusters in report.items():
+            print(f"📚 {path}: {len(clusters)} near-duplicate cluster(s)")
+            for cluster in clusters:
+                print(f"  ≈ {cluster['similarity']:.2f}: {', '.join(cluster['items'])}")
+    found = any(report.values())
+    return not (args.strict and found)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,227 @@
+"""
+Geometry lint for library items.
+
+Finds text placed by hand in the wrong spot:
+    - text overlapping other text
+    - text partially covering a shape it does not sit inside
+    - text wider or taller than the shape it starts in (measured with builder.metrics)
+    - elements crossing the edge of the item's frame (a first rectangle enclosing the rest)
+
+Shapes overlapping shapes are not reported: stacking and nesting them is how
+components are drawn. Candidate pairs come from a sweep over x: boxes the
+sweep has passed leave a heap ordered by right edge, and the open boxes are
+kept in y-sorted lists per height class, so a new box only visits open boxes
+near its own y-range. Stacked rows (lists, tables, sidebars) cost
+O(n log n) rather than a comparison with every box open on x.
+
+    python -m excalidraw_gen.testing.geometry output/mork-wireframe-kit.excalidrawlib
+"""
+import argparse
+import heapq
+import sys
+from bisect import bisect_left, bisect_right, insort
+
+from excalidraw_gen.builder.metrics import FONT_VIRGIL, measure_text
+from excalidraw_gen.core import jsonio
+from excalidraw_gen.testing.schema import iter_array
+
+SHAPE_TYPES = ("rectangle", "ellipse", "diamond")
+TOLERANCE = 2  # px; boxes closer than this are touching, not overlapping
+
+
+class Box:
+    """Axis-aligned bounds of one element."""
+    __slots__ = ("index", "type", "left", "top", "right", "bottom")
+
+    def __init__(self, index, type, left, top, right, bottom):
+        self.index = index
+        self.type = type
+        self.left, self.top, self.right, self.bottom = left, top, right, bottom
+
+    def contains(self, other, tolerance=TOLERANCE):
+        return (other.left >= self.left - tolerance and other.right <= self.right + tolerance
+                and other.top >= self.top - tolerance and other.bottom <= self.bottom + tolerance)
+
+    def contains_point(self, x, y):
+        return self.left <= x <= self.right and self.top <= y <= self.bottom
+
+    def overlaps(self, other, tolerance=TOLERANCE):
+        return (min(self.right, other.right) - max(self.left, other.left) > tolerance
+                and min(self.bottom, other.bottom) - max(self.top, other.top) > tolerance)
+
+    @property
+    def area(self):
+        return (self.right - self.left) * (self.bottom - self.top)
+
+
+def element_box(index, el):
+    """
+    Bounds of an element; text uses its measured ink box, placed by textAlign
+    within the element's width (as Excalidraw renders unbound text).
+    """
+    x, y = el.get("x", 0), el.get("y", 0)
+    width, height = el.get("width", 0), el.get("height", 0)
+    if el.get("type") == "text":
+        ink_width, ink_height = measure_text(el.get("text", ""), el.get("fontSize", 20),
+                                             el.get("fontFamily", FONT_VIRGIL), padding=0)
+        align = el.get("textAlign", "left")
+        if align == "center":
+            x += (width - ink_width) / 2
+        elif align == "right":
+            x += width - ink_width
+        return Box(index, "text", x, y, x + ink_width, y + ink_height)
+    if el.get("points"):
+        xs = [x + px for px, _ in el["points"]]
+        ys = [y + py for _, py in el["points"]]
+        return Box(index, el.get("type"), min(xs), min(ys), max(xs), max(ys))
+    return Box(index, el.get("type"), x, y, x + width, y + height)
+
+
+def _height_class(box):
+    # Heights within a class differ by less than 2x; class c holds heights in [2**(c-1), 2**c)
+    return max(0, int(box.bottom - box.top)).bit_length()
+
+
+def overlapping_pairs(boxes, tolerance=TOLERANCE):
+    """
+    Pairs of boxes that overlap, via a sweep over x.
+
+    Boxes are visited by left edge; boxes whose right edge the sweep has
+    passed are popped from a heap. Open boxes are also kept sorted by top edge
+    in one list per height class, so a new box only looks at the open boxes of
+    each class whose top lies within that class's maximum height above it.
+    """
+    open_boxes = []  # heap of (right, index, box)
+    by_class = {}    # height class -> sorted [(top, index, box)] of open boxes
+    pairs = []
+    for box in sorted(boxes, key=lambda b: b.left):
+        while open_boxes and open_boxes[0][0] <= box.left + tolerance:
+            _, index, other = heapq.heappop(open_boxes)
+            column = by_class[_height_class(other)]
+            del column[bisect_left(column, (other.top, index))]
+        for height_class, column in by_class.items():
+            max_height = 1 << height_class
+            start = bisect_left(column, (box.top - max_height,))
+            end = bisect_right(column, (box.bottom, float("inf")))
+            for _, _, other in column[start:end]:
+                if box.overlaps(other, tolerance):
+                    pairs.append((other, box) if other.index < box.index else (box, other))
+        heapq.heappush(open_boxes, (box.right, box.index, box))
+        insort(by_class.setdefault(_height_class(box), []), (box.top, box.index, box))
+    return pairs
+
+
+def _label(el, index):
+    text = el.get("text")
+    return f"{el.get('type')} {index}" + (f" {text!r}" if text else "")
+
+
+def lint_item(item, tolerance=TOLERANCE):
+    """
+    Geometry problems in one library item.
+
+    Returns:
+        List of messages prefixed with the item name
+    """
+    elements = [el.to_dict() if hasattr(el, "to_dict") else el for el in item.get("elements", ())]
+    # Bound text is laid out by Excalidraw inside its container
+    boxes = [element_box(i, el) for i, el in enumerate(elements)
+             if not el.get("isDeleted") and el.get("containerId") is None]
+    if not boxes:
+        return []
+    name = item.get("name", "")
+    problems = []
+
+    # Text against text and shapes
+    partial = {}
+    contained = set()  # Texts lying entirely inside some shape
+    for a, b in overlapping_pairs(boxes, tolerance):
+        if a.type == "text" and b.type == "text":
+            problems.append(f"{_label(elements[a.index], a.index)} overlaps {_label(elements[b.index], b.index)}")
+            continue
+        text, shape = (a, b) if a.type == "text" else (b, a)
+        if text.type != "text" or shape.type not in SHAPE_TYPES:
+            continue
+        if shape.contains(text, tolerance):
+            contained.add(text.index)
+        elif not text.contains(shape, tolerance):
+            partial.setdefault(text.index, []).append(shape)
+
+    by_index = {box.index: box for box in boxes}
+    reported = set()  # Overflowing texts are not reported again as out of frame
+    for text_index, crossed in sorted(partial.items()):
+        text = by_index[text_index]
+        # A text lying wholly inside a shape is in its container there
+        if text_index in contained:
+            holders = []
+        else:
+            holders = [shape for shape in crossed if shape.contains_point(text.left, text.top)]
+        label = _label(elements[text_index], text_index)
+        if holders:
+            container = min(holders, key=lambda shape: shape.area)
+            problems.append(
+                f"{label} overflows {_label(elements[container.index], container.index)} "
+                f"({text.right - text.left:.0f}x{text.bottom - text.top:.0f} text in a "
+                f"{container.right - container.left:.0f}x{container.bottom - container.top:.0f} box)"
+            )
+            crossed = [shape for shape in crossed if shape is not container]
+            reported.add(text_index)
+        for shape in crossed:
+            problems.append(f"{label} overlaps {_label(elements[shape.index], shape.index)}")
+
+    # Elements crossing the frame edge (a first rectangle enclosing most of the item);
+    # elements entirely outside it, such as captions, are deliberate
+    frame = boxes[0]
+    if frame.type == "rectangle" and len(boxes) > 1:
+        inside = sum(frame.contains(box, tolerance) for box in boxes[1:])
+        if inside * 2 >= len(boxes) - 1:
+            for box in boxes[1:]:
+                if box.index not in reported and frame.overlaps(box, tolerance) and not frame.contains(box, tolerance):
+                    problems.append(f"{_label(elements[box.index], box.index)} sticks out of the frame")
+
+    return [f"{name}: {problem}" for problem in problems]
+
+
+class GeometryLinter:
+    """Builder sink collecting geometry problems of every emitted item (see lint_item)."""
+
+    def __init__(self):
+        self.count = 0
+        self.problems = []
+
+    def write_item(self, item):
+        self.count += 1
+        self.problems.extend(lint_item(item))
+
+    def close(self):
+        pass
+
+
+def lint_library(path):
+    """lint_item() over a library file, read one item at a time."""
+    problems = []
+    for item in iter_array(path, "libraryItems"):
+        problems.extend(lint_item(item))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report overlapping, overflowing and out-of-frame elements')
+    parser.add_argument('libraries', nargs='+', help='.excalidrawlib files')
+    parser.add_argument('--json', action='store_true', help='Print problems as JSON')
+    parser.add_argument('--strict', action='store_true', help='Exit with 1 if any problem is found')
+    args = parser.parse_args(argv)
+
+    report = {path: lint_library(path) for path in args.libraries}
+    if args.json:
+        print(jsonio.dumps(report, pretty=True))
+    else:
+        for path, problems in report.items():
+            print(f"📚 {path}: {len(problems)} geometry problem(s)")
+            for problem in problems:
+                print(f"  ⚠️  {problem}")
+    return not (args.strict and any(report.values()))
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,27 +1,219 @@
 """
 Component inspector utility.
-Pretty-print component JSON for debugging.
+Query, pretty-print and compare components for debugging.
+
+Queries are served from each library's component pack (see builder.pack),
+memory-mapped so repeated invocations skip JSON parsing and decode only the
+items they touch. A fresh pack next to the library (generate --pack) is used
+as is; otherwise one is compiled into the cache directory on first use, and
+nothing is written beside the library. --where predicates read the pack's
+columns directly instead of decoding whole elements.
+
+    python -m excalidraw_gen.testing.inspector Button
+    python -m excalidraw_gen.testing.inspector "SaaS:*" --where type=text --where "fontSize>=16"
+    python -m excalidraw_gen.testing.inspector "^AI: .*Chat" --regex --json
+    python -m excalidraw_gen.testing.inspector "Button: Primary" --compare
+    python -m excalidraw_gen.testing.inspector "SaaS:*" --compare --where type=text -l a.excalidrawlib -l b.excalidrawlib
 """
-import json
+import argparse
+import hashlib
+import operator
+import re
 import sys
+from fnmatch import fnmatchcase
 from pathlib import Path
 
+from excalidraw_gen.builder.cache import DEFAULT_CACHE_DIR
+from excalidraw_gen.builder.index import LibraryReader
+from excalidraw_gen.builder.pack import PACK_SUFFIX, ComponentPack, build_pack
+from excalidraw_gen.core import jsonio
+
+# Properties shown for each element type (and compared across themes)
+SHOWN_PROPERTIES = {
+    'rectangle': ('width', 'height', 'x', 'y', 'roundness', 'roughness', 'backgroundColor', 'strokeColor'),
+    'ellipse': ('width', 'height', 'x', 'y'),
+    'text': ('text', 'fontSize', 'fontFamily'),
+}
+COMPARED_PROPERTIES = ('roundness', 'roughness', 'backgroundColor', 'strokeColor')
+
+_OPERATORS = {
+    '!=': operator.ne, '>=': operator.ge, '<=': operator.le,
+    '=': operator.eq, '>': operator.gt, '<': operator.lt, '~': None,
+}
+# Longest operators first, so ">=" is not read as ">"
+_PREDICATE = re.compile(r"^\s*([\w.]+)\s*(!=|>=|<=|=|>|<|~)\s*(.*?)\s*$", re.DOTALL)
+
+_readers = {}
+
+
+def cached_pack_path(library_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Path of the pack compiled for a library inside the cache directory."""
+    name = hashlib.blake2b(str(Path(library_path).resolve()).encode(), digest_size=8).hexdigest()
+    return Path(cache_dir) / "packs" / f"{name}{PACK_SUFFIX}"
+
+
+def open_library(library_path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Indexed reader for a library, shared within the process.
+
+    Uses the pack next to the library when it is fresh, else the library's pack
+    in `cache_dir`, compiling it there first when it is missing or stale. Falls
+    back to the sidecar JSON index without a cache_dir or if the pack cannot be
+    written.
+    """
+    key = (str(Path(library_path).resolve()), None if cache_dir is None else str(cache_dir))
+    reader = _readers.get(key)
+    if reader is None:
+        reader = ComponentPack.for_library(library_path)
+        if reader is None and cache_dir is not None:
+            path = cached_pack_path(library_path, cache_dir)
+            reader = ComponentPack.for_library(library_path, path)
+            if reader is None:
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    reader = ComponentPack(build_pack(library_path, path))
+                except OSError:
+                    reader = None
+        if reader is None:
+            reader = LibraryReader(library_path)
+        _readers[key] = reader
+    return reader
+
+
+def name_matcher(pattern, regex=False):
+    """
+    Predicate over component names.
+
+    Args:
+        pattern: Regex (with regex=True), glob if it contains * ? or [, else a
+            case-insensitive substring; None matches everything
+    """
+    if pattern is None:
+        return lambda name: True
+    if regex:
+        compiled = re.compile(pattern, re.IGNORECASE)
+        return lambda name: compiled.search(name) is not None
+    if any(char in pattern for char in '*?['):
+        return lambda name: fnmatchcase(name, pattern)
+    term = pattern.lower()
+    return lambda name: term in name.lower()
+
 
-def inspect_component(library_path: str, search_term: str):
+class _PackedElement:
+    """Element of a component pack whose fields are decoded only when a predicate reads them."""
+
+    __slots__ = ('pack', 'index')
+
+    def __init__(self, pack, index):
+        self.pack = pack
+        self.index = index
+
+    def get(self, key):
+        return self.pack.field(self.index, key)
+
+
+def _field(el, path):
+    first, *rest = path.split('.')
+    value = el.get(first)
+    for part in rest:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def parse_predicate(expression):
+    """
+    Element predicate from an expression such as "type=text", "fontSize>=16",
+    "roundness.type=3", "strokeColor!=#09090b" or "text~Sign in" (substring).
+
+    Values are parsed as JSON when possible (numbers, null, true/false).
+    """
+    parsed = _PREDICATE.match(expression)
+    if parsed is None:
+        raise ValueError(f"Invalid predicate {expression!r} (expected FIELD OP VALUE with =, !=, <, <=, >, >=, ~)")
+    field, symbol, raw = parsed.groups()
+    compare = _OPERATORS[symbol]
+    if compare is None:
+        term = raw.lower()
+        return lambda el: isinstance(_field(el, field), str) and term in _field(el, field).lower()
+    try:
+        value = jsonio.loads(raw)
+    except ValueError:
+        value = raw
+
+    def predicate(el):
+        actual = _field(el, field)
+        try:
+            return compare(actual, value)
+        except TypeError:  # e.g. None >= 16
+            return False
+    return predicate
+
+
+def query(library_path, pattern=None, regex=False, where=(), cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Find components by name and element attributes.
+
+    Args:
+        library_path: .excalidrawlib file
+        pattern: Name pattern (see name_matcher)
+        regex: Treat `pattern` as a regular expression
+        where: Predicate expressions (see parse_predicate); a component matches
+            if one of its elements satisfies all of them
+        cache_dir: Directory for the library's component pack (see open_library)
+
+    Returns:
+        List of {"position", "name", "elements", "matched"} dicts, where
+        "matched" holds the indexes of the elements satisfying `where`
+    """
+    reader = open_library(library_path, cache_dir)
+    matches_name = name_matcher(pattern, regex)
+    predicates = [parse_predicate(expression) for expression in where]
+
+    results = []
+    for position, name in enumerate(reader.names()):
+        if not matches_name(name):
+            continue
+        if not predicates:
+            results.append({'position': position, 'name': name, 'elements': None, 'matched': []})
+            continue
+        if isinstance(reader, ComponentPack):
+            elements = [_PackedElement(reader, index) for index in reader.element_indexes(position)]
+        else:
+            elements = reader.get_elements(position)
+        matched = [i for i, el in enumerate(elements) if all(predicate(el) for predicate in predicates)]
+        if matched:
+            results.append({'position': position, 'name': name, 'elements': len(elements), 'matched': matched})
+    return results
+
+
+def print_component(item):
+    """Pretty-print a component's key element properties."""
+    print(f"\n{'='*60}")
+    print(f"Component: {item['name']}")
+    print(f"{'='*60}\n")
+
+    print(f"Elements: {len(item['elements'])}")
+    for i, el in enumerate(item['elements'], 1):
+        print(f"\n--- Element {i}: {el['type']} ---")
+        for prop in SHOWN_PROPERTIES.get(el['type'], ()):
+            value = el.get(prop)
+            if prop == 'text' and isinstance(value, str) and len(value) > 50:
+                value = value[:50] + '...'
+            print(f"  {prop}: {value}")
+
+
+def inspect_component(library_path: str, search_term: str, cache_dir: str = DEFAULT_CACHE_DIR):
     """
     Find and pretty-print a component's JSON.
 
     Args:
         library_path: Path to .excalidrawlib file
         search_term: Component name to search for (case-insensitive)
+        cache_dir: Directory for the library's component pack (see open_library)
     """
-    with open(library_path) as f:
-        data = json.load(f)
-
-    matches = []
-    for item in data['libraryItems']:
-        if search_term.lower() in item['name'].lower():
-            matches.append(item)
+    matches = query(library_path, search_term, cache_dir=cache_dir)
 
     if not matches:
         print(f"No components found matching '{search_term}'")
@@ -29,84 +221,139 @@ def inspect_component(library_path: str, search_term: str):
 
     if len(matches) > 1:
         print(f"Found {len(matches)} matches:")
-        for i, item in enumerate(matches, 1):
-            print(f"  {i}. {item['name']}")
+        for i, match in enumerate(matches, 1):
+            print(f"  {i}. {match['name']}")
         print()
 
     # Show first match
-    item = matches[0]
-    print(f"\n{'='*60}")
-    print(f"Component: {item['name']}")
-    print(f"{'='*60}\n")
+    print_component(open_library(library_path, cache_dir).get(matches[0]['position']))
 
-    print(f"Elements: {len(item['elements'])}")
-    for i, el in enumerate(item['elements'], 1):
-        print(f"\n--- Element {i}: {el['type']} ---")
 
-        # Show key properties
-        if el['type'] == 'rectangle':
-            print(f"  Size: {el['width']} x {el['height']}")
-            print(f"  Position: ({el['x']}, {el['y']})")
-            print(f"  roundness: {el.get('roundness')}")
-            print(f"  roughness: {el.get('roughness')}")
-            print(f"  backgroundColor: {el.get('backgroundColor')}")
-            print(f"  strokeColor: {el.get('strokeColor')}")
-        elif el['type'] == 'text':
-            print(f"  text: {el.get('text', '')[:50]}...")
-            print(f"  fontSize: {el.get('fontSize')}")
-            print(f"  fontFamily: {el.get('fontFamily')}")
-        elif el['type'] == 'ellipse':
-            print(f"  Size: {el['width']} x {el['height']}")
-            print(f"  Position: ({el['x']}, {el['y']})")
-
-
-def compare_component_across_themes(component_name: str):
-    """Compare a component across all three themes"""
-    themes = ['default', 'carbon', 'warm']
+def theme_libraries(output_dir='output'):
+    """{theme name: library path} for the themes built in `output_dir`."""
+    from excalidraw_gen.builder.generate import theme_output_paths
+    from excalidraw_gen.core.themes import list_themes
+
+    libraries = {}
+    for theme in list_themes():
+        lib_path, _ = theme_output_paths(theme, output_dir)
+        if lib_path.exists():
+            libraries[theme] = lib_path
+    return libraries
+
+
+def compare_across_themes(pattern, output_dir='output', regex=False, where=(), libraries=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Key properties of the first rectangle of each matching component, per library.
+
+    Args:
+        pattern: Name pattern (see name_matcher)
+        output_dir: Directory of a multi-theme build
+        regex: Treat `pattern` as a regular expression
+        where: Predicate expressions a component must match (see query)
+        libraries: {label: library path} to compare (default: every theme library in output_dir)
+        cache_dir: Directory for the libraries' component packs (see open_library)
+
+    Returns:
+        {component name: {label: {property: value} or None}}
+    """
+    if libraries is None:
+        libraries = theme_libraries(output_dir)
+    comparison = {}
+    for theme, lib_path in libraries.items():
+        reader = open_library(lib_path, cache_dir)
+        for match in query(lib_path, pattern, regex, where, cache_dir):
+            rect = next((el for el in reader.get_elements(match['position']) if el['type'] == 'rectangle'), None)
+            row = comparison.setdefault(match['name'], dict.fromkeys(libraries))
+            row[theme] = {prop: rect.get(prop) for prop in COMPARED_PROPERTIES} if rect else {}
+    return comparison
+
 
+def compare_component_across_themes(component_name: str, output_dir: str = 'output', regex: bool = False,
+                                    where=(), libraries=None, cache_dir: str = DEFAULT_CACHE_DIR):
+    """Compare matching components side by side across every built theme (or the given libraries)"""
     print(f"\n{'='*60}")
-    print(f"Comparing '{component_name}' across themes")
+    print(f"Comparing '{component_name}' across {'libraries' if libraries else 'themes'}")
     print(f"{'='*60}\n")
 
-    for theme in themes:
-        lib_path = f"output/{theme}.excalidrawlib"
-        if not Path(lib_path).exists():
-            print(f"⚠️  {theme}: file not found")
-            continue
+    comparison = compare_across_themes(component_name, output_dir, regex, where, libraries, cache_dir)
+    if not comparison:
+        print(f"No components found matching '{component_name}'")
+        return
+
+    for name, themes in comparison.items():
+        print(f"--- {name} ---")
+        width = max(len(prop) for prop in COMPARED_PROPERTIES) + 2
+        print(" " * width + "".join(f"{theme:<24}" for theme in themes))
+        for prop in COMPARED_PROPERTIES:
+            cells = ["-" if props is None else str(props.get(prop)) for props in themes.values()]
+            print(f"{prop:<{width}}" + "".join(f"{cell:<24}" for cell in cells))
+        print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Query components of generated libraries',
+        epilog='Predicates: FIELD=VALUE, !=, <, <=, >, >=, or FIELD~TEXT (substring); '
+               'nested fields use dots, e.g. roundness.type=3'
+    )
+    parser.add_argument('pattern', nargs='?', help='Name substring, glob (e.g. "SaaS:*") or, with --regex, a regex')
+    parser.add_argument('-r', '--regex', action='store_true', help='Treat the pattern as a regular expression')
+    parser.add_argument('-w', '--where', action='append', default=[], metavar='PREDICATE',
+                        help='Element predicate; components with an element matching all of them are listed (repeatable)')
+    parser.add_argument('-l', '--library', action='append', default=[],
+                        help='Library to query (repeatable; default: every theme library in --output-dir)')
+    parser.add_argument('--output-dir', default='output', help='Directory of a multi-theme build (default: output)')
+    parser.add_argument('--show', action='store_true', help='Pretty-print every matching component')
+    parser.add_argument('--compare', action='store_true', help='Compare matching components side by side across themes (or the --library files)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory for compiled component packs (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not compile packs; read libraries through their JSON index')
+    args = parser.parse_args(argv)
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    if args.compare:
+        if not args.pattern:
+            parser.error("--compare needs a component name pattern")
+        libraries = {path: Path(path) for path in args.library} or None
+        try:
+            if not args.json:
+                compare_component_across_themes(args.pattern, args.output_dir, args.regex, args.where, libraries, cache_dir)
+                return True
+            comparison = compare_across_themes(args.pattern, args.output_dir, args.regex, args.where, libraries, cache_dir)
+        except (ValueError, re.error) as e:
+            parser.error(str(e))
+        print(jsonio.dumps(comparison, pretty=True))
+        return bool(comparison)
+
+    libraries = [Path(path) for path in args.library] or list(theme_libraries(args.output_dir).values())
+    if not libraries:
+        parser.error(f"no libraries found in {args.output_dir}/ (use --library PATH)")
+    try:
+        results = {str(path): query(path, args.pattern, args.regex, args.where, cache_dir) for path in libraries}
+    except (ValueError, re.error) as e:
+        parser.error(str(e))
 
-        with open(lib_path) as f:
-            data = json.load(f)
+    if args.json:
+        if args.show:
+            for path, matches in results.items():
+                reader = open_library(path, cache_dir)
+                for match in matches:
+                    match['item'] = reader.get(match['position'])
+        print(jsonio.dumps(results, pretty=True))
+        return any(results.values())
 
-        # Find component
-        for item in data['libraryItems']:
-            if component_name.lower() in item['name'].lower():
-                print(f"--- {theme.upper()} ---")
-                # Show first rectangle's key props
-                for el in item['elements']:
-                    if el['type'] == 'rectangle':
-                        print(f"  roundness: {el.get('roundness')}")
-                        print(f"  roughness: {el.get('roughness')}")
-                        print(f"  backgroundColor: {el.get('backgroundColor')}")
-                        break
-                print()
-                break
+    for path, matches in results.items():
+        print(f"📚 {path}: {len(matches)} match(es)")
+        for match in matches:
+            detail = f"  (elements {', '.join(map(str, match['matched']))})" if match['matched'] else ""
+            print(f"  {match['position']:>4}  {match['name']}{detail}")
+            if args.show:
+                print_component(open_library(path, cache_dir).get(match['position']))
+    return any(results.values())
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage:")
-        print("  python -m excalidraw_gen.testing.inspector <component_name>")
-        print("  python -m excalidraw_gen.testing.inspector Desktop")
-        print("  python -m excalidraw_gen.testing.inspector Button")
-        sys.exit(1)
-
-    component = sys.argv[1]
-
-    # Try default library first
-    lib = "output/default.excalidrawlib"
-    if Path(lib).exists():
-        inspect_component(lib, component)
-
-    # Compare across themes
-    print("\n" + "="*60)
-    compare_component_across_themes(component)
+    sys.exit(0 if main() else 1)
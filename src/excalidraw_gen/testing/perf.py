@@ -0,0 +1,262 @@
+"""
+Performance baselines and regression gates.
+
+Benchmarks are measured for wall time (best of a few runs), peak Python
+memory (tracemalloc, in a separate run so tracing does not skew the timing)
+and output size.
+
+Measurements are gated against a committed baseline file
+(tests/perf-baseline.json), one section per runner. The runner key names the
+kind of machine, not the machine itself ($EXCALIDRAW_PERF_RUNNER, default
+"<os>-<arch>-py<version>"), so a fresh CI container finds its baseline.
+Baselines only move when accepted explicitly (pytest --update-perf-baseline,
+or --accept here), so slow creep cannot ratchet them up. Output size does
+not depend on the machine and is gated against any runner's baseline.
+
+Every measurement is also appended to a JSON Lines history file, one object
+per line, to show trends over time:
+
+    python -m excalidraw_gen.testing.perf                      # trend of every benchmark
+    python -m excalidraw_gen.testing.perf --accept "generate*"  # latest measurements become the baseline
+"""
+import argparse
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from excalidraw_gen.builder.cache import DEFAULT_CACHE_DIR
+from excalidraw_gen.core import jsonio
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[3] / 'tests' / 'perf-baseline.json'
+DEFAULT_HISTORY = Path(DEFAULT_CACHE_DIR) / 'perf-history.jsonl'
+BASELINE_ENV = 'EXCALIDRAW_PERF_BASELINE'
+HISTORY_ENV = 'EXCALIDRAW_PERF_HISTORY'
+RUNNER_ENV = 'EXCALIDRAW_PERF_RUNNER'
+
+# metric: (relative tolerance, absolute slack); small absolute slack keeps
+# millisecond-scale timings from flaking on scheduler noise
+TOLERANCES = {
+    'seconds': (0.5, 0.05),
+    'peak_kb': (0.25, 256),
+    'bytes': (0.1, 0),
+}
+# Metrics that mean the same on every machine
+PORTABLE_METRICS = ('bytes',)
+
+
+def runner_key():
+    """Baseline section for this machine: $EXCALIDRAW_PERF_RUNNER or <os>-<arch>-py<major.minor>."""
+    return os.environ.get(RUNNER_ENV) or (
+        f"{platform.system().lower()}-{platform.machine().lower()}-py{sys.version_info[0]}.{sys.version_info[1]}"
+    )
+
+
+def measure(fn, repeat=3, output=None):
+    """
+    Measure a benchmark.
+
+    Args:
+        fn: Callable run `repeat` times for timing and once more under tracemalloc
+        repeat: Timed runs; the fastest counts
+        output: Optional callable returning the paths of the files `fn` wrote
+
+    Returns:
+        {"seconds", "peak_kb"} plus "bytes" (total output size) when `output` is given
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    result = {'seconds': round(min(timings), 4), 'peak_kb': round(peak / 1024, 1)}
+    if output is not None:
+        result['bytes'] = sum(os.path.getsize(path) for path in output())
+    return result
+
+
+class PerfBaseline:
+    """Accepted measurements per runner and benchmark: {runner: {name: {metric: value}}}."""
+
+    def __init__(self, path=None, runner=None):
+        self.path = Path(path or os.environ.get(BASELINE_ENV) or DEFAULT_BASELINE)
+        self.runner = runner or runner_key()
+        try:
+            self.runners = jsonio.load(self.path)
+        except (OSError, ValueError):
+            self.runners = {}
+
+    def expected(self, name):
+        """
+        Baseline of a benchmark for this runner.
+
+        Without one, portable metrics (output size) come from any runner that has
+        the benchmark. Returns None if no runner has it.
+        """
+        own = self.runners.get(self.runner, {}).get(name)
+        if own is not None:
+            return own
+        for runner in sorted(self.runners):
+            other = self.runners[runner].get(name)
+            if other is not None:
+                return {metric: other[metric] for metric in PORTABLE_METRICS if metric in other}
+        return None
+
+    def accept(self, name, result):
+        """Make a measurement this runner's baseline and save the file."""
+        # Re-read first, so benchmarks accepted by other processes are kept
+        current = PerfBaseline(self.path, self.runner).runners
+        current.setdefault(self.runner, {})[name] = {metric: result[metric] for metric in TOLERANCES if metric in result}
+        self.runners = current
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        ordered = {runner: dict(sorted(entries.items())) for runner, entries in sorted(current.items())}
+        tmp.write_bytes(jsonio.dumpb(ordered, pretty=True) + b"\n")
+        os.replace(tmp, self.path)
+
+
+class PerfHistory:
+    """Append-only history of benchmark measurements (JSON Lines)."""
+
+    def __init__(self, path=None, runner=None):
+        self.path = Path(path or os.environ.get(HISTORY_ENV) or DEFAULT_HISTORY)
+        self.runner = runner or runner_key()
+
+    def entries(self, name=None, runner=None):
+        """Recorded measurements, oldest first; unreadable lines are skipped."""
+        try:
+            with open(self.path, 'rb') as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entry = jsonio.loads(line)
+            except ValueError:
+                continue  # e.g. a line cut short by an interrupted run
+            if (name is None or entry.get('name') == name) and (runner is None or entry.get('runner') == runner):
+                entries.append(entry)
+        return entries
+
+    def record(self, name, result, passed=True):
+        """Append a measurement (one line, written with a single append)."""
+        entry = {
+            'name': name,
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'runner': self.runner,
+            'passed': passed,
+            **result,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            f.write(jsonio.dumpb(entry) + b"\n")
+        return entry
+
+
+def regressions(result, baseline, tolerances=TOLERANCES):
+    """
+    Metrics of `result` past their baseline's tolerance.
+
+    Returns:
+        List of messages (empty if within tolerance or without a baseline)
+    """
+    if baseline is None:
+        return []
+    problems = []
+    for metric, (relative, slack) in tolerances.items():
+        if metric not in result or metric not in baseline:
+            continue
+        limit = baseline[metric] * (1 + relative) + slack
+        if result[metric] > limit:
+            problems.append(f"{metric} {result[metric]} > {limit:.4g} "
+                            f"(baseline {baseline[metric]}, +{relative:.0%} allowed)")
+    return problems
+
+
+def check(name, result, baseline=None, history=None, update=False):
+    """
+    Compare a measurement with the committed baseline and record it in the history.
+
+    Args:
+        update: Accept the measurement as the new baseline instead of comparing
+
+    Returns:
+        List of regression messages (see regressions())
+    """
+    baseline = baseline or PerfBaseline()
+    history = history or PerfHistory(runner=baseline.runner)
+    if update:
+        baseline.accept(name, result)
+        problems = []
+    else:
+        problems = regressions(result, baseline.expected(name))
+    history.record(name, result, passed=not problems)
+    return problems
+
+
+def trend(history, pattern=None, last=10):
+    """{benchmark name: [entries]} of this runner's latest measurements, per benchmark."""
+    trends = {}
+    for entry in history.entries(runner=history.runner):
+        if pattern is None or fnmatchcase(entry['name'], pattern):
+            trends.setdefault(entry['name'], []).append(entry)
+    return {name: entries[-last:] for name, entries in sorted(trends.items())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show benchmark trends and accept baselines')
+    parser.add_argument('pattern', nargs='?', help='Benchmark name glob, e.g. "generate*"')
+    parser.add_argument('--history', help=f'History file (default: ${HISTORY_ENV} or {DEFAULT_HISTORY})')
+    parser.add_argument('--baseline', help=f'Baseline file (default: ${BASELINE_ENV} or tests/perf-baseline.json)')
+    parser.add_argument('--runner', help=f'Runner key (default: ${RUNNER_ENV} or {runner_key()})')
+    parser.add_argument('--accept', action='store_true',
+                        help="Make each matching benchmark's latest measurement the runner's baseline")
+    parser.add_argument('-n', '--last', type=int, default=10, help='Measurements shown per benchmark (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Print the measurements as JSON')
+    args = parser.parse_args(argv)
+
+    history = PerfHistory(args.history, args.runner)
+    trends = trend(history, args.pattern, args.last)
+    if not trends:
+        print(f"No measurements for {history.runner} in {history.path}")
+        return False
+
+    if args.accept:
+        baseline = PerfBaseline(args.baseline, history.runner)
+        for name, entries in trends.items():
+            baseline.accept(name, entries[-1])
+            print(f"✅ {name}: baseline set from the measurement of {entries[-1]['time']}")
+        print(f"📄 {baseline.path} ({baseline.runner})")
+        return True
+
+    if args.json:
+        print(jsonio.dumps(trends, pretty=True))
+        return True
+    for name, entries in trends.items():
+        print(f"📈 {name}")
+        for entry in entries:
+            size = f"{entry['bytes'] / 1024:>9.1f} KB" if 'bytes' in entry else " " * 12
+            mark = "" if entry.get('passed', True) else "  ❌ regressed"
+            print(f"  {entry['time']}  {entry['seconds'] * 1000:>8.1f} ms  {entry['peak_kb'] / 1024:>7.1f} MB peak{size}{mark}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
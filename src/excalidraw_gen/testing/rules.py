@@ -0,0 +1,462 @@
+"""
+Single-pass rule engine for library validation.
+
+Each rule subscribes to the element types it cares about; the engine walks
+every library item and element exactly once and hands each element only to
+the rules subscribed to its type. Adding a rule adds work for the elements it
+inspects, not another traversal of the library.
+
+Findings add up over items, so with a ValidationCache (see testing.cache)
+each item's share is stored under its content hash and only items that
+changed since the last run are checked again.
+
+Several files are validated in parallel worker processes, and the results
+can be written as a JSON report for CI.
+"""
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from excalidraw_gen.core import jsonio
+from excalidraw_gen.testing.cache import ValidationCache
+from excalidraw_gen.testing.schema import validate_item
+
+MAX_LIBRARY_KB = 2000
+
+# Theme palette attributes elements are expected to draw from
+THEME_COLOR_ATTRS = (
+    'PRIMARY', 'SECONDARY', 'BACKGROUND', 'FOREGROUND', 'BORDER', 'SUCCESS', 'INFO', 'WARNING',
+    'DESTRUCTIVE', 'MUTED', 'GRAY_50', 'GRAY_100', 'GRAY_300', 'GRAY_700',
+)
+
+# Stands in for the item index in cached messages; replaced when they are merged
+ITEM_INDEX = "\x00index\x00"
+
+
+class Rule:
+    """
+    Base class for validation rules.
+
+    Subclasses set `name`, optionally restrict `types` to the element types
+    they inspect (None: every element), override the hooks they need and
+    return their findings from result(). Findings that fail validation go in
+    self.violations.
+
+    `item_state` names the attributes item and element hooks add to: counts
+    (int), counters (dict) and message lists. The engine caches them per item
+    and sums them back with merge(); subclasses with settings that change
+    their findings return them from config().
+    """
+    name = None
+    types = None
+    item_state = ('violations',)
+
+    def __init__(self):
+        self.violations = []
+
+    def config(self):
+        """Settings that change this rule's findings (part of the cache version)."""
+        return None
+
+    def reset(self):
+        """Empty the item state."""
+        for attr in self.item_state:
+            setattr(self, attr, type(getattr(self, attr))())
+
+    def state(self):
+        """JSON-friendly copy of the item state (counters as [key, count] pairs)."""
+        return {attr: list(value.items()) if isinstance(value, dict) else value
+                for attr, value in ((attr, getattr(self, attr)) for attr in self.item_state)}
+
+    def merge(self, state, index):
+        """Add an item's state() to this rule's totals; `index` replaces ITEM_INDEX in messages."""
+        for attr, value in state.items():
+            total = getattr(self, attr)
+            if isinstance(total, dict):
+                for key, count in value:
+                    total[key] = total.get(key, 0) + count
+            elif isinstance(total, list):
+                total.extend(message.replace(ITEM_INDEX, str(index)) for message in value)
+            else:
+                setattr(self, attr, total + value)
+
+    def check_document(self, data, path):
+        """Called once with the parsed document before items are visited."""
+
+    def check_item(self, index, item):
+        """Called once per library item."""
+
+    def check_element(self, el, item):
+        """Called once per element of a subscribed type."""
+
+    def result(self):
+        return {'violations': self.violations}
+
+
+class StructureRule(Rule):
+    """Library document shape: what Excalidraw needs to import the file."""
+    name = 'structure'
+    item_state = ('items', 'warnings', 'violations')
+
+    def __init__(self, max_size_kb=MAX_LIBRARY_KB):
+        super().__init__()
+        self.max_size_kb = max_size_kb
+        self.warnings = []
+        self.version = None
+        self.size_kb = None
+        self.items = 0
+
+    def check_document(self, data, path):
+        if path is not None:
+            self.size_kb = round(os.stat(path).st_size / 1024, 1)
+            if self.size_kb > self.max_size_kb:
+                self.warnings.append(f"Large file (>{self.max_size_kb // 1000}MB) - consider splitting")
+        if not isinstance(data, dict):
+            self.violations.append("Invalid format: root should be an object")
+        elif 'libraryItems' not in data:
+            self.violations.append("Missing 'libraryItems' field")
+        elif not isinstance(data['libraryItems'], list):
+            self.violations.append("'libraryItems' should be an array")
+        else:
+            self.version = data.get('version', 1)
+
+    def check_item(self, index, item):
+        self.items += 1
+        if 'id' not in item:
+            self.warnings.append(f"Item {index} missing 'id'")
+        if 'status' not in item:
+            self.warnings.append(f"Item {index} missing 'status'")
+        if 'elements' not in item:
+            self.violations.append(f"Item {index} missing 'elements'")
+
+    def result(self):
+        return {'items': self.items, 'version': self.version, 'size_kb': self.size_kb,
+                'warnings': self.warnings, 'violations': self.violations}
+
+
+class StatsRule(Rule):
+    """Component count and element type distribution."""
+    name = 'stats'
+    item_state = ('components', 'by_type', 'violations')
+
+    def __init__(self):
+        super().__init__()
+        self.components = 0
+        self.by_type = {}
+
+    def check_item(self, index, item):
+        self.components += 1
+
+    def check_element(self, el, item):
+        etype = el.get('type')
+        self.by_type[etype] = self.by_type.get(etype, 0) + 1
+
+    def result(self):
+        return {'components': self.components, 'elements': sum(self.by_type.values()),
+                'by_type': self.by_type, 'violations': self.violations}
+
+
+class RoundnessRule(Rule):
+    """Rectangle roundness (1=boxy, 3=rounded, 'null'=no roundness; switches use type 20)."""
+    name = 'roundness'
+    types = ('rectangle',)
+    item_state = ('total_rectangles', 'null_roundness', 'by_type', 'violations')
+
+    def __init__(self, expected_type=None):
+        super().__init__()
+        self.expected_type = expected_type
+        self.total_rectangles = 0
+        self.null_roundness = 0
+        self.by_type = {}
+
+    def config(self):
+        return self.expected_type
+
+    def check_element(self, el, item):
+        expected = self.expected_type
+        self.total_rectangles += 1
+        roundness = el.get('roundness')
+
+        if roundness is None:
+            self.null_roundness += 1
+            if expected is not None and expected != 'null':
+                self.violations.append(f"{item['name']}: null (expected type {expected})")
+            return
+
+        rtype = roundness.get('type', 'unknown')
+        self.by_type[rtype] = self.by_type.get(rtype, 0) + 1
+        if rtype == 20 or expected is None:  # Allow switch (type 20)
+            return
+        if expected == 'null':
+            self.violations.append(f"{item['name']}: type {rtype} (expected null)")
+        elif rtype != expected:
+            self.violations.append(f"{item['name']}: type {rtype} (expected {expected})")
+
+    def result(self):
+        return {'total_rectangles': self.total_rectangles, 'null_roundness': self.null_roundness,
+                'by_type': self.by_type, 'violations': self.violations}
+
+
+class RoughnessRule(Rule):
+    """Every element's roughness matches the theme."""
+    name = 'roughness'
+    item_state = ('total_elements', 'by_roughness', 'violations')
+
+    def __init__(self, expected_roughness):
+        super().__init__()
+        self.expected_roughness = expected_roughness
+        self.total_elements = 0
+        self.by_roughness = {}
+
+    def config(self):
+        return self.expected_roughness
+
+    def check_element(self, el, item):
+        rough = el.get('roughness')
+        if rough is None:
+            return
+        self.total_elements += 1
+        self.by_roughness[rough] = self.by_roughness.get(rough, 0) + 1
+        if rough != self.expected_roughness:
+            self.violations.append(f"{item['name']}: roughness {rough} (expected {self.expected_roughness})")
+
+    def result(self):
+        return {'total_elements': self.total_elements, 'by_roughness': self.by_roughness,
+                'violations': self.violations}
+
+
+class ColorRule(Rule):
+    """How many stroke and background colors come from the theme palette (informational)."""
+    name = 'colors'
+    item_state = ('elements_checked', 'using_theme_colors', 'violations')
+
+    def __init__(self, theme_class):
+        super().__init__()
+        self.theme_colors = {getattr(theme_class, attr) for attr in THEME_COLOR_ATTRS if hasattr(theme_class, attr)}
+        # Prefix match also accepts alpha-suffixed variants (e.g. #18181b80)
+        self._prefixes = tuple(self.theme_colors)
+        self._matches = {}
+        self.elements_checked = 0
+        self.using_theme_colors = 0
+
+    def config(self):
+        return sorted(self.theme_colors)
+
+    def _is_theme_color(self, color):
+        match = self._matches.get(color)
+        if match is None:
+            match = self._matches[color] = color in self.theme_colors or color.startswith(self._prefixes)
+        return match
+
+    def check_element(self, el, item):
+        self.elements_checked += 1
+        for color in (el.get('backgroundColor'), el.get('strokeColor')):
+            if color and color != 'transparent' and self._is_theme_color(color):
+                self.using_theme_colors += 1
+
+    def result(self):
+        return {'elements_checked': self.elements_checked, 'using_theme_colors': self.using_theme_colors,
+                'violations': self.violations}
+
+
+class SchemaRule(Rule):
+    """Items and elements match the Excalidraw schema (see testing.schema)."""
+    name = 'schema'
+
+    def check_item(self, index, item):
+        self.violations.extend(validate_item(item, index))
+
+
+class RuleEngine:
+    """Run a set of rules over a library document in one traversal."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._item_rules = [rule for rule in self.rules if type(rule).check_item is not Rule.check_item]
+        self._element_rules = [rule for rule in self.rules if type(rule).check_element is not Rule.check_element]
+        self._dispatch = {}
+
+    def _rules_for(self, etype):
+        rules = self._dispatch.get(etype)
+        if rules is None:
+            rules = self._dispatch[etype] = tuple(
+                rule for rule in self._element_rules if rule.types is None or etype in rule.types
+            )
+        return rules
+
+    def _visit(self, items, indexes):
+        item_rules = self._item_rules
+        rules_for = self._rules_for
+        for index, item in zip(indexes, items):
+            for rule in item_rules:
+                rule.check_item(index, item)
+            for el in item.get('elements', ()):
+                for rule in rules_for(el.get('type')):
+                    rule.check_element(el, item)
+
+    def _visit_cached(self, items, cache):
+        # Changed items are checked by scratch copies of the rules, one item at a time
+        scratch = None
+        for index, item in enumerate(items):
+            key = cache.key(item)
+            states = cache.get(key)
+            if states is None:
+                if scratch is None:
+                    scratch = RuleEngine(copy.copy(rule) for rule in self.rules)
+                for rule in scratch.rules:
+                    rule.reset()
+                scratch._visit([item], [ITEM_INDEX])
+                states = [rule.state() for rule in scratch.rules]
+                cache.put(key, states)
+            for rule, state in zip(self.rules, states):
+                rule.merge(state, index)
+
+    def run(self, data, path=None, cache=None):
+        """
+        Validate a parsed library document.
+
+        Args:
+            data: Parsed library document
+            path: Its file (for size checks and reports)
+            cache: ValidationCache for these rules; only items missing from it are checked
+
+        Returns:
+            {rule name: rule result}
+        """
+        for rule in self.rules:
+            rule.check_document(data, path)
+
+        items = data.get('libraryItems') if isinstance(data, dict) else None
+        if isinstance(items, list):
+            if cache is None:
+                self._visit(items, range(len(items)))
+            else:
+                self._visit_cached(items, cache)
+
+        return {rule.name: rule.result() for rule in self.rules}
+
+
+def expected_roundness(theme_class):
+    """Expected rectangle roundness for a theme, in RoundnessRule terms."""
+    roundness_type = getattr(theme_class, 'ROUNDNESS_TYPE', 3)
+    return 'null' if roundness_type == 1 else roundness_type  # Type 1 is written as null
+
+
+def default_rules(theme_name=None):
+    """Structure, schema and stats rules, plus the theme's style rules when a theme is given."""
+    rules = [StructureRule(), SchemaRule(), StatsRule()]
+    if theme_name is None:
+        return rules + [RoundnessRule()]
+
+    from excalidraw_gen.core.themes import get_theme
+    theme_class = get_theme(theme_name)
+    return rules + [
+        RoundnessRule(expected_roundness(theme_class)),
+        RoughnessRule(theme_class.ROUGHNESS),
+        ColorRule(theme_class),
+    ]
+
+
+def theme_for_library(path):
+    """Theme a library was built with, judged by its file name (e.g. mork-wireframe-kit), or None."""
+    from excalidraw_gen.core.themes import list_themes
+    stem = Path(path).name
+    for name in sorted(list_themes(), key=len, reverse=True):
+        if stem == name or stem.startswith(f"{name}-") or stem.startswith(f"{name}."):
+            return name
+    return None
+
+
+def validate_document(data, path=None, theme_name=None, cache_dir=None):
+    """
+    Validate a parsed library document with default_rules(theme_name).
+
+    Args:
+        data: Parsed library document
+        path: Its file
+        theme_name: Theme to check styles against
+        cache_dir: Reuse the results of unchanged items from this directory
+            (see testing.cache); needs `path`
+
+    Returns:
+        {"file", "theme", "passed", "error", "rules", "cache"} report dict;
+        "cache" is {"hits", "misses"} in items, or None without a cache
+    """
+    engine = RuleEngine(default_rules(theme_name))
+    cache = None
+    if cache_dir is not None and path is not None:
+        cache = ValidationCache.for_library(path, engine.rules, cache_dir)
+    rules = engine.run(data, path, cache)
+    if cache is not None:
+        cache.save()
+    return {
+        'file': None if path is None else str(path),
+        'theme': theme_name,
+        'passed': not any(result['violations'] for result in rules.values()),
+        'error': None,
+        'rules': rules,
+        'cache': None if cache is None else {'hits': cache.hits, 'misses': cache.misses},
+    }
+
+
+def validate_file(path, theme_name=None, cache_dir=None):
+    """
+    Validate one library file.
+
+    Args:
+        path: .excalidrawlib file
+        theme_name: Theme to check styles against (None: structure and stats only)
+        cache_dir: Validation cache directory (None: check every item)
+
+    Returns:
+        Report dict (see validate_document); unreadable files fail with "error" set
+    """
+    try:
+        data = jsonio.load(path)
+    except (OSError, ValueError) as e:
+        error = f"Invalid JSON: {e}" if isinstance(e, ValueError) else str(e)
+        return {'file': str(path), 'theme': theme_name, 'passed': False, 'error': error, 'rules': {}, 'cache': None}
+    return validate_document(data, path, theme_name, cache_dir)
+
+
+def _validate_job(args):
+    return validate_file(*args)
+
+
+def validate_files(files, themes=None, jobs=None, cache_dir=None):
+    """
+    Validate several library files, in parallel worker processes.
+
+    Args:
+        files: Library paths
+        themes: Optional {path: theme name}; missing entries are checked without a theme
+        jobs: Maximum worker processes (default: CPU count)
+        cache_dir: Validation cache directory (None: check every item)
+
+    Returns:
+        List of report dicts (see validate_file), in the order of `files`
+    """
+    themes = themes or {}
+    tasks = [(path, themes.get(path), cache_dir) for path in files]
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        return [validate_file(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_validate_job, tasks))
+
+
+def _jsonable(value):
+    # Counts are keyed by ints (roundness types, roughness); JSON wants string keys
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def write_report(reports, path):
+    """Write validation reports as one JSON document: {"passed", "files"}."""
+    document = {'passed': all(report['passed'] for report in reports), 'files': reports}
+    jsonio.dump(_jsonable(document), path, pretty=True)
+    return document
@@ -0,0 +1,380 @@
+"""
+Schema validation for Excalidraw elements, library items and scenes.
+
+Checks each element against the fields its type needs, their value types and
+allowed values, plus the references between elements (containerId and
+boundElements must point at elements of the same item or scene, ids must be
+unique). Fields Excalidraw restores with a default on load (see
+builder.minify.EXCALIDRAW_DEFAULTS) may be omitted, so minified output
+validates too.
+
+Files are validated one item (or scene element) at a time: iter_array()
+decodes the array incrementally from a chunked read, so memory stays bounded
+by the largest single item. SchemaValidator does the same at build time as a
+builder sink.
+
+    python -m excalidraw_gen.testing.schema output/*.excalidrawlib
+"""
+import json
+import sys
+from pathlib import Path
+
+from excalidraw_gen.builder.minify import EXCALIDRAW_DEFAULTS
+
+_NUMBER = (int, float)
+_NULL = type(None)
+
+FILL_STYLES = ("hachure", "cross-hatch", "solid", "zigzag")
+STROKE_STYLES = ("solid", "dashed", "dotted")
+TEXT_ALIGNS = ("left", "center", "right")
+VERTICAL_ALIGNS = ("top", "middle", "bottom")
+ITEM_STATUSES = ("published", "unpublished")
+
+# field: (value types, allowed values or None)
+BASE_FIELDS = {
+    "id": (str, None),
+    "type": (str, None),
+    "x": (_NUMBER, None),
+    "y": (_NUMBER, None),
+    "width": (_NUMBER, None),
+    "height": (_NUMBER, None),
+    "angle": (_NUMBER, None),
+    "strokeColor": (str, None),
+    "backgroundColor": (str, None),
+    "fillStyle": (str, FILL_STYLES),
+    "strokeWidth": (_NUMBER, None),
+    "strokeStyle": (str, STROKE_STYLES),
+    "roughness": (_NUMBER, None),
+    "opacity": (_NUMBER, None),
+    "groupIds": (list, None),
+    "frameId": ((str, _NULL), None),
+    "roundness": ((dict, _NULL), None),
+    "seed": (int, None),
+    "version": (int, None),
+    "versionNonce": (int, None),
+    "isDeleted": (bool, None),
+    "boundElements": ((list, _NULL), None),
+    "updated": (int, None),
+    "link": ((str, _NULL), None),
+    "locked": (bool, None),
+}
+TEXT_FIELDS = {
+    "text": (str, None),
+    "fontSize": (_NUMBER, None),
+    "fontFamily": (int, None),
+    "textAlign": (str, TEXT_ALIGNS),
+    "verticalAlign": (str, VERTICAL_ALIGNS),
+    "baseline": (_NUMBER, None),
+    "containerId": ((str, _NULL), None),
+    "originalText": (str, None),
+}
+LINEAR_FIELDS = {
+    "points": (list, None),
+}
+
+ELEMENT_FIELDS = {
+    "rectangle": BASE_FIELDS,
+    "ellipse": BASE_FIELDS,
+    "diamond": BASE_FIELDS,
+    "frame": BASE_FIELDS,
+    "text": {**BASE_FIELDS, **TEXT_FIELDS},
+    "line": {**BASE_FIELDS, **LINEAR_FIELDS},
+    "arrow": {**BASE_FIELDS, **LINEAR_FIELDS},
+    "freedraw": {**BASE_FIELDS, **LINEAR_FIELDS},
+}
+
+# Fields an element can omit: Excalidraw restores them on load (or derives them)
+OPTIONAL_FIELDS = frozenset(EXCALIDRAW_DEFAULTS) | {"baseline", "originalText", "updated", "version", "versionNonce"}
+
+
+class SchemaError(ValueError):
+    """Raised when a library item or document does not match the Excalidraw schema."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        shown = "\n  ".join(self.errors[:10])
+        more = f"\n  ... {len(self.errors) - 10} more" if len(self.errors) > 10 else ""
+        super().__init__(f"{len(self.errors)} schema error(s):\n  {shown}{more}")
+
+
+def _type_name(types):
+    types = types if isinstance(types, tuple) else (types,)
+    return " or ".join("null" if t is _NULL else t.__name__ for t in types)
+
+
+def _is_point(point):
+    return (isinstance(point, list) and len(point) == 2
+            and all(isinstance(v, _NUMBER) and not isinstance(v, bool) for v in point))
+
+
+def validate_element(el):
+    """
+    Validate one element on its own (references are checked by validate_elements).
+
+    Args:
+        el: Element dict (or Element)
+
+    Returns:
+        List of error messages (empty if valid)
+    """
+    if hasattr(el, "to_dict"):
+        el = el.to_dict()
+    if not isinstance(el, dict):
+        return ["element is not an object"]
+
+    etype = el.get("type")
+    fields = ELEMENT_FIELDS.get(etype)
+    if fields is None:
+        return [f"unknown element type {etype!r}"]
+
+    errors = []
+    for name, (types, allowed) in fields.items():
+        if name not in el:
+            if name not in OPTIONAL_FIELDS:
+                errors.append(f"missing '{name}'")
+            continue
+        value = el[name]
+        # bool is an int subclass; only boolean fields accept it
+        if not isinstance(value, types) or (isinstance(value, bool) and types is not bool):
+            errors.append(f"'{name}' should be {_type_name(types)}, got {type(value).__name__}")
+        elif allowed is not None and value not in allowed:
+            errors.append(f"'{name}' is {value!r} (expected one of {', '.join(allowed)})")
+
+    if "points" in fields and isinstance(el.get("points"), list):
+        points = el["points"]
+        if len(points) < 2:
+            errors.append(f"'points' needs at least 2 points, got {len(points)}")
+        elif not all(_is_point(point) for point in points):
+            errors.append("'points' should be [x, y] number pairs")
+    if isinstance(el.get("groupIds"), list) and not all(isinstance(g, str) for g in el["groupIds"]):
+        errors.append("'groupIds' should be a list of strings")
+    if isinstance(el.get("roundness"), dict) and not isinstance(el["roundness"].get("type"), int):
+        errors.append("'roundness' needs an integer 'type'")
+    if isinstance(el.get("opacity"), _NUMBER) and not 0 <= el["opacity"] <= 100:
+        errors.append(f"'opacity' is {el['opacity']} (expected 0-100)")
+    return errors
+
+
+class _References:
+    """Ids seen so far and the references still to resolve, for one item or scene."""
+
+    def __init__(self):
+        self.ids = set()
+        self.duplicates = []
+        self.references = []  # (element label, field, id)
+
+    def add(self, label, el):
+        el_id = el.get("id")
+        if el_id in self.ids:
+            self.duplicates.append(f"{label} duplicate id {el_id!r}")
+        self.ids.add(el_id)
+        if el.get("containerId"):
+            self.references.append((label, "containerId", el["containerId"]))
+        for bound in el.get("boundElements") or ():
+            if isinstance(bound, dict):
+                self.references.append((label, "boundElements", bound.get("id")))
+
+    def errors(self):
+        dangling = [f"{label} {field} refers to missing element {ref!r}"
+                    for label, field, ref in self.references if ref not in self.ids]
+        return self.duplicates + dangling
+
+
+def validate_elements(elements, context=""):
+    """
+    Validate a list of elements that form one scene (a library item or a document).
+
+    Args:
+        elements: Iterable of element dicts (or Elements); consumed once
+        context: Prefix for error messages, e.g. the item name
+
+    Returns:
+        List of error messages (empty if valid)
+    """
+    errors = []
+    references = _References()
+    prefix = f"{context}: " if context else ""
+    for i, el in enumerate(elements):
+        if hasattr(el, "to_dict"):
+            el = el.to_dict()
+        label = f"{prefix}element {i}" + (f" ({el.get('type')})" if isinstance(el, dict) else "")
+        errors.extend(f"{label} {message}" for message in validate_element(el))
+        if isinstance(el, dict):
+            references.add(label, el)
+    return errors + references.errors()
+
+
+def validate_item(item, index=None):
+    """
+    Validate one library item and its elements.
+
+    Args:
+        item: Library item dict
+        index: Position in the library (for messages)
+
+    Returns:
+        List of error messages (empty if valid)
+    """
+    where = f"item {index}" if index is not None else "item"
+    if not isinstance(item, dict):
+        return [f"{where} is not an object"]
+    name = item.get("name")
+    context = f"{where} {name!r}" if isinstance(name, str) else where
+
+    errors = []
+    if not isinstance(item.get("id"), str):
+        errors.append(f"{context}: missing or non-string 'id'")
+    if item.get("status") not in ITEM_STATUSES:
+        errors.append(f"{context}: 'status' is {item.get('status')!r} (expected one of {', '.join(ITEM_STATUSES)})")
+    if "created" in item and not isinstance(item["created"], int):
+        errors.append(f"{context}: 'created' should be int")
+    elements = item.get("elements")
+    if not isinstance(elements, list):
+        return errors + [f"{context}: 'elements' should be a list"]
+    if not elements:
+        errors.append(f"{context}: no elements")
+    return errors + validate_elements(elements, context)
+
+
+def iter_array(path, key, chunk_size=1 << 16):
+    """
+    Yield the values of the top-level array `key` of a JSON file, one at a time.
+
+    The file is read in chunks and each value is decoded as soon as it is
+    complete, so memory is bounded by the largest value, not the file.
+
+    Raises:
+        ValueError if the array is missing or the JSON is invalid
+    """
+    for value, _, _ in iter_array_spans(path, key, chunk_size):
+        yield value
+
+
+def iter_array_spans(path, key, chunk_size=1 << 16):
+    """
+    Like iter_array(), but yield (value, byte offset, byte length) for each value,
+    so a value can be read again later without another scan.
+    """
+    decoder = json.JSONDecoder()
+    marker = f'"{key}"'
+    # newline="" keeps \r\n as is, so characters map back to bytes exactly
+    with open(path, encoding="utf-8", newline="") as f:
+        buffer = ""
+        offset = 0  # Byte offset of buffer[0]
+        eof = False
+
+        def fill():
+            nonlocal buffer, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            return chunk
+
+        # Find the opening bracket of the array
+        while True:
+            at = buffer.find(marker)
+            if at >= 0:
+                start = buffer.find("[", at + len(marker))
+                if start >= 0:
+                    offset += len(buffer[:start + 1].encode())
+                    buffer = buffer[start + 1:]
+                    break
+            if not fill():
+                raise ValueError(f"No '{key}' array in {path}")
+
+        while True:
+            stripped = buffer.lstrip(" \t\r\n,")
+            offset += len(buffer) - len(stripped)  # Whitespace and commas are one byte each
+            if not stripped:
+                buffer = ""
+                if not fill():
+                    raise ValueError(f"Unterminated '{key}' array in {path}")
+                continue
+            buffer = stripped
+            if buffer[0] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                # Incomplete value: read more, unless the file is exhausted
+                if fill():
+                    continue
+                raise ValueError(f"Invalid JSON in '{key}' of {path}: {e}") from e
+            if end == len(buffer) and not eof and not isinstance(value, (dict, list, str)):
+                # A number may continue in the next chunk
+                if fill():
+                    continue
+            length = len(buffer[:end].encode())
+            yield value, offset, length
+            offset += length
+            buffer = buffer[end:]
+
+
+def validate_file(path):
+    """
+    Validate a .excalidrawlib (item by item) or .excalidraw scene (element by element).
+
+    Returns:
+        List of error messages (empty if valid)
+    """
+    path = Path(path)
+    try:
+        if path.suffix == ".excalidraw":
+            return validate_elements(iter_array(path, "elements"))
+
+        errors = []
+        for i, item in enumerate(iter_array(path, "libraryItems")):
+            errors.extend(validate_item(item, i))
+        return errors
+    except (OSError, ValueError) as e:
+        return [str(e)]
+
+
+class SchemaValidator:
+    """
+    Builder sink that validates every library item as it is emitted.
+
+    With strict=True (the default) the first invalid item raises SchemaError,
+    so generate.main() aborts and the previous outputs stay in place.
+    """
+
+    def __init__(self, strict=True):
+        self.strict = strict
+        self.count = 0
+        self.errors = []
+
+    def write_item(self, item):
+        errors = validate_item(item, self.count)
+        self.count += 1
+        if errors:
+            if self.strict:
+                raise SchemaError(errors)
+            self.errors.extend(errors)
+
+    def close(self):
+        pass
+
+
+def main(argv=None):
+    files = sys.argv[1:] if argv is None else argv
+    if not files:
+        print("Usage: python -m excalidraw_gen.testing.schema FILE.excalidrawlib|FILE.excalidraw ...")
+        return False
+
+    valid = True
+    for path in files:
+        errors = validate_file(path)
+        if errors:
+            valid = False
+            print(f"❌ {path}: {len(errors)} schema error(s)")
+            for error in errors[:20]:
+                print(f"   {error}")
+            if len(errors) > 20:
+                print(f"   ... {len(errors) - 20} more")
+        else:
+            print(f"✅ {path}")
+    return valid
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
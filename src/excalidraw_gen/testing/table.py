@@ -0,0 +1,190 @@
+"""
+Columnar element table for audits over libraries and scenes.
+
+Flattens a .excalidrawlib (or .excalidraw scene) into one row per element,
+with one NumPy array per column, so questions such as "which components use
+color X" or "where does roughness differ from the theme" are vectorized
+masks instead of nested loops:
+
+    table = load_table("output/mork-wireframe-kit.excalidrawlib")
+    table.where(table.uses_color("#18181b")).unique("item")
+    table.count_by("strokeWidth")
+
+Needs the optional numpy package (pip install numpy).
+"""
+from pathlib import Path
+
+from excalidraw_gen.core import jsonio
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Numeric columns (float64; NaN where an element has no such field)
+NUMERIC_COLUMNS = (
+    "x", "y", "width", "height", "angle", "strokeWidth", "roughness", "opacity", "fontSize", "fontFamily",
+)
+# Short categorical string columns ("" where absent)
+STRING_COLUMNS = (
+    "type", "id", "strokeColor", "backgroundColor", "fillStyle", "strokeStyle", "textAlign", "containerId",
+)
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Element tables require the numpy package (pip install numpy)")
+
+
+def _roundness_type(value):
+    return value.get("type", np.nan) if isinstance(value, dict) else np.nan
+
+
+def _elements_of(data):
+    """(item name, item index, element) for a library document or a scene."""
+    if "libraryItems" in data:
+        for index, item in enumerate(data["libraryItems"]):
+            for el in item.get("elements", ()):
+                yield item.get("name", ""), index, el
+    else:
+        for el in data.get("elements", ()):
+            yield "", -1, el
+
+
+class ElementTable:
+    """One row per element; columns are equal-length NumPy arrays."""
+
+    def __init__(self, columns):
+        """
+        Args:
+            columns: {name: array}, all of the same length
+        """
+        _require_numpy()
+        self.columns = columns
+
+    @classmethod
+    def from_document(cls, data, source=""):
+        """
+        Flatten a parsed library or scene.
+
+        Columns: source, item, item_index, text, roundness (type; NaN for null)
+        plus NUMERIC_COLUMNS and STRING_COLUMNS.
+        """
+        _require_numpy()
+        values = {name: [] for name in ("item", "item_index", "text", "roundness") + NUMERIC_COLUMNS + STRING_COLUMNS}
+        nan = np.nan
+        for item_name, item_index, el in _elements_of(data):
+            values["item"].append(item_name)
+            values["item_index"].append(item_index)
+            values["text"].append(el.get("text", ""))
+            values["roundness"].append(_roundness_type(el.get("roundness")))
+            for name in NUMERIC_COLUMNS:
+                value = el.get(name)
+                values[name].append(nan if value is None else value)
+            for name in STRING_COLUMNS:
+                values[name].append(el.get(name) or "")
+
+        count = len(values["item"])
+        columns = {"source": np.full(count, str(source), dtype=object)}
+        columns["item"] = np.array(values["item"], dtype=object)
+        columns["item_index"] = np.array(values["item_index"], dtype=np.int32)
+        columns["text"] = np.array(values["text"], dtype=object)
+        columns["roundness"] = np.array(values["roundness"], dtype=np.float64)
+        for name in NUMERIC_COLUMNS:
+            columns[name] = np.array(values[name], dtype=np.float64)
+        for name in STRING_COLUMNS:
+            columns[name] = np.array(values[name], dtype=str)
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, tables):
+        """Stack tables (e.g. one per theme) into one."""
+        tables = list(tables)
+        _require_numpy()
+        if not tables:
+            return cls.from_document({"elements": []})
+        return cls({name: np.concatenate([table.columns[name] for table in tables]) for name in tables[0].columns})
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def where(self, mask):
+        """Rows where the boolean mask (or index array) holds."""
+        return ElementTable({name: column[mask] for name, column in self.columns.items()})
+
+    def eq(self, **equals):
+        """Mask of rows whose columns equal the given values, e.g. eq(type="text", fontSize=16)."""
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in equals.items():
+            mask &= self.columns[name] == value
+        return mask
+
+    def uses_color(self, color):
+        """Mask of rows drawing with `color` as stroke or background."""
+        return (self.columns["strokeColor"] == color) | (self.columns["backgroundColor"] == color)
+
+    def unique(self, name):
+        """Sorted distinct values of a column."""
+        return np.unique(self.columns[name]).tolist()
+
+    def count_by(self, name):
+        """{value: row count} for a column, e.g. a strokeWidth histogram."""
+        values, counts = np.unique(self.columns[name], return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def aggregate_by(self, key, column, func=None):
+        """
+        Reduce `column` per distinct value of `key`.
+
+        Args:
+            key: Grouping column (e.g. "item" or "source")
+            column: Numeric column to reduce
+            func: Reduction over a group's values (default: np.nansum)
+
+        Returns:
+            {key value: reduced value}
+        """
+        func = func or np.nansum
+        keys, inverse = np.unique(self.columns[key], return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+        groups = np.split(self.columns[column][order], bounds)
+        results = {}
+        for k, group in zip(keys.tolist(), groups):
+            value = func(group)
+            results[k] = value.item() if hasattr(value, "item") else value
+        return results
+
+    def rows(self, columns=None):
+        """Rows as dicts (for printing or JSON), restricted to `columns` if given."""
+        names = list(columns or self.columns)
+        data = [self.columns[name].tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*data)]
+
+
+def load_table(path):
+    """Load a .excalidrawlib or .excalidraw file as an ElementTable."""
+    return ElementTable.from_document(jsonio.load(path), source=Path(path).name)
+
+
+def load_theme_tables(output_dir="output", themes=None):
+    """
+    One table over the libraries of a multi-theme build; the source column holds the theme name.
+
+    Args:
+        output_dir: Directory of the build (see generate.theme_output_paths)
+        themes: Theme names (default: all whose library exists)
+    """
+    from excalidraw_gen.builder.generate import theme_output_paths
+    from excalidraw_gen.core.themes import list_themes
+
+    tables = []
+    for theme_name in themes or list_themes():
+        lib_path, _ = theme_output_paths(theme_name, output_dir)
+        if themes is None and not lib_path.exists():
+            continue
+        tables.append(ElementTable.from_document(jsonio.load(lib_path), source=theme_name))
+    return ElementTable.concat(tables)
@@ -2,19 +2,68 @@
 Library validation utilities.
 Verify that generated libraries match theme specifications.
 """
-import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from excalidraw_gen.builder.cache import DEFAULT_CACHE_DIR
+from excalidraw_gen.builder.index import LibraryReader
+from excalidraw_gen.core import jsonio
+from excalidraw_gen.testing.cache import ValidationCache
+from excalidraw_gen.testing.rules import (
+    ColorRule, RoughnessRule, RoundnessRule, RuleEngine, validate_document, validate_files, write_report,
+)
+
+
+# Report label of libraries validated from a document in memory (no file)
+IN_MEMORY_LABEL = "<in-memory>"
+
 
 class LibraryValidator:
     """Validate Excalidraw library files against theme specs"""
 
-    def __init__(self, library_path: str):
-        self.library_path = Path(library_path)
-        with open(self.library_path) as f:
-            self.data = json.load(f)
-        self.library_items = self.data.get('libraryItems', [])
+    def __init__(self, library_path: str, cache_dir: str = None):
+        """
+        Args:
+            library_path: Path to .excalidrawlib file
+            cache_dir: Reuse per-item results of unchanged components from this
+                directory (see testing.cache); None checks every item
+        """
+        self.library_path = None if library_path is None else Path(library_path)
+        self.cache_dir = cache_dir
+        self._data = None
+
+    @classmethod
+    def from_document(cls, data: Dict) -> 'LibraryValidator':
+        """Validator over a library document already in memory (e.g. generate.build_library_document)"""
+        validator = cls(None)
+        validator._data = data
+        return validator
+
+    @property
+    def data(self) -> Dict:
+        """Parsed library document (loaded on first use)"""
+        if self._data is None:
+            self._data = jsonio.load(self.library_path)
+        return self._data
+
+    @property
+    def library_items(self) -> List[Dict]:
+        return self.data.get('libraryItems', [])
+
+    def run_rules(self, rules) -> Dict:
+        """Run rules over the library in a single traversal (see testing.rules)"""
+        engine = RuleEngine(rules)
+        if self.cache_dir is None or self.library_path is None:
+            return engine.run(self.data, self.library_path)
+        cache = ValidationCache.for_library(self.library_path, engine.rules, self.cache_dir)
+        results = engine.run(self.data, self.library_path, cache)
+        cache.save()
+        return results
+
+    def validate(self, theme_name: str = None) -> Dict:
+        """Structure, stats and (with a theme) style rules in one pass, as a report dict"""
+        return validate_document(self.data, self.library_path, theme_name, self.cache_dir)
 
     def validate_roundness(self, expected_type: int = None) -> Dict:
         """
@@ -26,170 +75,133 @@ class LibraryValidator:
         Returns:
             Dict with validation results
         """
-        results = {
-            'total_rectangles': 0,
-            'null_roundness': 0,
-            'by_type': {},
-            'violations': []
-        }
-
-        for item in self.library_items:
-            item_name = item['name']
-            for el in item['elements']:
-                if el['type'] == 'rectangle':
-                    results['total_rectangles'] += 1
-                    roundness = el.get('roundness')
-
-                    if roundness is None:
-                        results['null_roundness'] += 1
-                        if expected_type is not None and expected_type != 'null':
-                            results['violations'].append(f"{item_name}: null (expected type {expected_type})")
-                    else:
-                        rtype = roundness.get('type', 'unknown')
-                        results['by_type'][rtype] = results['by_type'].get(rtype, 0) + 1
-                        if expected_type == 'null' and rtype != 20:  # Allow switch (type 20)
-                            results['violations'].append(f"{item_name}: type {rtype} (expected null)")
-                        elif expected_type is not None and expected_type != 'null' and rtype != expected_type and rtype != 20:
-                            results['violations'].append(f"{item_name}: type {rtype} (expected {expected_type})")
-
-        return results
+        return self.run_rules([RoundnessRule(expected_type)])['roundness']
 
     def validate_colors(self, theme_class) -> Dict:
         """Validate that colors match theme specifications"""
-        results = {
-            'elements_checked': 0,
-            'using_theme_colors': 0,
-            'violations': []
-        }
-
-        theme_colors = {
-            theme_class.PRIMARY,
-            theme_class.SECONDARY,
-            theme_class.BACKGROUND,
-            theme_class.FOREGROUND,
-            theme_class.BORDER,
-            theme_class.SUCCESS,
-            theme_class.INFO,
-            theme_class.WARNING,
-            theme_class.DESTRUCTIVE,
-            theme_class.MUTED,
-            theme_class.GRAY_50,
-            theme_class.GRAY_100,
-            theme_class.GRAY_300,
-            theme_class.GRAY_700,
-        }
-
-        for item in self.library_items:
-            for el in item['elements']:
-                results['elements_checked'] += 1
-                bg = el.get('backgroundColor')
-                stroke = el.get('strokeColor')
-
-                if bg and bg != 'transparent':
-                    if bg in theme_colors or bg.startswith(tuple(theme_colors)):
-                        results['using_theme_colors'] += 1
-
-                if stroke and stroke != 'transparent':
-                    if stroke in theme_colors or stroke.startswith(tuple(theme_colors)):
-                        results['using_theme_colors'] += 1
-
-        return results
+        return self.run_rules([ColorRule(theme_class)])['colors']
 
     def validate_roughness(self, expected_roughness: int) -> Dict:
         """Validate roughness values"""
-        results = {
-            'total_elements': 0,
-            'by_roughness': {},
-            'violations': []
-        }
-
-        for item in self.library_items:
-            for el in item['elements']:
-                if 'roughness' in el:
-                    results['total_elements'] += 1
-                    rough = el['roughness']
-                    results['by_roughness'][rough] = results['by_roughness'].get(rough, 0) + 1
-
-                    if rough != expected_roughness:
-                        results['violations'].append(f"{item['name']}: roughness {rough} (expected {expected_roughness})")
-
-        return results
+        return self.run_rules([RoughnessRule(expected_roughness)])['roughness']
 
     def get_component_json(self, component_name: str) -> Dict:
-        """Get full JSON for a specific component"""
+        """Get full JSON for a specific component (decodes only that item, via the sidecar index)"""
+        if self._data is None:
+            return LibraryReader(self.library_path).find(component_name)
         for item in self.library_items:
-            if component_name.lower() in item['name'].lower():
+            if component_name.lower() in item.get('name', '').lower():
                 return item
         return None
 
     def print_report(self, theme_name: str = None):
         """Print a comprehensive validation report"""
-        print(f"\n{'='*60}")
-        print(f"VALIDATION REPORT: {self.library_path.name}")
-        if theme_name:
-            print(f"Theme: {theme_name}")
-        print(f"{'='*60}\n")
-
-        print(f"📊 Library Stats:")
-        print(f"  Total components: {len(self.library_items)}")
-
-        # Roundness
-        roundness = self.validate_roundness()
-        print(f"\n🔲 Roundness:")
-        print(f"  Total rectangles: {roundness['total_rectangles']}")
-        print(f"  Null roundness: {roundness['null_roundness']}")
-        for rtype, count in sorted(roundness['by_type'].items()):
-            print(f"  Type {rtype}: {count}")
-
-        # Element type distribution
-        el_types = {}
-        for item in self.library_items:
-            for el in item['elements']:
-                etype = el['type']
-                el_types[etype] = el_types.get(etype, 0) + 1
+        print_report(self.validate(theme_name))
 
-        print(f"\n📝 Element Types:")
-        for etype, count in sorted(el_types.items(), key=lambda x: -x[1]):
-            print(f"  {etype}: {count}")
 
-        print(f"\n{'='*60}\n")
+def print_report(report: Dict):
+    """Print a validation report (see testing.rules.validate_document)"""
+    print(f"\n{'='*60}")
+    print(f"VALIDATION REPORT: {Path(report['file']).name if report['file'] else IN_MEMORY_LABEL}")
+    if report['theme']:
+        print(f"Theme: {report['theme']}")
+    print(f"{'='*60}\n")
 
+    if report['error']:
+        print(f"❌ {report['error']}")
+        print(f"\n{'='*60}\n")
+        return
+
+    rules = report['rules']
+    print(f"📊 Library Stats:")
+    print(f"  Total components: {rules['stats']['components']}")
+
+    roundness = rules['roundness']
+    print(f"\n🔲 Roundness:")
+    print(f"  Total rectangles: {roundness['total_rectangles']}")
+    print(f"  Null roundness: {roundness['null_roundness']}")
+    for rtype, count in sorted(roundness['by_type'].items()):
+        print(f"  Type {rtype}: {count}")
+
+    print(f"\n📝 Element Types:")
+    for etype, count in sorted(rules['stats']['by_type'].items(), key=lambda x: -x[1]):
+        print(f"  {etype}: {count}")
+
+    print(f"\n{'='*60}\n")
+
+
+def validate_all_themes(output_dir: str = 'output', jobs: int = None, report_file: str = None,
+                        cache_dir: str = None) -> bool:
+    """
+    Validate the generated library of every theme (in parallel), printing a report for each.
+
+    Args:
+        output_dir: Directory of a multi-theme build (see generate.theme_output_paths)
+        jobs: Maximum worker processes (default: CPU count)
+        report_file: Also write the reports as JSON here
+        cache_dir: Only re-check components changed since the last run cached here
+
+    Returns:
+        True if every library found passed
+    """
+    from excalidraw_gen.builder.generate import theme_output_paths
+    from excalidraw_gen.core.themes import get_theme, list_themes
+
+    themes = {}
+    for theme_name in list_themes():
+        lib_path, _ = theme_output_paths(theme_name, output_dir)
+        if not lib_path.exists():
+            print(f"⚠️  {lib_path} not found, skipping...")
+            continue
+        themes[lib_path] = theme_name
 
-def validate_all_themes():
-    """Validate all generated themes"""
-    from excalidraw_gen.core.themes import get_theme
+    reports = validate_files(list(themes), themes, jobs=jobs, cache_dir=cache_dir)
+    for report in reports:
+        print_report(report)
+        if report['error']:
+            continue
+        rules = report['rules']
 
-    themes = {
-        'default': {'roundness': 3, 'roughness': 1},
-        'carbon': {'roundness': 'null', 'roughness': 0},
-        'warm': {'roundness': 3, 'roughness': 2},
-    }
+        if rules['structure']['violations']:
+            print(f"❌ Structure violations found:")
+            for v in rules['structure']['violations'][:5]:
+                print(f"   {v}")
 
-    for theme_name, specs in themes.items():
-        lib_path = f"output/{theme_name}.excalidrawlib"
-        if not Path(lib_path).exists():
-            print(f"⚠️  {lib_path} not found, skipping...")
-            continue
+        if rules['roundness']['violations']:
+            print(f"❌ Roundness violations found:")
+            for v in rules['roundness']['violations'][:5]:
+                print(f"   {v}")
 
-        validator = LibraryValidator(lib_path)
-        validator.print_report(theme_name)
-
-        # Validate roundness
-        if specs['roundness'] == 'null':
-            roundness_result = validator.validate_roundness(expected_type='null')
-            if roundness_result['violations']:
-                print(f"❌ Roundness violations found:")
-                for v in roundness_result['violations'][:5]:
-                    print(f"   {v}")
-
-        # Validate roughness
-        theme_class = get_theme(theme_name)
-        rough_result = validator.validate_roughness(theme_class.ROUGHNESS)
-        if rough_result['violations']:
-            print(f"❌ Roughness violations: {len(rough_result['violations'])}")
+        rough = rules['roughness']
+        if rough['violations']:
+            print(f"❌ Roughness violations: {len(rough['violations'])}")
         else:
-            print(f"✅ Roughness correct: all elements use roughness={theme_class.ROUGHNESS}")
+            print(f"✅ Roughness correct: all elements use roughness={get_theme(report['theme']).ROUGHNESS}")
+
+        if report['cache']:
+            print(f"♻️  {report['cache']['hits']} cached, {report['cache']['misses']} re-validated component(s)")
+
+    if report_file:
+        write_report(reports, report_file)
+        print(f"📄 Report written to {report_file}")
+    return all(report['passed'] for report in reports)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Validate generated theme libraries')
+    parser.add_argument('--output-dir', default='output', help='Directory of the generated libraries (default: output)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Maximum worker processes (default: CPU count)')
+    parser.add_argument('--report', metavar='FILE', help='Also write a machine-readable JSON report')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory of the validation cache (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Re-validate every component')
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    return validate_all_themes(args.output_dir, jobs=args.jobs, report_file=args.report, cache_dir=cache_dir)
 
 
 if __name__ == "__main__":
-    validate_all_themes()
+    sys.exit(0 if main() else 1)
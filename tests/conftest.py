@@ -0,0 +1,52 @@
+"""
+Shared test fixtures.
+
+Theme libraries are built in memory with the generator's pipeline, once per
+test session, so tests never depend on files from a previous `make` run and
+never share files with each other.
+"""
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from excalidraw_gen.builder.generate import build_library_document
+from excalidraw_gen.core.themes import list_themes
+
+SEED = 1
+
+
+def pytest_addoption(parser):
+    parser.addoption('--update-perf-baseline', action='store_true',
+                     help='Accept the perf benchmarks\' measurements as the baseline (tests/perf-baseline.json)')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'perf: performance regression gate (see tests/test_performance.py)')
+
+
+@lru_cache(maxsize=None)
+def _library_document(theme_name):
+    return build_library_document(theme_name, seed=SEED, jobs=1)
+
+
+@pytest.fixture(scope='session')
+def library_document():
+    """Callable theme name -> that theme's library document, built on first use."""
+    return _library_document
+
+
+@pytest.fixture(scope='session', params=list_themes())
+def theme_name(request):
+    """Each available theme in turn."""
+    return request.param
+
+
+@pytest.fixture(scope='session')
+def theme_library(theme_name, library_document):
+    """Library document of `theme_name`."""
+    return library_document(theme_name)
@@ -0,0 +1,324 @@
+"""
+Tests for ExcalidrawBuilder output.
+Run with: python -m pytest tests/test_builder.py
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from excalidraw_gen.builder import ExcalidrawBuilder, LibraryWriter
+from excalidraw_gen.builder.element import Element, to_json
+from excalidraw_gen.core.themes import get_theme
+
+
+def add_synthetic_items(builder, count):
+    for i in range(count):
+        builder.add_item(f"Synthetic: Card {i}", [
+            builder.rectangle(0, 0, 200, 80, backgroundColor=builder.theme.BACKGROUND),
+            builder.text(10, 10, f"Card {i}", fontSize=16),
+        ])
+
+
+def test_save_matches_json_dump(tmp_path):
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+    add_synthetic_items(builder, 5)
+    builder.save(tmp_path / "lib.excalidrawlib", verbose=False)
+
+    expected = json.dumps({
+        "type": "excalidrawlib",
+        "version": 2,
+        "source": "https://excalidraw.com",
+        "libraryItems": builder.library_items,
+    }, indent=2, default=to_json)
+    assert (tmp_path / "lib.excalidrawlib").read_text() == expected
+
+
+def test_elements_store_only_overrides():
+    theme = get_theme('mork')
+    builder = ExcalidrawBuilder(theme=theme)
+    rect = builder.rectangle(0, 0, 100, 40, backgroundColor="transparent", strokeColor=theme.BORDER)
+    text = builder.text(10, 8, "Email", fontSize=16)
+
+    assert isinstance(rect, Element)
+    assert rect.props == {"strokeColor": theme.BORDER}
+    assert rect["roughness"] == theme.ROUGHNESS
+    assert rect["roundness"] == {"type": theme.ROUNDNESS_TYPE}
+    assert rect.defaults is builder.rectangle(0, 0, 1, 1).defaults
+    assert "fontFamily" not in text.props and text["fontFamily"] == theme.FONT_FAMILY
+
+    full = rect.to_dict()
+    assert list(full)[:7] == ["id", "type", "x", "y", "width", "height", "angle"]
+    assert len(full) == 25 and full["locked"] is False
+    assert list(text.to_dict())[-8:] == [
+        "text", "fontSize", "fontFamily", "textAlign", "verticalAlign", "baseline", "containerId", "originalText"
+    ]
+
+    copy = rect.copy()
+    copy["x"] = 50
+    copy["opacity"] = 50
+    assert rect["x"] == 0 and rect["opacity"] == 100
+
+
+def test_streaming_keeps_nothing_in_memory(tmp_path):
+    builder = ExcalidrawBuilder(theme=get_theme('bronzer'))
+    builder.stream_to(tmp_path / "stream.excalidrawlib")
+    add_synthetic_items(builder, 2000)
+    assert builder.library_items == []
+    builder.save(verbose=False)
+
+    text = (tmp_path / "stream.excalidrawlib").read_text()
+    assert "\n" not in text
+    data = json.loads(text)
+    assert data["type"] == "excalidrawlib"
+    assert len(data["libraryItems"]) == 2000
+    assert data["libraryItems"][-1]["name"] == "Synthetic: Card 1999"
+
+
+def test_empty_library_is_valid_json(tmp_path):
+    for indent in (2, None):
+        with LibraryWriter(tmp_path / "empty.excalidrawlib", indent=indent) as writer:
+            pass
+        assert writer.count == 0
+        assert json.loads((tmp_path / "empty.excalidrawlib").read_text())["libraryItems"] == []
+
+
+def test_single_pass_tee_matches_separate_outputs(tmp_path):
+    from excalidraw_gen.builder.registry import RegistryCollector, component_entry
+
+    theme = get_theme('mork')
+    volatile = {'id', 'seed', 'updated', 'groupIds', 'created'}
+
+    def strip(elements):
+        return [{k: v for k, v in el.items() if k not in volatile} for el in elements]
+
+    retained = ExcalidrawBuilder(theme=theme)
+    add_synthetic_items(retained, 7)
+    retained.save(tmp_path / "a.excalidrawlib", verbose=False)
+    retained.save_preview(tmp_path / "a.excalidraw", verbose=False)
+
+    teed = ExcalidrawBuilder(theme=theme)
+    teed.stream_to(tmp_path / "b.excalidrawlib", indent=2)
+    teed.preview_to(tmp_path / "b.excalidraw")
+    registry = teed.add_sink(RegistryCollector('mork', tmp_path / "b.excalidrawlib"))
+    add_synthetic_items(teed, 7)
+    teed.save(verbose=False)
+
+    lib_a = json.loads((tmp_path / "a.excalidrawlib").read_text())["libraryItems"]
+    lib_b = json.loads((tmp_path / "b.excalidrawlib").read_text())["libraryItems"]
+    assert [strip(i["elements"]) for i in lib_a] == [strip(i["elements"]) for i in lib_b]
+
+    preview_a = json.loads((tmp_path / "a.excalidraw").read_text())
+    preview_b = json.loads((tmp_path / "b.excalidraw").read_text())
+    assert strip(preview_a["elements"]) == strip(preview_b["elements"])
+    assert preview_a["appState"] == preview_b["appState"]
+
+    assert len(registry.components) == 7
+    assert registry.components[3] == component_entry(lib_b[3], 3, 'mork', registry.library_file)
+
+
+def test_seeded_builds_are_reproducible(tmp_path):
+    from excalidraw_gen.builder.ids import IdAllocator
+
+    for name in ("a", "b"):
+        builder = ExcalidrawBuilder(theme=get_theme('mork'), ids=IdAllocator(seed=42, timestamp=0))
+        add_synthetic_items(builder, 20)
+        builder.save(tmp_path / f"{name}.excalidrawlib", verbose=False)
+    assert (tmp_path / "a.excalidrawlib").read_bytes() == (tmp_path / "b.excalidrawlib").read_bytes()
+
+    ids = IdAllocator(seed=42, timestamp=0)
+    fork = ids.fork("level2").next_id()
+    ids.next_id()
+    assert ids.fork("level2").next_id() == fork
+    assert ids.fork("level3").next_id() != fork
+    assert len(fork) == 20
+
+
+def test_cached_build_matches_fresh_build(tmp_path):
+    from excalidraw_gen.builder import generate
+    from excalidraw_gen.builder.cache import BuildCache
+    from excalidraw_gen.components.registry import levels
+
+    outputs = []
+    for run in ("cold", "warm"):
+        output_file = tmp_path / f"{run}.excalidrawlib"
+        generate.main(
+            theme_name='bronzer', output_file=str(output_file), generate_preview=False,
+            verbose=False, seed=7, cache_dir=tmp_path / "cache"
+        )
+        outputs.append(output_file.read_bytes())
+    assert outputs[0] == outputs[1]
+
+    cache = BuildCache(tmp_path / "cache")
+    generate.build_neutral_items(get_theme('bronzer'), verbose=False, ids=generate.build_allocator(7), cache=cache)
+    assert (cache.hits, cache.misses) == (len(levels()), 0)
+
+
+def test_parallel_levels_match_sequential_build():
+    from excalidraw_gen.builder import generate
+
+    results = []
+    for jobs in (1, 3):
+        items = generate.build_neutral_items(
+            get_theme('mork'), verbose=False, ids=generate.build_allocator(11, 0), jobs=jobs
+        )
+        results.append(json.dumps(items, default=to_json))
+    assert results[0] == results[1]
+
+
+def test_neutral_items_are_built_level_by_level(monkeypatch):
+    from excalidraw_gen.builder import generate
+
+    built = []
+    build_level = generate._build_level
+    monkeypatch.setattr(generate, '_build_level', lambda name, *args: built.append(name) or build_level(name, *args))
+    items = generate.iter_neutral_items(get_theme('mork'), verbose=False, ids=generate.build_allocator(11, 0))
+    first = next(items)
+    assert len(built) == 1 and first['elements']
+    items.close()
+    assert len(built) == 1
+
+
+def test_in_memory_library_matches_written_library(tmp_path, library_document):
+    from excalidraw_gen.builder import generate
+    from conftest import SEED
+
+    output_file = tmp_path / "abc123-dark.excalidrawlib"
+    generate.main(
+        theme_name='abc123-dark', output_file=str(output_file), generate_preview=False,
+        verbose=False, seed=SEED, jobs=1
+    )
+    document = json.loads(json.dumps(library_document('abc123-dark'), default=to_json))
+    assert document == json.loads(output_file.read_text())
+
+
+def test_aborted_stream_keeps_previous_output(tmp_path):
+    target = tmp_path / "lib.excalidrawlib"
+    target.write_text("previous")
+
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+    builder.stream_to(target)
+    add_synthetic_items(builder, 3)
+    assert target.read_text() == "previous"  # Streamed to a temporary file until finished
+    builder.abort()
+
+    assert target.read_text() == "previous"
+    assert [p.name for p in tmp_path.iterdir()] == ["lib.excalidrawlib"]
+
+
+def test_minified_output_restores_to_full_output(tmp_path):
+    import gzip
+    from excalidraw_gen.builder.ids import IdAllocator
+    from excalidraw_gen.builder.minify import EXCALIDRAW_DEFAULTS
+
+    paths = {}
+    for mode in ("full", "minified"):
+        builder = ExcalidrawBuilder(theme=get_theme('bronzer'), ids=IdAllocator(seed=3, timestamp=0))
+        paths[mode] = tmp_path / f"{mode}.excalidrawlib"
+        if mode == "full":
+            builder.stream_to(paths[mode], indent=2)
+        else:
+            builder.stream_to(paths[mode], minify=True, precision=1, compress=("gz",))
+        add_synthetic_items(builder, 3)
+        builder.add_item("Line", [builder.line(0.123, 1 / 3, [[0, 0], [10.06, 2 / 3]])])
+        builder.save(verbose=False)
+
+    full = json.loads(paths["full"].read_text())["libraryItems"]
+    minified = json.loads(paths["minified"].read_text())["libraryItems"]
+    assert gzip.decompress((tmp_path / "minified.excalidrawlib.gz").read_bytes()) == paths["minified"].read_bytes()
+    assert paths["minified"].stat().st_size < paths["full"].stat().st_size / 2
+
+    for full_item, minified_item in zip(full[:3], minified[:3]):
+        for el, small in zip(full_item["elements"], minified_item["elements"]):
+            assert {**EXCALIDRAW_DEFAULTS, **small}.items() >= el.items()
+
+    line = minified[3]["elements"][0]
+    assert (line["x"], line["y"], line["points"]) == (0.1, 0.3, [[0, 0], [10.1, 0.7]])
+
+
+def test_library_index_gives_random_access(tmp_path, monkeypatch):
+    from excalidraw_gen.builder import index
+    from excalidraw_gen.builder.index import LibraryReader, index_path
+
+    path = tmp_path / "lib.excalidrawlib"
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+    add_synthetic_items(builder, 4)
+    builder.add_item("Synthetic: ⌘K Palette", [builder.text(0, 0, "⌘K → search…")])
+    builder.save(path, verbose=False)
+    items = json.loads(path.read_text())["libraryItems"]
+
+    assert index_path(path).exists()
+    reader = LibraryReader(path)
+    assert reader.names() == [item["name"] for item in items]
+    assert [reader.get(i) for i in range(len(reader))] == items
+    assert reader.find("palette") == items[4]
+    assert reader.get_by_name("Synthetic: Card 2") == items[2]
+
+    # A copy keeps its index, whatever its mtime
+    copy = tmp_path / "copy.excalidrawlib"
+    copy.write_bytes(path.read_bytes())
+    index_path(copy).write_bytes(index_path(path).read_bytes())
+    os.utime(copy, ns=(0, 0))
+    with monkeypatch.context() as patch:
+        patch.setattr(index, "scan_library", lambda library_file: pytest.fail("index rebuilt"))
+        assert LibraryReader(copy).get(1) == items[1]
+
+    # An edit keeping the size and mtime still makes the index stale
+    stat = os.stat(path)
+    path.write_text(path.read_text().replace("Card 1", "Card 9"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert LibraryReader(path).get(1)["name"] == "Synthetic: Card 9"
+
+    # A stale index is ignored and rebuilt from the file
+    path.write_text(path.read_text().replace("Card 9", "Card One"))
+    assert LibraryReader(path).get(1)["name"] == "Synthetic: Card One"
+    index_path(path).unlink()
+    assert [LibraryReader(path).get(i) for i in range(5)] == json.loads(path.read_text())["libraryItems"]
+
+
+def test_component_pack_round_trips_library(tmp_path):
+    from excalidraw_gen.builder.pack import ComponentPack, build_pack
+
+    path = tmp_path / "lib.excalidrawlib"
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+    add_synthetic_items(builder, 3)
+    builder.add_item("Synthetic: Arrow", [builder.arrow(0.5, 1 / 3, [[0, 0], [40, 12.25]])])
+    builder.save(path, verbose=False)
+    items = json.loads(path.read_text())["libraryItems"]
+
+    with ComponentPack(build_pack(path)) as pack:
+        assert len(pack) == len(items)
+        assert pack.search("arrow") == [3]
+        # Same values, same types (ints stay ints) and the same key order
+        decoded = [pack.get(i) for i in range(len(pack))]
+        assert decoded == items
+        assert [list(el) for el in decoded[3]["elements"]] == [list(el) for el in items[3]["elements"]]
+        assert isinstance(decoded[0]["elements"][0]["x"], int)
+
+    # Rebuilding from the same library gives the same pack
+    first = build_pack(path).read_bytes()
+    os.utime(path, ns=(0, 0))
+    assert build_pack(path).read_bytes() == first
+
+    # Packs of a since-rewritten library are not used, whatever its mtime
+    with ComponentPack.for_library(path) as pack:
+        assert pack.get(1) == items[1]
+    stat = os.stat(path)
+    path.write_text(path.read_text().replace("Card 1", "Card 9"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert ComponentPack.for_library(path) is None
+
+
+def test_build_timestamp_defaults_to_the_last_commit(monkeypatch):
+    from excalidraw_gen.builder.ids import build_timestamp, source_epoch
+
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    assert build_timestamp() == source_epoch() * 1000 > 1_500_000_000_000  # A real date, not 1970
+    assert build_timestamp(reproducible=True) == 0
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    assert build_timestamp() == build_timestamp(reproducible=True) == 1_700_000_000_000
@@ -0,0 +1,72 @@
+"""
+Tests for the component level registry and selective builds.
+Run with: python -m pytest tests/test_components.py
+"""
+import json
+import sys
+from fnmatch import fnmatchcase
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from excalidraw_gen.builder import generate
+from excalidraw_gen.builder.element import to_json
+from excalidraw_gen.components.registry import Selection, get_level, levels
+from excalidraw_gen.core.themes import get_theme
+
+
+def neutral_items(selection=None):
+    return generate.build_neutral_items(
+        get_theme('mork'), verbose=False, ids=generate.build_allocator(5, 0), jobs=1, selection=selection
+    )
+
+
+def test_levels_declare_every_component_they_produce():
+    assert [level.level for level in levels()] == sorted(level.level for level in levels())
+    for level in levels():
+        items = generate._build_level(level.name, get_theme('mork'), 1, 0)
+        assert items
+        for item in items:
+            assert any(fnmatchcase(item["name"], pattern) for pattern in level.provides), item["name"]
+
+
+def test_selection_skips_levels_that_cannot_match():
+    def skipped(selection):
+        return {level.name for level in levels() if not selection.may_match(level)}
+
+    assert skipped(Selection()) == set()
+    assert skipped(Selection(only=["SaaS:*"])) == {level.name for level in levels()} - {"add_saas_blocks"}
+    assert "add_ai_patterns" not in skipped(Selection(only=["C/Block/Chat/*"]))
+    assert skipped(Selection(exclude=["D/*"])) == {"add_templates"}
+    # Only trailing-star excludes can rule out a level
+    assert skipped(Selection(exclude=["D/?age/*"])) == set()
+
+
+def test_selected_items_match_full_build():
+    full = {item["name"]: json.dumps(item, default=to_json) for item in neutral_items()}
+    selection = Selection(only=["AI:*", "Button:*"], exclude=["AI:*Thinking*"])
+    subset = neutral_items(selection)
+
+    assert [item["name"] for item in subset] == [name for name in full if selection(name)]
+    for item in subset:
+        assert json.dumps(item, default=to_json) == full[item["name"]]
+
+
+def test_watch_reload_keeps_registry_populated():
+    from excalidraw_gen.builder.watch import WATCH_DIRS, reload_modules
+
+    names = [level.name for level in levels()]
+    reloaded = reload_modules([WATCH_DIRS[0] / "registry.py", WATCH_DIRS[1] / "bronzer.py"])
+
+    assert reloaded[0] == "excalidraw_gen.components.registry"
+    assert reloaded[-1] == "excalidraw_gen.core.themes"
+    assert [level.name for level in levels()] == names
+    assert get_theme('bronzer') is sys.modules["excalidraw_gen.core.themes.bronzer"].Theme
+
+
+def test_get_level_reads_the_registry():
+    assert get_level("add_saas_blocks") is next(level for level in levels() if level.name == "add_saas_blocks")
+    with pytest.raises(KeyError):
+        get_level("add_nothing")
@@ -0,0 +1,60 @@
+"""
+Tests for the pluggable JSON backend.
+Run with: python -m pytest tests/test_jsonio.py
+"""
+import json
+import math
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from excalidraw_gen.core import jsonio
+
+DOCUMENT = {
+    "type": "excalidrawlib",
+    "items": [{"text": "⌘K Search…", "x": 10.5, "points": [[0, 0], [120, 0]], "link": None, "locked": False}],
+    "empty": {"list": [], "dict": {}},
+}
+
+
+@pytest.fixture(params=["orjson", "msgspec", "json"])
+def backend(request, monkeypatch):
+    """Each JSON backend in turn; fast backends that are not installed are skipped."""
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    monkeypatch.setattr(jsonio, "BACKEND", request.param)
+    return request.param
+
+
+def test_backends_write_identical_output(backend, tmp_path):
+    assert jsonio.dumpb(DOCUMENT) == json.dumps(DOCUMENT, separators=(",", ":"), ensure_ascii=False).encode()
+    assert jsonio.dumps(DOCUMENT, pretty=True) == json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+
+    jsonio.dump(DOCUMENT, tmp_path / "doc.json", pretty=True)
+    assert jsonio.load(tmp_path / "doc.json") == DOCUMENT
+
+    with pytest.raises(ValueError):
+        jsonio.loads(b'{"libraryItems": [')
+
+
+def test_backends_agree_on_values_at_the_edges(backend):
+    # Exponent spelling differs between backends; the values read back the same
+    floats = [1e-05, 1e-07, 1e16, 1.5e300, -0.0, 0.1]
+    assert jsonio.loads(jsonio.dumpb(floats)) == floats
+
+    # Integers wider than 64 bits are encoded by every backend
+    wide = {"big": 2 ** 64, "small": -2 ** 63 - 1}
+    assert jsonio.dumpb(wide) == b'{"big":18446744073709551616,"small":-9223372036854775809}'
+
+    # NaN is not JSON: written as null by the fast backends, rejected by the standard library
+    if backend == "json":
+        with pytest.raises(ValueError):
+            jsonio.dumpb([math.nan])
+    else:
+        assert jsonio.dumpb([math.nan, math.inf]) == b"[null,null]"
+
+    with pytest.raises(TypeError):
+        jsonio.dumpb({"value": object()})
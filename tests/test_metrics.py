@@ -0,0 +1,44 @@
+"""
+Tests for text measurement.
+Run with: python -m pytest tests/test_metrics.py
+"""
+import sys
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from excalidraw_gen.builder import estimate_text_dimensions
+from excalidraw_gen.builder.metrics import (
+    FONT_CASCADIA, FONT_HELVETICA, FONT_VIRGIL, line_width_em, measure_many, measure_text
+)
+
+
+def test_widths_follow_glyph_advances():
+    # "Hello World" in Helvetica is 5167/1000 em per the AFM metrics
+    assert line_width_em("Hello World", FONT_HELVETICA) == 5.167
+    assert measure_text("Hello World", 20, FONT_HELVETICA, padding=0) == (103, 23)
+    # ... and 5240/1000 em in Virgil per the font's hmtx table
+    assert line_width_em("Hello World", FONT_VIRGIL) == 5.24
+
+    # Narrow glyphs measure narrower than wide ones, except in monospace
+    assert line_width_em("iiii", FONT_HELVETICA) < line_width_em("MMMM", FONT_HELVETICA)
+    assert line_width_em("iiii", FONT_CASCADIA) == line_width_em("MMMM", FONT_CASCADIA)
+    assert line_width_em("Button", FONT_VIRGIL) > line_width_em("Button", FONT_HELVETICA)
+
+
+def test_multiline_and_wide_text():
+    width, height = measure_text("Title\nA longer second line", 16, FONT_VIRGIL, padding=0)
+    assert width == int(line_width_em("A longer second line", FONT_VIRGIL) * 16)
+    assert height == int(2 * 16 * 1.25)
+
+    assert line_width_em("設定", FONT_HELVETICA) == 2.0
+
+
+def test_batch_and_builder_share_measurements():
+    labels = ["Save", "Cancel", "Save", "Delete account"]
+    assert measure_many(labels, 14, FONT_HELVETICA) == [measure_text(s, 14, FONT_HELVETICA) for s in labels]
+    assert estimate_text_dimensions("Save", font_size=14, font_family=2) == measure_text("Save", 14, FONT_HELVETICA)
+
+    measure_text.cache_clear()
+    measure_many(labels, 14, FONT_HELVETICA)
+    assert measure_text.cache_info().hits == 1
@@ -0,0 +1,138 @@
+"""
+Performance regression gates.
+Run with: python -m pytest tests/test_performance.py (skip with -m "not perf")
+
+Each benchmark's wall time, peak memory and output size are compared with the
+committed baseline in tests/perf-baseline.json for this runner (see
+excalidraw_gen.testing.perf) and fail past their tolerance. After an intended
+change, accept new values with --update-perf-baseline and commit the file.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, 'src')
+sys.path.insert(0, str(Path(__file__).parent.parent / 'wireframing-solution' / 'backend' / 'src'))
+
+from excalidraw_gen.builder import ExcalidrawBuilder, generate
+from excalidraw_gen.builder.registry import RegistryCollector, save_registry
+from excalidraw_gen.core.themes import get_theme
+from excalidraw_gen.testing.perf import PerfBaseline, PerfHistory, check, measure
+
+from conftest import SEED
+
+
+@pytest.fixture
+def assert_within_baseline(request):
+    update = request.config.getoption('--update-perf-baseline')
+
+    def gate(name, fn, output=None, repeat=3):
+        result = measure(fn, repeat=repeat, output=output)
+        baseline = PerfBaseline()
+        if not update and baseline.expected(name) is None:
+            PerfHistory(runner=baseline.runner).record(name, result)
+            pytest.skip(f"no baseline for {name} in {baseline.path}; record one with --update-perf-baseline")
+        problems = check(name, result, baseline, update=update)
+        assert not problems, f"{name} regressed on {baseline.runner}: " + "; ".join(problems)
+    return gate
+
+
+def test_fixed_baseline_gates_until_accepted(tmp_path):
+    baseline = PerfBaseline(tmp_path / "baseline.json", runner="ci")
+    history = PerfHistory(tmp_path / "history.jsonl", runner="ci")
+    assert baseline.expected("build") is None
+    assert check("build", {'seconds': 1.0, 'peak_kb': 1000, 'bytes': 500}, baseline, history, update=True) == []
+
+    # Passing runs do not move the baseline, so creep in steps is still caught
+    slower = {'seconds': 1.4, 'peak_kb': 1000, 'bytes': 500}
+    assert check("build", slower, baseline, history) == []
+    assert check("build", {'seconds': 1.9, 'peak_kb': 1000, 'bytes': 600}, baseline, history) != []
+    problems = check("build", {'seconds': 2.1, 'peak_kb': 1000, 'bytes': 600}, PerfBaseline(baseline.path, "ci"), history)
+    assert [problem.split()[0] for problem in problems] == ['seconds', 'bytes']
+    assert [entry['passed'] for entry in history.entries("build", "ci")] == [True, True, False, False]
+
+    # Accepting makes the new numbers the baseline; other runners only share output size
+    check("build", {'seconds': 2.1, 'peak_kb': 1000, 'bytes': 600}, baseline, history, update=True)
+    assert check("build", {'seconds': 2.1, 'peak_kb': 1000, 'bytes': 600}, PerfBaseline(baseline.path, "ci"), history) == []
+    assert PerfBaseline(baseline.path, "laptop").expected("build") == {'bytes': 600}
+
+    history.path.write_bytes(history.path.read_bytes() + b'{"name": "build", "sec')  # interrupted write
+    assert len(history.entries("build")) == 6
+
+
+@pytest.mark.perf
+def test_generate_per_theme(assert_within_baseline, theme_name, tmp_path):
+    library, preview = generate.theme_output_paths(theme_name, tmp_path)
+
+    def build():
+        generate.main(theme_name=theme_name, output_file=str(library), preview_file=str(preview),
+                      verbose=False, seed=SEED, jobs=1)
+
+    assert_within_baseline(f"generate.main[{theme_name}]", build, output=lambda: (library, preview))
+
+
+@pytest.fixture
+def mork_builder(library_document):
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+    builder.library_items = library_document('mork')['libraryItems']
+    return builder
+
+
+@pytest.mark.perf
+def test_save(assert_within_baseline, mork_builder, tmp_path):
+    path = tmp_path / "library.excalidrawlib"
+    assert_within_baseline("save", lambda: mork_builder.save(path, verbose=False), output=lambda: (path,))
+
+
+@pytest.mark.perf
+def test_save_preview(assert_within_baseline, mork_builder, tmp_path):
+    path = tmp_path / "preview.excalidraw"
+    assert_within_baseline("save_preview", lambda: mork_builder.save_preview(path, verbose=False),
+                           output=lambda: (path,))
+
+
+@pytest.mark.perf
+def test_registry_generation(assert_within_baseline, library_document, tmp_path):
+    registry_file, catalog_file = tmp_path / "component-registry.json", tmp_path / "component-catalog.txt"
+
+    def generate_registry():
+        components = []
+        for theme_name in ('mork', 'abc123-dark', 'bronzer'):
+            collector = RegistryCollector(theme_name, generate.theme_output_paths(theme_name)[0])
+            for item in library_document(theme_name)['libraryItems']:
+                collector.write_item(item)
+            components.extend(collector.components)
+        save_registry(components, registry_file, catalog_file)
+
+    assert_within_baseline("registry", generate_registry, output=lambda: (registry_file, catalog_file))
+
+
+@pytest.mark.perf
+def test_compose(assert_within_baseline, library_document, tmp_path):
+    from tools.composer import WireframeComposer
+
+    library = tmp_path / "mork-wireframe-kit.excalidrawlib"
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+    builder.library_items = library_document('mork')['libraryItems']
+    builder.save(library, verbose=False)
+    collector = RegistryCollector('mork', library)
+    for item in builder.library_items:
+        collector.write_item(item)
+    for component in collector.components:
+        component['library_file'] = str(library)  # Absolute, so the composer reads this build
+    placements = [
+        {'component_id': component['id'], 'x': (i % 4) * 400, 'y': (i // 4) * 300,
+         'customizations': {'text': f"Label {i}"}}
+        for i, component in enumerate(collector.components[::6])
+    ]
+    output = tmp_path / "wireframes" / "page.excalidraw"
+
+    def compose():
+        # A fresh composer per run, so library readers are opened each time as in a new request
+        WireframeComposer({'components': collector.components}, output_dir=output.parent).compose(
+            "page", 'mork', placements
+        )
+
+    assert_within_baseline("WireframeComposer.compose", compose, output=lambda: (output,))
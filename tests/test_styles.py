@@ -0,0 +1,72 @@
+"""
+Tests for theme-neutral builds and palette resolution.
+Run with: python -m pytest tests/test_styles.py
+"""
+import sys
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from excalidraw_gen.builder import ExcalidrawBuilder
+from excalidraw_gen.builder.generate import _bind_theme, build_allocator, build_neutral_items
+from excalidraw_gen.builder.styles import make_token_theme, resolve_items
+from excalidraw_gen.components import add_base_ui, add_modules
+from excalidraw_gen.core.themes import AVAILABLE_THEMES, get_theme
+
+VOLATILE = {'id', 'seed', 'updated', 'groupIds'}
+
+
+def canonical(items):
+    return [
+        (item['name'], [{k: v for k, v in el.items() if k not in VOLATILE} for el in item['elements']])
+        for item in items
+    ]
+
+
+def build_direct(theme, *levels):
+    builder = ExcalidrawBuilder(theme=theme)
+    previous = _bind_theme(theme)
+    try:
+        for level in levels:
+            level(builder)
+    finally:
+        for module, bound in previous.items():
+            module.Theme = bound
+    return builder.library_items
+
+
+def build_resolved(theme, *levels):
+    builder = ExcalidrawBuilder(theme=make_token_theme(theme))
+    previous = _bind_theme(builder.theme)
+    try:
+        for level in levels:
+            level(builder)
+    finally:
+        for module, bound in previous.items():
+            module.Theme = bound
+    return resolve_items(builder.library_items, theme)
+
+
+def test_resolved_matches_direct_build():
+    """Resolving the neutral form reproduces a direct build for every theme"""
+    for theme in AVAILABLE_THEMES.values():
+        direct = build_direct(theme, add_base_ui, add_modules)
+        resolved = build_resolved(theme, add_base_ui, add_modules)
+        assert canonical(resolved) == canonical(direct)
+
+
+def test_neutral_items_are_tokenized_and_shared():
+    mork, bronzer = get_theme('mork'), get_theme('bronzer')
+    ids = build_allocator(3, 0)
+    neutral = build_neutral_items(mork, verbose=False, ids=ids)
+    # Themes with the same layout build identical geometry
+    assert canonical(build_neutral_items(bronzer, verbose=False, ids=ids)) == canonical(neutral)
+
+    colors = {el['strokeColor'] for item in neutral for el in item['elements']}
+    assert '$FOREGROUND' in colors
+    assert not any(c.startswith('#') for c in colors if c != 'transparent')
+
+    resolved = resolve_items(neutral, bronzer)
+    assert {el['roughness'] for item in resolved for el in item['elements']} == {bronzer.ROUGHNESS}
+    # Resolution never mutates the shared neutral form
+    assert neutral[0]['elements'][0]['roughness'] == '$ROUGHNESS'
@@ -1,127 +1,58 @@
-#!/usr/bin/env python3
 """
-Test suite for theme validation.
-Run with: python tests/test_themes.py
+Tests that every theme's library matches the theme's specification.
+Run with: python -m pytest tests/test_themes.py
+
+Libraries come from the in-memory fixtures in conftest.py; nothing is read
+from output/.
 """
 import sys
-from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, 'src')
 
-from excalidraw_gen.testing.validator import LibraryValidator
 from excalidraw_gen.core.themes import get_theme
+from excalidraw_gen.testing.rules import expected_roundness, validate_document
+from excalidraw_gen.testing.validator import LibraryValidator
 
 
-def test_carbon_theme():
-    """Test carbon theme has boxy corners and correct styling"""
-    print("\n🧪 Testing Carbon Theme...")
-
-    lib_path = "output/carbon.excalidrawlib"
-    if not Path(lib_path).exists():
-        print("❌ carbon.excalidrawlib not found. Run 'make carbon' first.")
-        return False
-
-    validator = LibraryValidator(lib_path)
-    carbon = get_theme('carbon')
-
-    # Test roundness
-    roundness = validator.validate_roundness()
-    null_pct = 100 * roundness['null_roundness'] / roundness['total_rectangles']
-
-    print(f"  Roundness: {roundness['null_roundness']}/{roundness['total_rectangles']} null ({null_pct:.1f}%)")
-
-    # Should have mostly null roundness (boxy)
-    if null_pct < 95:  # Allow for switch
-        print(f"  ❌ Expected >95% null roundness for boxy corners")
-        return False
-
-    # Test roughness
-    rough = validator.validate_roughness(carbon.ROUGHNESS)
-    if rough['violations']:
-        print(f"  ❌ Roughness violations: {len(rough['violations'])}")
-        return False
-
-    print("  ✅ Carbon theme valid (boxy corners, roughness=0)")
-    return True
-
-
-def test_default_theme():
-    """Test default theme has rounded corners"""
-    print("\n🧪 Testing Default Theme...")
-
-    lib_path = "output/default.excalidrawlib"
-    if not Path(lib_path).exists():
-        print("❌ default.excalidrawlib not found. Run 'make generate' first.")
-        return False
-
-    validator = LibraryValidator(lib_path)
-    default = get_theme('default')
-
-    # Test roundness
-    roundness = validator.validate_roundness()
-    type3_count = roundness['by_type'].get(3, 0)
-    type3_pct = 100 * type3_count / roundness['total_rectangles']
-
-    print(f"  Roundness type 3: {type3_count}/{roundness['total_rectangles']} ({type3_pct:.1f}%)")
-
-    if type3_pct < 95:
-        print(f"  ❌ Expected >95% type 3 roundness")
-        return False
-
-    print("  ✅ Default theme valid (rounded corners, roughness=1)")
-    return True
-
-
-def test_warm_theme():
-    """Test warm theme has rounded corners"""
-    print("\n🧪 Testing Warm Theme...")
-
-    lib_path = "output/warm.excalidrawlib"
-    if not Path(lib_path).exists():
-        print("❌ warm.excalidrawlib not found. Run 'make warm' first.")
-        return False
-
-    validator = LibraryValidator(lib_path)
-
-    # Test roundness
-    roundness = validator.validate_roundness()
-    type3_count = roundness['by_type'].get(3, 0)
-    type3_pct = 100 * type3_count / roundness['total_rectangles']
-
-    print(f"  Roundness type 3: {type3_count}/{roundness['total_rectangles']} ({type3_pct:.1f}%)")
+def test_library_passes_every_rule(theme_name, theme_library):
+    report = validate_document(theme_library, theme_name=theme_name)
+    assert report['passed'], {name: result['violations'][:5] for name, result in report['rules'].items()}
+    assert report['rules']['stats']['components'] == len(theme_library['libraryItems']) > 0
 
-    if type3_pct < 95:
-        print(f"  ❌ Expected >95% type 3 roundness")
-        return False
 
-    print("  ✅ Warm theme valid (rounded corners, roughness=2)")
-    return True
+def test_rectangles_use_theme_roundness(theme_name, theme_library):
+    expected = expected_roundness(get_theme(theme_name))
+    roundness = LibraryValidator.from_document(theme_library).validate_roundness(expected)
+    assert not roundness['violations']
 
+    # Everything but the switch track (type 20) follows the theme
+    matching = roundness['null_roundness'] if expected == 'null' else roundness['by_type'].get(expected, 0)
+    assert matching / roundness['total_rectangles'] > 0.95
 
-def main():
-    print("\n" + "="*60)
-    print("EXCALIDRAW LIBRARY THEME TESTS")
-    print("="*60)
 
-    results = []
-    results.append(("Carbon", test_carbon_theme()))
-    results.append(("Default", test_default_theme()))
-    results.append(("Warm", test_warm_theme()))
+def test_elements_use_theme_roughness(theme_name, theme_library):
+    theme = get_theme(theme_name)
+    roughness = LibraryValidator.from_document(theme_library).validate_roughness(theme.ROUGHNESS)
+    assert not roughness['violations']
+    assert roughness['by_roughness'] == {theme.ROUGHNESS: roughness['total_elements']}
 
-    print("\n" + "="*60)
-    print("SUMMARY")
-    print("="*60)
 
-    for name, passed in results:
-        status = "✅ PASS" if passed else "❌ FAIL"
-        print(f"  {name}: {status}")
+def test_colors_come_from_theme_palette(theme_name, theme_library):
+    colors = LibraryValidator.from_document(theme_library).validate_colors(get_theme(theme_name))
+    assert colors['elements_checked'] > 0
+    assert colors['using_theme_colors'] >= colors['elements_checked'] / 2
 
-    all_passed = all(r[1] for r in results)
-    print(f"\n{'✅ All tests passed!' if all_passed else '❌ Some tests failed'}\n")
 
-    return 0 if all_passed else 1
+def test_themes_provide_the_same_components(library_document):
+    names = [[item['name'] for item in library_document(name)['libraryItems']] for name in ('mork', 'abc123-dark', 'bronzer')]
+    assert names[0] == names[1] == names[2]
 
 
-if __name__ == "__main__":
-    sys.exit(main())
+def test_in_memory_library_prints_a_report(theme_name, theme_library, capsys):
+    validator = LibraryValidator.from_document(theme_library)
+    validator.print_report(theme_name)
+    report = capsys.readouterr().out
+    assert "VALIDATION REPORT: <in-memory>" in report and f"Theme: {theme_name}" in report
+    assert f"Total components: {len(theme_library['libraryItems'])}" in report
+    assert validator.get_component_json(theme_library['libraryItems'][0]['name']) == theme_library['libraryItems'][0]
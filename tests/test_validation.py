@@ -0,0 +1,410 @@
+"""
+Tests for the single-pass validation rule engine.
+Run with: python -m pytest tests/test_validation.py
+"""
+import json
+import sys
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from excalidraw_gen.builder import ExcalidrawBuilder
+from excalidraw_gen.core.themes import get_theme
+from excalidraw_gen.testing.rules import (
+    Rule, RuleEngine, theme_for_library, validate_file, validate_files, write_report,
+)
+from excalidraw_gen.testing.validator import LibraryValidator
+
+
+def build_library(path, theme_name):
+    builder = ExcalidrawBuilder(theme=get_theme(theme_name))
+    for i in range(3):
+        builder.add_item(f"Synthetic: Card {i}", [
+            builder.rectangle(0, 0, 200, 80),
+            builder.text(10, 10, f"Card {i}", fontSize=16),
+            builder.line(0, 90, [[0, 0], [200, 0]]),
+        ])
+    builder.save(path, verbose=False)
+    return path
+
+
+class CountingRule(Rule):
+    name = 'counting'
+    types = ('text',)
+
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def check_element(self, el, item):
+        self.seen.append(el['type'])
+
+
+def test_rules_only_see_subscribed_types(tmp_path):
+    data = json.loads(build_library(tmp_path / "lib.excalidrawlib", 'mork').read_text())
+    rule = CountingRule()
+    RuleEngine([rule]).run(data)
+    assert rule.seen == ['text'] * 3
+
+
+def test_themed_libraries_pass_and_violations_fail(tmp_path):
+    for theme_name in ('mork', 'abc123-dark', 'bronzer'):
+        path = build_library(tmp_path / f"{theme_name}-wireframe-kit.excalidrawlib", theme_name)
+        assert theme_for_library(path) == theme_name
+        report = validate_file(path, theme_name)
+        assert report['passed'], report
+        assert report['rules']['stats'] == {
+            'components': 3, 'elements': 9, 'by_type': {'rectangle': 3, 'text': 3, 'line': 3}, 'violations': [],
+        }
+
+    # Legacy per-check API agrees with the engine
+    validator = LibraryValidator(tmp_path / "mork-wireframe-kit.excalidrawlib")
+    assert validator.validate_roughness(1)['total_elements'] == 9
+    assert validator.validate_roundness(3)['by_type'] == {3: 3}
+
+    path = tmp_path / "broken.excalidrawlib"
+    data = json.loads((tmp_path / "mork-wireframe-kit.excalidrawlib").read_text())
+    data['libraryItems'][0]['elements'][0]['roughness'] = 2
+    del data['libraryItems'][1]['elements']
+    path.write_text(json.dumps(data))
+    report = validate_file(path, 'mork')
+    assert not report['passed']
+    assert report['rules']['structure']['violations'] == ["Item 1 missing 'elements'"]
+    assert report['rules']['roughness']['violations'] == ["Synthetic: Card 0: roughness 2 (expected 1)"]
+
+    (tmp_path / "invalid.excalidrawlib").write_text("{")
+    assert validate_file(tmp_path / "invalid.excalidrawlib")['error'].startswith("Invalid JSON")
+
+
+def test_parallel_validation_writes_json_report(tmp_path):
+    files = [build_library(tmp_path / f"{name}-wireframe-kit.excalidrawlib", name) for name in ('mork', 'bronzer')]
+    themes = {path: theme_for_library(path) for path in files}
+    reports = validate_files(files, themes, jobs=2)
+    assert reports == validate_files(files, themes, jobs=1)
+
+    write_report(reports, tmp_path / "report.json")
+    document = json.loads((tmp_path / "report.json").read_text())
+    assert document['passed'] is True
+    assert [report['theme'] for report in document['files']] == ['mork', 'bronzer']
+    assert document['files'][1]['rules']['roughness']['by_roughness'] == {'2': 9}
+
+
+def test_validation_cache_only_rechecks_changed_items(tmp_path):
+    path = build_library(tmp_path / "mork-wireframe-kit.excalidrawlib", 'mork')
+    cache_dir = tmp_path / "cache"
+    first = validate_file(path, 'mork', cache_dir)
+    assert first['cache'] == {'hits': 0, 'misses': 3}
+    second = validate_file(path, 'mork', cache_dir)
+    assert second['cache'] == {'hits': 3, 'misses': 0}
+    assert second['rules'] == first['rules'] == validate_file(path, 'mork')['rules']
+
+    # A changed item is re-validated; cached findings of moved items get their new index
+    data = json.loads(path.read_text())
+    del data['libraryItems'][2]['status']
+    data['libraryItems'].insert(0, {**data['libraryItems'][0], 'name': "Synthetic: Card 0 copy"})
+    data['libraryItems'][0]['elements'] = [dict(el, roughness=2) for el in data['libraryItems'][0]['elements']]
+    path.write_text(json.dumps(data))
+    report = validate_file(path, 'mork', cache_dir)
+    assert report['cache'] == {'hits': 2, 'misses': 2}
+    assert report['rules'] == validate_file(path, 'mork')['rules']
+    assert report['rules']['structure']['warnings'] == ["Item 3 missing 'status'"]
+    assert validate_file(path, 'mork', cache_dir)['cache'] == {'hits': 4, 'misses': 0}
+
+    # Other rule sets (a different theme, the legacy per-check API) have their own entries
+    assert validate_file(path, 'bronzer', cache_dir)['cache']['hits'] == 0
+    validator = LibraryValidator(path, cache_dir=cache_dir)
+    assert validator.validate_roundness(3)['by_type'] == {3: 4}
+    assert LibraryValidator(path, cache_dir=cache_dir).validate_roundness(3) == validator.validate_roundness(3)
+
+
+def test_element_table_answers_audits_with_masks(tmp_path):
+    import pytest
+    pytest.importorskip("numpy")
+    from excalidraw_gen.testing.table import ElementTable, load_table, load_theme_tables
+
+    for theme_name in ('mork', 'bronzer'):
+        build_library(tmp_path / f"{theme_name}-wireframe-kit.excalidrawlib", theme_name)
+    table = load_table(tmp_path / "mork-wireframe-kit.excalidrawlib")
+    assert len(table) == 9
+    assert table.count_by("type") == {"line": 3, "rectangle": 3, "text": 3}
+    assert table.where(table.eq(type="text"))["text"].tolist() == ["Card 0", "Card 1", "Card 2"]
+
+    foreground = get_theme('mork').FOREGROUND
+    assert table.where(table.uses_color(foreground)).unique("item") == [f"Synthetic: Card {i}" for i in range(3)]
+    assert len(table.where(table.uses_color(get_theme('mork').BORDER))) == 0
+    assert table.aggregate_by("item", "width")["Synthetic: Card 0"] == 400 + table.where(table.eq(type="text"))["width"][0]
+
+    themes = load_theme_tables(tmp_path)
+    assert themes.count_by("source") == {"bronzer": 9, "mork": 9}
+    off_theme = themes.where(themes.eq(source="mork") & (themes["roughness"] != get_theme('mork').ROUGHNESS))
+    assert len(off_theme) == 0
+    assert len(ElementTable.concat([])) == 0
+
+
+def test_schema_catches_broken_items_while_streaming(tmp_path):
+    import pytest
+    from excalidraw_gen.testing.schema import SchemaError, SchemaValidator, iter_array, validate_item
+    from excalidraw_gen.testing.schema import validate_file as validate_schema
+
+    path = build_library(tmp_path / "lib.excalidrawlib", 'mork')
+    data = json.loads(path.read_text())
+    assert list(iter_array(path, "libraryItems", chunk_size=5)) == data["libraryItems"]
+    assert validate_schema(path) == []
+
+    item = data["libraryItems"][0]
+    rect, text, line = item["elements"]
+    del line["points"]
+    text["containerId"] = "missing"
+    rect["fillStyle"] = "plaid"
+    rect["groupIds"] = text["groupIds"]
+    text["id"] = rect["id"]
+    assert validate_item(item, 0) == [
+        "item 0 'Synthetic: Card 0': element 0 (rectangle) 'fillStyle' is 'plaid' (expected one of hachure, cross-hatch, solid, zigzag)",
+        "item 0 'Synthetic: Card 0': element 2 (line) missing 'points'",
+        f"item 0 'Synthetic: Card 0': element 1 (text) duplicate id {rect['id']!r}",
+        "item 0 'Synthetic: Card 0': element 1 (text) containerId refers to missing element 'missing'",
+    ]
+    path.write_text(json.dumps(data))
+    assert len(validate_schema(path)) == 4
+    assert not validate_file(path)['passed']
+
+    # As a build sink, an invalid item aborts the build and keeps the previous library
+    path = build_library(tmp_path / "kept.excalidrawlib", 'mork')
+    before = path.read_bytes()
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+    builder.add_sink(SchemaValidator())
+    builder.stream_to(path)
+    with pytest.raises(SchemaError):
+        try:
+            builder.add_item("Broken", [builder.line(0, 0, [[0, 0]])])
+        except SchemaError:
+            builder.abort()
+            raise
+    assert path.read_bytes() == before
+
+
+def test_inspector_queries_names_and_attributes_through_the_pack(tmp_path, monkeypatch):
+    from excalidraw_gen.builder.pack import ComponentPack, pack_path
+    from excalidraw_gen.testing import inspector
+
+    for theme_name in ('mork', 'abc123-dark'):
+        build_library(tmp_path / f"{theme_name}-wireframe-kit.excalidrawlib", theme_name)
+    path = tmp_path / "mork-wireframe-kit.excalidrawlib"
+
+    cache_dir = tmp_path / "cache"
+
+    def query(*args, **kwargs):
+        return inspector.query(*args, cache_dir=cache_dir, **kwargs)
+
+    assert [m['name'] for m in query(path, "card 1")] == ["Synthetic: Card 1"]
+    # The pack is compiled into the cache, never next to the library
+    assert not pack_path(path).exists()
+    assert inspector.cached_pack_path(path, cache_dir).exists()
+    assert len(query(path, "Synthetic: Card [02]")) == 2
+    assert [m['position'] for m in query(path, r"card [12]$", regex=True)] == [1, 2]
+
+    # Predicates read the pack's columns; no element is decoded whole
+    monkeypatch.setattr(ComponentPack, "get_elements", None)
+    matches = query(path, "Synthetic:*", where=["type=text", "fontSize>=16", "text~card 2"])
+    assert [(m['name'], m['matched']) for m in matches] == [("Synthetic: Card 2", [1])]
+    assert query(path, where=["roundness.type=3"])[0]['matched'] == [0]
+    assert query(path, where=["fontSize>100"]) == []
+    monkeypatch.undo()
+
+    comparison = inspector.compare_across_themes("Card 0", tmp_path, cache_dir=cache_dir)
+    assert comparison["Synthetic: Card 0"]["mork"]["roughness"] == 1
+    assert comparison["Synthetic: Card 0"]["abc123-dark"]["roundness"] is None
+    assert list(comparison["Synthetic: Card 0"]) == ["mork", "abc123-dark"]
+
+    # --compare honours --library and --where
+    libraries = {"mork": path}
+    comparison = inspector.compare_across_themes("Synthetic:*", where=["text~card 2"], libraries=libraries, cache_dir=cache_dir)
+    assert list(comparison) == ["Synthetic: Card 2"] and list(comparison["Synthetic: Card 2"]) == ["mork"]
+
+    # Without a cache the JSON index serves the same queries, still writing no pack
+    inspector._readers.clear()
+    assert [m['matched'] for m in inspector.query(path, "Card 2", where=["text~card 2"], cache_dir=None)] == [[1]]
+    assert not pack_path(path).exists()
+
+
+def test_structural_diff_ignores_build_noise(tmp_path):
+    from excalidraw_gen.builder.ids import IdAllocator
+    from excalidraw_gen.testing.diff import diff_libraries
+
+    def build(path, seed, label="Card 1", extra=False):
+        builder = ExcalidrawBuilder(theme=get_theme('mork'), ids=IdAllocator(seed, seed))
+        for i in range(3):
+            text = label if i == 1 else f"Card {i}"
+            builder.add_item(f"Synthetic: Card {i}", [builder.rectangle(0, 0, 200, 80), builder.text(10, 10, text)])
+        if extra:
+            builder.add_item("Synthetic: Extra", [builder.ellipse(0, 0, 20, 20)])
+        builder.save(path, verbose=False)
+        return path
+
+    old = build(tmp_path / "old.excalidrawlib", 1)
+    assert diff_libraries(old, build(tmp_path / "same.excalidrawlib", 2)) == {
+        "added": [], "removed": [], "changed": [], "unchanged": 3,
+    }
+
+    diff = diff_libraries(old, build(tmp_path / "new.excalidrawlib", 3, label="Card One", extra=True))
+    assert diff["added"] == ["Synthetic: Extra"]
+    assert diff["removed"] == []
+    assert diff["unchanged"] == 2
+    [changed] = diff["changed"]
+    assert changed["name"] == "Synthetic: Card 1"
+    [element] = changed["elements"]
+    assert (element["index"], element["type"]) == (1, "text")
+    assert element["changes"]["text"] == ["Card 1", "Card One"]
+    assert "id" not in element["changes"] and "seed" not in element["changes"]
+
+
+def test_structural_diff_reads_hand_written_libraries(tmp_path):
+    from excalidraw_gen.testing.diff import diff_libraries
+
+    def write(path, text):
+        # No sidecar index, CRLF line ends, non-ASCII text and an unnamed item
+        items = [
+            {"elements": [{"type": "text", "text": "Über ⌘K"}]},
+            {"name": "Card", "elements": [{"type": "rectangle", "width": 100}, {"type": "text", "text": text}]},
+        ]
+        document = json.dumps({"type": "excalidrawlib", "libraryItems": items}, ensure_ascii=False, indent=2)
+        path.write_bytes(document.replace("\n", "\r\n").encode())
+        return path
+
+    diff = diff_libraries(write(tmp_path / "old.excalidrawlib", "Grüße"), write(tmp_path / "new.excalidrawlib", "Hallo…"))
+    assert diff["unchanged"] == 1
+    [changed] = diff["changed"]
+    assert changed["name"] == "Card"
+    [element] = changed["elements"]
+    assert element["index"] == 1 and element["changes"]["text"] == ["Grüße", "Hallo…"]
+
+
+def test_near_duplicate_components_are_clustered(tmp_path):
+    from excalidraw_gen.testing.duplicates import find_near_duplicates, library_near_duplicates
+
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+
+    def sidebar(name, x, links):
+        builder.add_item(name, [builder.rectangle(x, 0, 240, 600)] + [
+            builder.text(x + 16, 24 + 32 * i, label, fontSize=14) for i, label in enumerate(links)
+        ])
+
+    sidebar("Sidebar: App", 0, ["Home", "Projects", "Settings"])
+    sidebar("Sidebar: Admin", 500, ["Home", "Projects", "Settings"])
+    # Same structure, other labels and one more link: still the same component
+    sidebar("Sidebar: Docs", 0, ["Guides", "API", "Changelog", "Support"])
+    # Same labels, other structure: a horizontal tab bar
+    builder.add_item("Tabs", [builder.rectangle(0, 0, 600, 40), builder.line(0, 40, [[0, 0], [600, 0]])] + [
+        builder.text(16 + 120 * i, 10, label, fontSize=14) for i, label in enumerate(["Home", "Projects", "Settings"])
+    ])
+    builder.add_item("Avatar", [builder.ellipse(0, 0, 32, 32)])
+    path = tmp_path / "lib.excalidrawlib"
+    builder.save(path, verbose=False)
+
+    clusters = library_near_duplicates(path)
+    assert [cluster["items"] for cluster in clusters] == [["Sidebar: App", "Sidebar: Admin", "Sidebar: Docs"]]
+    assert clusters[0]["similarity"] > 0.8
+    # Compared on their text as well, the relabelled sidebar drops out
+    assert [cluster["items"] for cluster in library_near_duplicates(path, words=True)] == [
+        ["Sidebar: App", "Sidebar: Admin"]
+    ]
+    assert find_near_duplicates([]) == []
+
+
+def test_near_duplicates_of_the_mork_library(library_document):
+    """Regression: look-alike sidebars and shells cluster, same-labelled primitives do not."""
+    from excalidraw_gen.testing.duplicates import DEFAULT_THRESHOLD, find_near_duplicates, fingerprint, jaccard
+
+    items = library_document('mork')['libraryItems']
+    found = find_near_duplicates(items)
+    clusters = [set(cluster["items"]) for cluster in found]
+
+    # Every member meets the threshold against every other member (no chaining)
+    for cluster in found:
+        shingles = [fingerprint(items[position]) for position in cluster["positions"]]
+        lowest = min(jaccard(a, b) for i, a in enumerate(shingles) for b in shingles[i + 1:])
+        assert lowest >= DEFAULT_THRESHOLD and round(lowest, 3) == cluster["similarity"]
+
+    def clustered(*names):
+        return any(set(names) <= cluster for cluster in clusters)
+
+    assert clustered("C/Block/CRUD/SettingsNav", "C/Block/Chat/SidebarThreadList")
+    assert clustered("C/Shell/App/3Pane", "C/Shell/SplitView", "C/Shell/RightInspector")
+    # Label-driven matches of the old fingerprint
+    assert not clustered("Icon: Settings", "Control: Radio (Active)")
+    assert not clustered("C/Block/CRUD/SettingsNav", "SaaS: Sidebar")
+    # Formerly chained into the sidebars' cluster through intermediate members
+    assert not clustered("SaaS: Login Form", "C/Block/Mobile/DrawerNav")
+    assert not clustered("Input: Select", "B/NavigationMenu")
+
+
+def test_geometry_lint_finds_overlaps_overflow_and_frame_escapes():
+    import random
+    from excalidraw_gen.testing.geometry import Box, lint_item, overlapping_pairs
+
+    builder = ExcalidrawBuilder(theme=get_theme('mork'))
+
+    def item(name, elements):
+        return {"name": name, "elements": [el.to_dict() for el in elements]}
+
+    clean = item("Button", [builder.rectangle(0, 0, 120, 40), builder.text(12, 10, "Save", fontSize=16)])
+    assert lint_item(clean) == []
+    caption = item("Frame", [builder.rectangle(0, 0, 300, 200), builder.text(0, -30, "Caption", fontSize=14),
+                             builder.rectangle(10, 10, 50, 20)])
+    assert lint_item(caption) == []
+
+    avatars = item("Avatars", [builder.ellipse(0, 0, 40, 40), builder.ellipse(25, 0, 40, 40),
+                               builder.ellipse(50, 0, 40, 40),
+                               builder.text(50, 0, "+3", width=40, height=40, textAlign="center")])
+    assert lint_item(avatars) == ["Avatars: text 3 '+3' overlaps ellipse 1"]
+
+    label = item("Card", [builder.rectangle(0, 0, 100, 60),
+                          builder.text(10, 10, "A label far too long for this card", fontSize=16),
+                          builder.text(12, 14, "Overlap", fontSize=16),
+                          builder.rectangle(60, 40, 30, 10), builder.rectangle(10, 40, 30, 10),
+                          builder.rectangle(80, 40, 40, 10)])
+    problems = lint_item(label)
+    assert problems[0] == "Card: text 1 'A label far too long for this card' overlaps text 2 'Overlap'"
+    assert problems[1].startswith("Card: text 1 'A label far too long for this card' overflows rectangle 0")
+    assert problems[-1] == "Card: rectangle 5 sticks out of the frame"
+
+    # Every family is measured from real advances, so a slight overflow is reported for each
+    from excalidraw_gen.builder.metrics import FONT_CASCADIA, FONT_HELVETICA, FONT_VIRGIL, measure_text
+    for family in (FONT_VIRGIL, FONT_HELVETICA, FONT_CASCADIA):
+        width, _ = measure_text("Sign in", 16, family, padding=0)
+        tight = item("Tight", [builder.rectangle(0, 0, width * 0.9, 40),
+                               builder.text(0, 10, "Sign in", fontSize=16, fontFamily=family)])
+        assert lint_item(tight)
+
+    # The sweep finds exactly the pairs a brute-force comparison finds
+    rng = random.Random(3)
+    boxes = []
+    for i in range(200):
+        x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+        boxes.append(Box(i, "rectangle", x, y, x + rng.uniform(1, 80), y + rng.uniform(1, 80)))
+    brute = {(a.index, b.index) for i, a in enumerate(boxes) for b in boxes[i + 1:] if a.overlaps(b)}
+    assert {(a.index, b.index) for a, b in overlapping_pairs(boxes)} == brute
+
+
+def test_geometry_sweep_stays_linear_on_stacked_rows():
+    from excalidraw_gen.testing.geometry import Box, overlapping_pairs
+
+    class CountingBox(Box):
+        __slots__ = ()
+        comparisons = 0
+
+        def overlaps(self, other, tolerance=2):
+            CountingBox.comparisons += 1
+            return super().overlaps(other, tolerance)
+
+    # A list or table: full-width rows stacked vertically, all open on x at once
+    rows = [CountingBox(i, "rectangle", 0, i * 32, 300, i * 32 + 30) for i in range(4000)]
+    assert overlapping_pairs(rows) == []
+    assert CountingBox.comparisons < 2 * len(rows)
+
+    # Rows with text labels and an overlapping pair still match brute force
+    boxes = rows[:200] + [CountingBox(200 + i, "text", 10, i * 32 + 5, 120, i * 32 + 25) for i in range(200)]
+    boxes.append(CountingBox(400, "text", 10, 50 * 32 + 20, 120, 50 * 32 + 50))
+    brute = {(a.index, b.index) for i, a in enumerate(boxes) for b in boxes[i + 1:] if a.overlaps(b)}
+    assert {(a.index, b.index) for a, b in overlapping_pairs(boxes)} == brute
+    assert (250, 400) in brute and (50, 400) in brute
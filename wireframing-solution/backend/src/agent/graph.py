@@ -9,12 +9,12 @@ from langgraph.prebuilt import create_deep_agent
 from langchain_anthropic import ChatAnthropic
 from langchain_core.tools import tool
 from pathlib import Path
-import json
+
+from excalidraw_gen.core import jsonio
 
 # Load component registry
 REGISTRY_PATH = Path(__file__).parent.parent / 'data' / 'component-registry.json'
-with open(REGISTRY_PATH) as f:
-    COMPONENT_REGISTRY = json.load(f)
+COMPONENT_REGISTRY = jsonio.load(REGISTRY_PATH)
 
 # Load catalog for LLM context
 CATALOG_PATH = Path(__file__).parent.parent / 'data' / 'component-catalog.txt'
@@ -2,16 +2,28 @@
 Wireframe composition engine
 Loads components from library and composes them into .excalidraw files
 """
-import json
 from pathlib import Path
 from typing import Optional
 
+from excalidraw_gen.builder.index import LibraryReader
+from excalidraw_gen.builder.pack import ComponentPack
+from excalidraw_gen.builder.metrics import measure_text
+from excalidraw_gen.core import jsonio
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
+
 
 class WireframeComposer:
     """Compose wireframes from component library"""
 
-    def __init__(self, component_registry: dict):
+    def __init__(self, component_registry: dict, output_dir: Optional[Path] = None):
+        """
+        Args:
+            component_registry: Registry document (see excalidraw_gen.builder.registry)
+            output_dir: Directory for composed wireframes (default: wireframes/ at the repository root)
+        """
         self.registry = component_registry
+        self.output_dir = Path(output_dir) if output_dir is not None else PROJECT_ROOT / 'wireframes'
         self.library_cache = {}
 
     def compose(
@@ -64,7 +76,7 @@ class WireframeComposer:
 
                 # Apply customizations (text replacement)
                 if element.get('type') == 'text' and 'text' in customizations:
-                    new_element['text'] = customizations['text']
+                    self._replace_text(new_element, customizations['text'])
 
                 elements.append(new_element)
 
@@ -86,12 +98,9 @@ class WireframeComposer:
         }
 
         # Save file
-        output_dir = Path(__file__).parent.parent.parent.parent.parent / 'wireframes'
-        output_dir.mkdir(exist_ok=True)
-
-        output_file = output_dir / f"{name}.excalidraw"
-        with open(output_file, 'w') as f:
-            json.dump(excalidraw_doc, f, indent=2)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = self.output_dir / f"{name}.excalidraw"
+        jsonio.dump(excalidraw_doc, output_file, pretty=True)
 
         # Calculate actual dimensions
         if elements:
@@ -113,6 +122,23 @@ class WireframeComposer:
             'dimensions': actual_dims
         }
 
+    def _replace_text(self, element: dict, text: str) -> None:
+        """Replace a text element's content and resize it to fit, keeping its alignment anchor"""
+        width, height = measure_text(text, element.get('fontSize', 20), element.get('fontFamily', 1))
+        old_width = element.get('width', width)
+
+        # Keep centered/right-aligned text anchored where it was
+        align = element.get('textAlign', 'left')
+        if align == 'center':
+            element['x'] += (old_width - width) / 2
+        elif align == 'right':
+            element['x'] += old_width - width
+
+        element['text'] = text
+        element['originalText'] = text
+        element['width'] = width
+        element['height'] = height
+
     def _get_component_by_id(self, component_id: str) -> Optional[dict]:
         """Find component in registry by ID"""
         for comp in self.registry['components']:
@@ -122,21 +148,21 @@ class WireframeComposer:
 
     def _load_component_elements(self, component: dict) -> list[dict]:
         """Load Excalidraw elements for a component from library file"""
-        library_file = Path(__file__).parent.parent.parent.parent.parent / component['library_file']
+        library_file = PROJECT_ROOT / component['library_file']
 
-        # Cache library files
+        # Cache one reader per library file; only requested items are decoded.
+        # A fresh component pack is memory-mapped (shared across worker processes),
+        # otherwise items are read from the JSON library through its index.
         lib_key = str(library_file)
         if lib_key not in self.library_cache:
-            with open(library_file) as f:
-                self.library_cache[lib_key] = json.load(f)
+            self.library_cache[lib_key] = ComponentPack.for_library(library_file) or LibraryReader(library_file)
 
-        library = self.library_cache[lib_key]
+        reader = self.library_cache[lib_key]
 
         # Get specific library item by index
-        library_items = library.get('libraryItems', [])
         idx = component['library_index']
 
-        if idx < len(library_items):
-            return library_items[idx].get('elements', [])
+        if idx < len(reader):
+            return reader.get_elements(idx)
 
         return []